@@ -0,0 +1,52 @@
+"""
+Network Tester - Change Feed Benchmark
+Times a stats window refresh that copies the whole history (get_all) against
+one that fetches only the entries added since its cursor (StatsSnapshot.since)
+
+Usage: python benchmarks/bench_change_feed.py [refreshes]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.stats_tracker_service import StatsTrackerService
+
+HISTORY_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def main():
+    refreshes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    print("=" * 64)
+    print(f"Change feed benchmark - {refreshes} refreshes, one new sample each")
+    print("=" * 64)
+    print(f"{'history':>10} {'get_all':>16} {'since':>16} {'speedup':>10}")
+
+    random.seed(1)
+    for size in HISTORY_SIZES:
+        tracker = StatsTrackerService(max_history=size)
+        for _ in range(size):
+            tracker.add_measurement(random.uniform(10, 60))
+
+        start = time.perf_counter()
+        for _ in range(refreshes):
+            tracker.add_measurement(random.uniform(10, 60))
+            tracker.get_all()
+        all_us = (time.perf_counter() - start) / refreshes * 1e6
+
+        _, cursor, _ = tracker.get_snapshot().since()
+        start = time.perf_counter()
+        for _ in range(refreshes):
+            tracker.add_measurement(random.uniform(10, 60))
+            entries, cursor, wrapped = tracker.get_snapshot().since(cursor)
+            assert len(entries) == 1 and not wrapped
+        since_us = (time.perf_counter() - start) / refreshes * 1e6
+
+        print(f"{size:>10,} {all_us:>13.1f} us {since_us:>13.1f} us {all_us / since_us:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Network Tester - History Memory Benchmark
+Compares the memory and speed of a deque of StatsEntry objects with HistoryBuffer
+
+Usage: python benchmarks/bench_history_memory.py [samples]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.stats_tracker_service import HistoryBuffer, StatsEntry
+
+
+def fill(history, samples):
+    """Append samples measurements one second apart; return the seconds taken."""
+    start_time = datetime.now() - timedelta(seconds=samples)
+    start = time.perf_counter()
+    for i in range(samples):
+        latency = None if random.random() < 0.01 else random.uniform(10, 60)
+        history.append(StatsEntry(start_time + timedelta(seconds=i), latency))
+    return time.perf_counter() - start
+
+
+def run_benchmark(name, create, samples):
+    """Measure the memory held by a filled history and the cost of reading it."""
+    gc.collect()
+    tracemalloc.start()
+    history = create(samples)
+    fill_seconds = fill(history, samples)
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # What StatsTrackerService.get_last_n() does with each representation
+    start = time.perf_counter()
+    list(history)[-5:] if isinstance(history, deque) else history.entries(-5)
+    last_n_us = (time.perf_counter() - start) * 1e6
+
+    start = time.perf_counter()
+    latencies = [e.latency for e in history if e.latency is not None]
+    scan_seconds = time.perf_counter() - start
+
+    print(f"{name:<22} {memory / 1024 / 1024:>8.1f} MB {memory / samples:>7.1f} B/sample "
+          f"{samples / fill_seconds:>10,.0f} appends/s  last 5 {last_n_us:>10.1f} us  "
+          f"all entries {scan_seconds:>6.2f} s  ({len(latencies):,} ok)")
+    return history
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 100)
+    print(f"History memory benchmark - {samples:,} samples")
+    print("=" * 100)
+
+    random.seed(1)
+    run_benchmark("deque of StatsEntry", lambda n: deque(maxlen=n), samples)
+    random.seed(1)
+    buffer = run_benchmark("HistoryBuffer", HistoryBuffer, samples)
+
+    try:
+        start = time.perf_counter()
+        _, latencies = buffer.arrays()
+        print(f"\nHistoryBuffer.arrays(): {(time.perf_counter() - start) * 1e6:.1f} us "
+              f"for {len(latencies):,} latencies (zero-copy when not wrapped)")
+    except AttributeError:
+        print("\nHistoryBuffer.arrays() needs NumPy")
+
+
+if __name__ == '__main__':
+    main()
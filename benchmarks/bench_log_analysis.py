@@ -0,0 +1,49 @@
+"""
+Network Tester - Log Analysis Benchmark
+Times the parallel log analyzer with an increasing number of worker processes
+
+Usage: python benchmarks/bench_log_analysis.py [lines] [max_workers]
+
+Each run parses the same synthetic text log split into line-aligned byte
+ranges; throughput should grow close to linearly up to the number of cores.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_log_restore import write_synthetic_log
+from services.log_analysis import HAS_NUMPY, analyze_logs
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    print("=" * 60)
+    print(f"Log analysis benchmark - {lines:,} lines, {os.cpu_count()} CPUs, "
+          f"{'numpy' if HAS_NUMPY else 'pure Python'}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "log.txt")
+        write_synthetic_log(log_file, lines)
+        size_mb = Path(log_file).stat().st_size / 1024 / 1024
+
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            summary = analyze_logs([log_file], workers=workers).summary()
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>3} workers {elapsed:>8.2f} s  {size_mb / elapsed:>7.1f} MB/s  "
+                  f"speed-up {baseline / elapsed:>4.1f}x  ({summary['total_pings']:,} pings)")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Network Tester - Log Restore Benchmark
+Times how long stats restore takes on a large synthetic text log
+
+Usage: python benchmarks/bench_log_restore.py [lines] [--full]
+
+Reports when the history is available (tail-first read) and when the
+lifetime totals are complete (background counting pass). --full also times
+the previous approach of parsing every line with strptime.
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.stats_tracker_service import StatsTrackerService
+
+
+def write_synthetic_log(path, lines):
+    """Write `lines` latency lines one second apart, every 20th a failure."""
+    start = datetime.now() - timedelta(seconds=lines)
+    chunk = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            timestamp = (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S")
+            if i % 20 == 0:
+                chunk.append(f"[{timestamp}] Latency: NO RESPONSE\n")
+            else:
+                chunk.append(f"[{timestamp}] Latency: {10 + i % 90:.2f} ms\n")
+            if len(chunk) >= 100000:
+                f.writelines(chunk)
+                chunk = []
+        f.writelines(chunk)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    lines = int(args[0]) if args else 10_000_000
+    full = "--full" in sys.argv
+
+    print("=" * 60)
+    print(f"Log restore benchmark - {lines:,} lines")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "log.txt")
+
+        start = time.perf_counter()
+        write_synthetic_log(log_file, lines)
+        size_mb = Path(log_file).stat().st_size / 1024 / 1024
+        print(f"{'generate':<22} {time.perf_counter() - start:>9.2f} s  ({size_mb:.0f} MB)")
+
+        start = time.perf_counter()
+        tracker = StatsTrackerService(max_history=1000, log_file=log_file)
+        history_ready = time.perf_counter() - start
+        tracker.wait_restored()
+        totals_ready = time.perf_counter() - start
+        summary = tracker.get_summary()
+
+        print(f"{'history ready':<22} {history_ready * 1000:>9.1f} ms ({len(tracker.get_all())} entries)")
+        print(f"{'totals ready':<22} {totals_ready:>9.2f} s  ({summary['total_pings']:,} pings, "
+              f"{summary['failed']:,} failed)")
+
+        if full:
+            start = time.perf_counter()
+            legacy = StatsTrackerService(max_history=1000)
+            with open(log_file, "r", encoding="utf-8") as f:
+                legacy._restore_text_lines(f)
+            print(f"{'full parse (previous)':<22} {time.perf_counter() - start:>9.2f} s  "
+                  f"({legacy.get_summary()['total_pings']:,} pings)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Network Tester - Log Writer Benchmark
+Compares the per-line file append with the batched background writer
+
+Usage: python benchmarks/bench_log_writer.py [lines]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.logger_service import LoggerService
+
+
+def percentile(sorted_values, pct):
+    """Return the pct-th percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def run_benchmark(name, logger, lines):
+    """Log `lines` measurements and print throughput and caller-side latency."""
+    call_ns = []
+
+    start = time.perf_counter()
+    for i in range(lines):
+        call_start = time.perf_counter_ns()
+        logger.log_latency(20.0 + i % 10)
+        call_ns.append(time.perf_counter_ns() - call_start)
+    logger.close()  # throughput includes draining the queue
+    elapsed = time.perf_counter() - start
+
+    call_ns.sort()
+    written = sum(1 for _ in open(logger.log_file, encoding="utf-8"))
+    print(f"{name:<16} {lines / elapsed:>10.0f} lines/s "
+          f"p50 {percentile(call_ns, 50) / 1000:>7.1f} us "
+          f"p99 {percentile(call_ns, 99) / 1000:>7.1f} us "
+          f"max {call_ns[-1] / 1000:>8.1f} us "
+          f"({written} written)")
+    return lines / elapsed
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    print("=" * 78)
+    print(f"Log writer benchmark - {lines} lines")
+    print("=" * 78)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        direct_rate = run_benchmark(
+            "per-line", LoggerService(str(Path(tmp) / "direct.txt")), lines)
+        batched_rate = run_benchmark(
+            "batched", LoggerService(str(Path(tmp) / "batched.txt"), batched=True), lines)
+        run_benchmark(
+            "batched+fsync",
+            LoggerService(str(Path(tmp) / "fsync.txt"), batched=True, fsync=LoggerService.FSYNC_BATCH),
+            lines)
+
+    print()
+    print(f"Speed-up: {batched_rate / direct_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Network Tester - Probe Engine Benchmark
+Compares probes per second and CPU per probe for the subprocess and ICMP engines
+
+Usage: python benchmarks/bench_probe_engines.py [host] [count]
+"""
+import sys
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: child CPU time is not available
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.ping_service import PingService
+from services.icmp_probe_service import IcmpProbeService
+
+
+def cpu_seconds():
+    """Return CPU time used by this process and its reaped children."""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run_benchmark(name, service, count):
+    """Probe `count` times back to back and print throughput and CPU cost."""
+    service.ping()  # warm up (socket creation, resolver, page cache)
+
+    failures = 0
+    cpu_start = cpu_seconds()
+    wall_start = time.perf_counter()
+
+    for _ in range(count):
+        if service.ping() is None:
+            failures += 1
+
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+
+    print(f"{name:<12} {count / wall:>10.1f} probes/s "
+          f"{cpu / count * 1_000_000:>10.1f} us CPU/probe "
+          f"{failures:>6} failed")
+    return count / wall
+
+
+def main():
+    host = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 60)
+    print(f"Probe engine benchmark - {count} probes to {host}")
+    print("=" * 60)
+
+    subprocess_rate = run_benchmark("subprocess", PingService(host=host), count)
+
+    icmp = IcmpProbeService(host=host)
+    icmp.ping()  # resolves the backend that will be used
+    icmp_rate = run_benchmark(f"icmp ({icmp.backend or 'n/a'})", icmp, count)
+    icmp.close()
+
+    print()
+    print(f"Speed-up: {icmp_rate / subprocess_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
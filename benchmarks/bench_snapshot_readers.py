@@ -0,0 +1,124 @@
+"""
+Network Tester - Concurrent Snapshot Readers Stress Test
+Runs one writer at a high sample rate against many reader threads and checks
+that every StatsSnapshot is consistent
+
+Usage: python benchmarks/bench_snapshot_readers.py [readers] [seconds] [poll_ms]
+
+The writer adds latencies 1, 2, 3, ... so each snapshot can be verified
+exactly: its history must be consecutive values ending at total_pings, and
+the average must match the count. Exits with status 1 on any inconsistency.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.stats_tracker_service import StatsTrackerService
+
+MAX_HISTORY = 10_000
+
+# Pause between reads of one reader; the GUI polls every 2-3 seconds
+POLL_SECONDS = 0.001
+
+
+def writer(tracker, stop, counts):
+    """Add measurements as fast as possible; occasionally record a DNS lookup."""
+    n = 0
+    while not stop.is_set():
+        n += 1
+        tracker.add_measurement(float(n))
+        if n % 100 == 0:
+            tracker.add_dns_measurement(5.0)
+    counts['writes'] = n
+
+
+def check_snapshot(snapshot):
+    """Return a description of what is inconsistent in a snapshot, or None."""
+    summary = snapshot.summary
+    total = summary['total_pings']
+    if summary['successful'] + summary['failed'] != total:
+        return f"torn counters: {summary['successful']} + {summary['failed']} != {total}"
+    if total and abs(summary['avg_latency'] - (total + 1) / 2) > 1e-6 * total:
+        return f"average {summary['avg_latency']} does not match {total} pings"
+    if len(snapshot) != min(total, MAX_HISTORY):
+        return f"history length {len(snapshot)} for {total} pings"
+
+    # Entries the writer has pushed out of the ring buffer since are left
+    # out, never replaced by newer ones
+    tail = snapshot.last_n(50)
+    expected = [float(n) for n in range(total - len(tail) + 1, total + 1)]
+    if [entry.latency for entry in tail] != expected:
+        return f"history tail {[e.latency for e in tail[-3:]]} does not end at {total}"
+    if total and summary['max_latency'] != float(total):
+        return f"max latency {summary['max_latency']} != {total}"
+    return None
+
+
+def reader(tracker, stop, results, index, poll_seconds):
+    """Take snapshots in a loop and verify each one."""
+    reads = reused = 0
+    errors = []
+    last = None
+    while not stop.wait(poll_seconds):
+        snapshot = tracker.get_snapshot()
+        reads += 1
+        if snapshot is last:
+            reused += 1
+            continue
+        if last is not None and snapshot.version < last.version:
+            errors.append(f"version went back from {last.version} to {snapshot.version}")
+        last = snapshot
+        problem = check_snapshot(snapshot)
+        if problem:
+            errors.append(problem)
+        # Full history read, as FullStatsWindow does for the recent view
+        if reads % 200 == 0:
+            entries = snapshot.entries()
+            if entries and entries[-1].latency != float(snapshot.summary['total_pings']):
+                errors.append("full history does not end at the snapshot")
+    results[index] = (reads, reused, errors)
+
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    poll_seconds = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else POLL_SECONDS
+
+    print("=" * 72)
+    print(f"Snapshot stress test - 1 writer, {readers} readers polling every "
+          f"{poll_seconds * 1000:g} ms, {seconds:g} s")
+    print("=" * 72)
+
+    tracker = StatsTrackerService(max_history=MAX_HISTORY)
+    stop = threading.Event()
+    counts = {}
+    results = [None] * readers
+    threads = [threading.Thread(target=writer, args=(tracker, stop, counts))]
+    threads += [threading.Thread(target=reader, args=(tracker, stop, results, i, poll_seconds)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    reads = sum(r[0] for r in results)
+    reused = sum(r[1] for r in results)
+    errors = [error for r in results for error in r[2]]
+    print(f"Writes:  {counts['writes']:>12,} ({counts['writes'] / seconds:,.0f}/s)")
+    print(f"Reads:   {reads:>12,} ({reads / seconds:,.0f}/s, {reused / max(reads, 1):.0%} reused an unchanged snapshot)")
+    print(f"Errors:  {len(errors):>12,}")
+    for error in errors[:10]:
+        print(f"  ⚠️ {error}")
+
+    final = check_snapshot(tracker.get_snapshot())
+    if final:
+        print(f"  ⚠️ final snapshot: {final}")
+    return 1 if errors or final else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Network Tester - Stats Summary Benchmark
+Times StatsTrackerService.get_summary() and add_measurement() at growing history sizes
+
+Usage: python benchmarks/bench_stats_summary.py [calls]
+
+get_summary() takes min/max from windows maintained on every add and
+percentiles from the latency sketch, so its cost should not grow with the
+history. The previous full scan of the history is timed for comparison.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.stats_tracker_service import StatsTrackerService
+
+HISTORY_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def scan_min_max(tracker):
+    """Min/max the way get_summary() computed them before: a scan of the history."""
+    successful_latencies = [e.latency for e in tracker.get_all() if e.latency is not None]
+    return min(successful_latencies), max(successful_latencies)
+
+
+def time_call(function, calls):
+    """Return the mean time of one call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print("=" * 72)
+    print(f"Stats summary benchmark - {calls} calls per size")
+    print("=" * 72)
+    print(f"{'history':>10} {'get_summary':>14} {'add (new)':>12} {'full scan (old)':>17}")
+
+    random.seed(1)
+    for size in HISTORY_SIZES:
+        tracker = StatsTrackerService(max_history=size)
+        for _ in range(size):
+            tracker.add_measurement(None if random.random() < 0.01 else random.lognormvariate(3, 0.5))
+
+        # Each call adds one measurement first, so no cached result is reused
+        summary_us = time_call(lambda: (tracker.add_measurement(random.lognormvariate(3, 0.5)),
+                                        tracker.get_summary()), calls)
+        add_us = time_call(lambda: tracker.add_measurement(random.lognormvariate(3, 0.5)), calls)
+        scan_us = time_call(lambda: scan_min_max(tracker), max(1, calls // 20))
+        print(f"{size:>10,} {summary_us - add_us:>11.1f} us {add_us:>9.1f} us {scan_us:>14.1f} us")
+
+    summary = tracker.get_summary()
+    print("\nPercentiles: " + ", ".join(f"p{pct:g} {value:.2f} ms" for pct, value in summary['percentiles'].items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -14,12 +14,20 @@ from tkinter import messagebox
 sys.path.insert(0, str(Path(__file__).parent))
 
 from services.ping_service import PingService
-from services.logger_service import LoggerService
+from services.icmp_probe_service import IcmpProbeService
+from services.probe_service import create_probe
+from services.dns_cache_service import DnsCacheService
+from services.burst_sampler import BurstSampler
+from services.logger_service import LoggerService, target_log_file
+from services.log_format import binary_log_file
+from services.measurement_store_service import MeasurementStoreService
 from services.email_service import EmailService
 from services.stats_tracker_service import StatsTrackerService
+from services.rolling_stats import RollingStats, WindowAlert
 from services.icon_service import IconService
 from services.single_instance_service import SingleInstanceService
-from src.gui_network_monitor import GUINetworkMonitor
+from src.gui_network_monitor import GUINetworkMonitor, MonitorTarget
+from src.adaptive_schedule import AdaptiveSchedule
 from src.gui_windows import QuickStatsWindow, FullStatsWindow
 from src.settings_window import SettingsWindow
 
@@ -27,11 +35,16 @@ from src.settings_window import SettingsWindow
 class NetworkTesterTrayApp:
     """System tray application for network monitoring."""
     
+    # Windows tray tooltips (NOTIFYICONDATA.szTip) hold 127 characters
+    TITLE_MAX_LENGTH = 127
+    
     def __init__(self):
         self.config = self.load_config()
         self.icon = None
         self.monitor = None
         self.stats_tracker = None
+        self.stats_trackers = {}
+        self.measurement_store = None
         self.icon_service = IconService()
         self.single_instance = SingleInstanceService("NetworkTester_GUI")
         
@@ -58,21 +71,129 @@ class NetworkTesterTrayApp:
             print(f"Error loading config file: {e}")
             return {}
     
+    @staticmethod
+    def _get_target_log_files(monitoring_config: dict) -> dict:
+        """
+        Map each configured target host to its log file.
+        
+        A single target keeps the configured log file; with several targets
+        every host gets its own file derived from it.
+        """
+        target_hosts = monitoring_config.get('target_host', '8.8.8.8')
+        if isinstance(target_hosts, str):
+            target_hosts = [target_hosts]
+        target_hosts = [host.strip() for host in target_hosts if host.strip()] or ['8.8.8.8']
+        
+        log_file = monitoring_config.get('log_file', 'log.txt')
+        if len(target_hosts) == 1:
+            return {target_hosts[0]: log_file}
+        
+        return {host: target_log_file(log_file, host) for host in target_hosts}
+    
     def _init_services(self):
         """Initialize all services."""
         # Get monitoring settings
         monitoring_config = self.config.get('monitoring', {})
-        target_host = monitoring_config.get('target_host', '8.8.8.8')
+        target_log_files = self._get_target_log_files(monitoring_config)
         check_interval = monitoring_config.get('check_interval_seconds', 30)
         latency_threshold = monitoring_config.get('latency_threshold_ms', 1000)
         failure_threshold = monitoring_config.get('failure_threshold', 3)
-        log_file = monitoring_config.get('log_file', 'log.txt')
+        probe_engine = monitoring_config.get('probe_engine', 'icmp')
+        http_method = monitoring_config.get('http_method', 'HEAD')
+        dns_config = monitoring_config.get('dns', {})
+        burst_config = monitoring_config.get('burst', {})
+        adaptive_config = monitoring_config.get('adaptive_sampling', {})
+        logging_config = monitoring_config.get('logging', {})
+        rolling_config = monitoring_config.get('rolling_windows', {})
+        window_alert = WindowAlert.from_config(rolling_config)
+        window_lengths = list(rolling_config.get('lengths_seconds', RollingStats.DEFAULT_LENGTHS))
+        if window_alert is not None:
+            # The alert rule needs its window tracked
+            window_lengths.append(window_alert.window)
+        log_format = logging_config.get('format', 'text')
+        binary_log = log_format == 'binary'
+        rotation_config = logging_config.get('rotation', {})
         
-        # Initialize services
-        ping_service = PingService(host=target_host)
-        logger_service = LoggerService(log_file=log_file)
-        # Pass log_file to stats_tracker so it can restore ping count from existing logs
-        self.stats_tracker = StatsTrackerService(max_history=1000, log_file=log_file)
+        # One SQLite store holds the measurements of all targets
+        self.measurement_store = None
+        if log_format == 'sqlite':
+            self.measurement_store = MeasurementStoreService(
+                db_path=logging_config.get('database', 'measurements.db'),
+                flush_interval=logging_config.get('flush_interval_seconds', 1.0),
+                batch_size=logging_config.get('batch_size', 256)
+            )
+        
+        # Initialize per-target services
+        targets = []
+        for target_host, log_file in target_log_files.items():
+            # URL-style targets (tcp://, udp://, http(s)://) select a probe type
+            probe = create_probe(target_host, http_method=http_method)
+            resolver = None
+            if dns_config.get('cache_enabled', True):
+                resolver = DnsCacheService(
+                    host=probe.host if probe is not None else target_host,
+                    ttl=dns_config.get('cache_ttl_seconds', 300),
+                    stale_policy=dns_config.get('stale_policy', DnsCacheService.STALE_SERVE),
+                    max_stale=dns_config.get('max_stale_seconds', 3600)
+                )
+            
+            if probe is not None:
+                ping_service = probe
+                ping_service.resolver = resolver
+            elif probe_engine == 'subprocess':
+                ping_service = PingService(host=target_host, resolver=resolver)
+            elif probe_engine == 'stream':
+                ping_service = PingService(
+                    host=target_host,
+                    mode=PingService.MODE_STREAM,
+                    stream_interval=check_interval,
+                    resolver=resolver
+                )
+            else:
+                # Falls back to the subprocess engine if no ICMP socket can be opened
+                ping_service = IcmpProbeService(host=target_host, resolver=resolver)
+            
+            # Burst mode: each check sends several closely spaced probes
+            if burst_config.get('enabled', False) and probe_engine != 'stream':
+                ping_service = BurstSampler(
+                    ping_service,
+                    count=burst_config.get('count', 5),
+                    spacing_ms=burst_config.get('spacing_ms', 200)
+                )
+            logger_service = LoggerService(
+                log_file=log_file,
+                batched=logging_config.get('batched', False),
+                flush_interval=logging_config.get('flush_interval_seconds', 1.0),
+                batch_size=logging_config.get('batch_size', 256),
+                fsync=logging_config.get('fsync', LoggerService.FSYNC_NONE),
+                binary=binary_log,
+                rotate_bytes=int(rotation_config.get('max_size_mb', 0) * 1024 * 1024),
+                rotate_seconds=rotation_config.get('max_age_hours', 0) * 3600,
+                compress=rotation_config.get('compress', True),
+                max_archives=rotation_config.get('keep_archives', 0),
+                max_archive_days=rotation_config.get('keep_days', 0),
+                store=self.measurement_store,
+                store_target=target_host
+            )
+            # Pass log_file to stats_tracker so it can restore ping count from existing logs
+            stats_tracker = StatsTrackerService(
+                max_history=1000,
+                log_file=binary_log_file(log_file) if binary_log else log_file,
+                store=self.measurement_store,
+                target=target_host,
+                windows=window_lengths
+            )
+            schedule = AdaptiveSchedule(
+                base_interval=check_interval,
+                fast_interval=adaptive_config.get('fast_interval_seconds', 2),
+                backoff_factor=adaptive_config.get('backoff_factor', 2.0),
+                enabled=adaptive_config.get('enabled', False)
+            )
+            targets.append(MonitorTarget(ping_service, logger_service, stats_tracker,
+                                         name=target_host, schedule=schedule))
+        
+        self.stats_trackers = {target.host: target.stats_tracker for target in targets}
+        self.stats_tracker = targets[0].stats_tracker
         
         # Initialize email service if configured
         email_service = None
@@ -99,15 +220,15 @@ class NetworkTesterTrayApp:
         
         # Create monitor
         self.monitor = GUINetworkMonitor(
-            ping_service=ping_service,
-            logger_service=logger_service,
-            stats_tracker=self.stats_tracker,
+            targets=targets,
             email_service=email_service,
             recipient_email=recipient_email,
             check_interval=check_interval,
             latency_threshold=latency_threshold,
             failure_threshold=failure_threshold,
-            status_callback=self.update_icon
+            status_callback=self.update_icon,
+            snapshot_interval=logging_config.get('snapshot_interval_seconds', 60),
+            window_alert=window_alert
         )
     
     def update_icon(self, latency):
@@ -116,7 +237,17 @@ class NetworkTesterTrayApp:
             color = self.icon_service.get_status_color(latency)
             new_icon = self.icon_service.create_network_icon(size=64, color=color)
             self.icon.icon = new_icon
-            self.icon.title = self.monitor.get_status_summary()
+            self._update_title()
+    
+    def _update_title(self):
+        """Show the status summary as the tray tooltip, cut to whole lines that fit."""
+        title = self.monitor.get_status_summary()
+        if len(title) > self.TITLE_MAX_LENGTH:
+            title = title[:self.TITLE_MAX_LENGTH - 1]
+            if "\n" in title:
+                title = title[:title.rfind("\n") + 1]
+            title += "…"
+        self.icon.title = title
     
     def on_clicked(self, icon, item):
         """Handle single click - show quick stats."""
@@ -165,19 +296,14 @@ class NetworkTesterTrayApp:
             root = tk.Tk()
             root.withdraw()
             
-            # Get log file path from config
-            monitoring_config = self.config.get('monitoring', {})
-            log_file = monitoring_config.get('log_file', 'log.txt')
+            # Clear the log files, including rotated segments
+            for target in self.monitor.targets:
+                target.logger_service.clear()
             
-            # Clear the log file
-            log_path = Path(log_file)
-            if log_path.exists():
-                log_path.unlink()  # Delete the file
-                print(f"Cleared log file: {log_file}")
-            
-            # Clear stats tracker
+            # Clear stats trackers
             print("Clearing statistics...")
-            self.stats_tracker.clear()
+            for stats_tracker in self.stats_trackers.values():
+                stats_tracker.clear()
             print("Statistics cleared successfully!")
             
             messagebox.showinfo(
@@ -216,7 +342,10 @@ class NetworkTesterTrayApp:
                 return
             
             # Create and show new window
-            self.full_stats_window = FullStatsWindow(self.stats_tracker)
+            self.full_stats_window = FullStatsWindow(
+                self.stats_tracker,
+                target_trackers=self.stats_trackers
+            )
             self.full_stats_window.show()
             self.full_stats_window = None  # Reset after window closes
         except Exception as e:
@@ -229,6 +358,8 @@ class NetworkTesterTrayApp:
             # Stop current monitor
             if self.monitor:
                 self.monitor.stop()
+            if self.measurement_store:
+                self.measurement_store.close()
             
             # Reload config from file
             self.config = self.load_config()
@@ -255,9 +386,10 @@ class NetworkTesterTrayApp:
                 """Callback when settings are saved or log is cleared."""
                 # Check if this is a clear stats request
                 if new_config.get('_clear_stats'):
-                    # Clear the stats tracker
+                    # Clear the stats trackers
                     print("Clearing statistics...")
-                    self.stats_tracker.clear()
+                    for stats_tracker in self.stats_trackers.values():
+                        stats_tracker.clear()
                     print("Statistics cleared successfully!")
                     # Remove the flag before updating config
                     del new_config['_clear_stats']
@@ -269,7 +401,7 @@ class NetworkTesterTrayApp:
                     print("Configuration reloaded successfully!")
                     # Update icon title immediately
                     if self.icon:
-                        self.icon.title = self.monitor.get_status_summary()
+                        self._update_title()
                 else:
                     print("Failed to reload configuration!")
             
@@ -289,10 +421,12 @@ class NetworkTesterTrayApp:
             """Run cleanup in a separate thread."""
             import time
             try:
-                # Stop monitoring first
+                # Stop monitoring first (also writes out queued log lines)
                 print("Stopping monitor...")
                 if self.monitor:
                     self.monitor.stop()
+                if self.measurement_store:
+                    self.measurement_store.close()
                 
                 print("Releasing lock...")
                 # Release the instance lock
@@ -0,0 +1,125 @@
+"""
+Burst Sampler - Aggregates several closely spaced probes into one check
+Follows Single Responsibility Principle (SRP)
+
+A single echo per interval is a noisy latency signal and can only measure
+0% or 100% loss. BurstSampler wraps any probe (PingService, IcmpProbeService
+or a ProbeService), sends N probes a few milliseconds apart and summarizes
+them as one BurstResult with min/avg/max, loss and jitter.
+
+Probes are sent on the spacing schedule without waiting for replies, and
+the burst shares one deadline, so lost probes do not delay the rest.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from services.probe_service import overlapped_pings
+
+
+class BurstResult:
+    """Aggregated result of one burst of probes."""
+
+    def __init__(self, timestamp: datetime, latencies: List[Optional[float]]):
+        """
+        Summarize a burst.
+
+        Args:
+            timestamp: When the burst started
+            latencies: Latency in ms of every probe, None for lost probes
+        """
+        self.timestamp = timestamp
+        self.sent = len(latencies)
+
+        received = [latency for latency in latencies if latency is not None]
+        self.received = len(received)
+        self.loss_pct = (self.sent - self.received) / self.sent * 100 if self.sent else 100.0
+
+        if received:
+            self.min_latency = min(received)
+            self.max_latency = max(received)
+            self.avg_latency = sum(received) / len(received)
+        else:
+            self.min_latency = self.max_latency = self.avg_latency = None
+
+        # Mean absolute difference between the latencies of consecutive
+        # replies (a plain average, not the smoothed RFC 3550 estimator)
+        if len(received) > 1:
+            self.jitter = sum(abs(b - a) for a, b in zip(received, received[1:])) / (len(received) - 1)
+        else:
+            self.jitter = 0.0
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Representative latency of the burst (average), None if all probes were lost."""
+        return self.avg_latency
+
+
+class BurstSampler:
+    """Wraps a probe so each check sends a burst of probes."""
+
+    # Seconds to wait for the last probe of probes without a timeout attribute
+    # (PingService gives up on a reply after 5 s)
+    DEFAULT_TIMEOUT = 5.0
+
+    def __init__(self, probe, count: int = 5, spacing_ms: float = 200.0):
+        """
+        Initialize the burst sampler.
+
+        Args:
+            probe: Any service with a ping() -> Optional[float] method
+            count: Number of probes per check
+            spacing_ms: Milliseconds between the start of consecutive probes
+        """
+        self.probe = probe
+        self.count = max(1, count)
+        self.spacing_ms = spacing_ms
+        self.last_burst: Optional[BurstResult] = None
+
+    def __getattr__(self, name):
+        # Expose host, resolver, last_phases, close() etc. of the wrapped probe
+        return getattr(self.probe, name)
+
+    @property
+    def host(self) -> str:
+        """Host of the wrapped probe."""
+        return self.probe.host
+
+    @host.setter
+    def host(self, value: str) -> None:
+        self.probe.host = value
+
+    def sample(self) -> BurstResult:
+        """
+        Send one burst of probes.
+
+        Probes with a ping_many() method (ICMP, UDP, HTTP and TCP probes)
+        send the burst themselves; other probes (PingService) run their
+        ping() calls overlapped in threads. Either way the burst takes about
+        (count - 1) * spacing plus at most one probe timeout.
+
+        Returns:
+            BurstResult: Aggregated result of the burst
+        """
+        timestamp = datetime.now()
+        spacing = self.spacing_ms / 1000
+
+        ping_many = getattr(self.probe, "ping_many", None)
+        if ping_many is not None:
+            latencies = ping_many(self.count, spacing)
+        else:
+            timeout = getattr(self.probe, "timeout", self.DEFAULT_TIMEOUT)
+            latencies = overlapped_pings([self.probe.ping] * self.count, spacing, timeout)
+
+        self.last_burst = BurstResult(timestamp, latencies)
+        return self.last_burst
+
+    def ping(self) -> Optional[float]:
+        """
+        Send one burst and return its average latency.
+
+        The full result is available as ``last_burst``.
+
+        Returns:
+            float: Average latency in ms, or None if every probe was lost
+        """
+        return self.sample().latency
@@ -0,0 +1,167 @@
+"""
+DNS Cache Service - Resolves a target host once and refreshes it in the background
+Follows Single Responsibility Principle (SRP)
+
+Probes use the cached address so that resolver latency is neither added to
+every sample nor mixed up with path latency. Lookup times are collected
+separately so they can be tracked as their own metric.
+"""
+import ipaddress
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+class DnsCacheService:
+    """Service to cache the resolved address of a host."""
+
+    STALE_SERVE = "serve_stale"
+    STALE_FAIL = "fail"
+
+    def __init__(self, host: str, ttl: float = 300.0, stale_policy: str = STALE_SERVE,
+                 max_stale: float = 3600.0, retry_interval: float = 30.0):
+        """
+        Initialize the DNS cache.
+
+        The system resolver does not expose record TTLs, so ``ttl`` is the
+        refresh period of the cached address.
+
+        Args:
+            host: Host name to resolve
+            ttl: Seconds before the cached address is refreshed
+            stale_policy: What to do when a refresh fails after the TTL expired:
+                "serve_stale" keeps using the last address for up to
+                ``max_stale`` seconds, "fail" stops returning it as soon
+                as the refresh has had ``retry_interval`` seconds to complete
+            max_stale: Seconds past the TTL a stale address may be served
+            retry_interval: Seconds between refresh attempts after a failure
+        """
+        self._host = host
+        self.ttl = ttl
+        self.stale_policy = stale_policy
+        self.max_stale = max_stale
+        self.retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._address = None
+        self._resolved_at = 0.0
+        self._last_attempt = 0.0
+        self._refreshing = False
+        self._lookups: List[Tuple[datetime, Optional[float]]] = []
+        self._is_literal = self._is_ip_literal(host)
+
+    @property
+    def host(self) -> str:
+        """The host name being resolved."""
+        return self._host
+
+    @host.setter
+    def host(self, value: str) -> None:
+        """Change the host and drop the cached address."""
+        if value != self._host:
+            self._host = value
+            self._is_literal = self._is_ip_literal(value)
+            self.invalidate()
+
+    @staticmethod
+    def _is_ip_literal(host: str) -> bool:
+        """Check whether host is already an IP address."""
+        try:
+            ipaddress.ip_address(host)
+            return True
+        except ValueError:
+            return False
+
+    def resolve(self) -> Optional[str]:
+        """
+        Get the address to probe.
+
+        The first call resolves synchronously; later calls return the cached
+        address and start a background refresh once the TTL has expired.
+
+        Returns:
+            str: IP address, or None if the host cannot be resolved
+        """
+        if self._is_literal:
+            return self.host
+
+        now = time.monotonic()
+        with self._lock:
+            address = self._address
+            age = now - self._resolved_at
+            start_refresh = (
+                address is not None and age >= self.ttl and not self._refreshing
+                and now - self._last_attempt >= min(self.retry_interval, self.ttl)
+            )
+            if start_refresh:
+                self._refreshing = True
+
+        if address is None:
+            if self._last_attempt and now - self._last_attempt < self.retry_interval:
+                # Resolver is failing; don't retry (and log) on every probe
+                return None
+            return self._lookup()
+
+        if start_refresh:
+            threading.Thread(target=self._lookup, daemon=True).start()
+
+        if age >= self.ttl and not self._serve_stale(age):
+            return None
+
+        return address
+
+    def _serve_stale(self, age: float) -> bool:
+        """
+        Decide whether an address older than the TTL may still be used.
+
+        Args:
+            age: Seconds since the address was resolved
+        """
+        if self.stale_policy == self.STALE_FAIL:
+            # Allow one refresh period for the background lookup to land
+            return age < self.ttl + self.retry_interval
+        return age < self.ttl + self.max_stale
+
+    def _lookup(self) -> Optional[str]:
+        """
+        Resolve the host and update the cache.
+
+        Returns:
+            str: The resolved address, or None if resolution failed
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            address = socket.getaddrinfo(self.host, None)[0][4][0]
+        except (OSError, UnicodeError):
+            address = None
+        lookup_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+
+        with self._lock:
+            self._last_attempt = time.monotonic()
+            self._refreshing = False
+            self._lookups.append((datetime.now(), lookup_ms if address is not None else None))
+            if address is not None:
+                self._address = address
+                self._resolved_at = self._last_attempt
+
+        return address
+
+    def pop_lookups(self) -> List[Tuple[datetime, Optional[float]]]:
+        """
+        Take the lookups performed since the previous call.
+
+        Returns:
+            List of (timestamp, lookup time in ms or None if it failed)
+        """
+        with self._lock:
+            lookups, self._lookups = self._lookups, []
+        return lookups
+
+    def invalidate(self) -> None:
+        """Drop the cached address so the next resolve() looks it up again."""
+        with self._lock:
+            self._address = None
+            self._resolved_at = 0.0
+            self._last_attempt = 0.0
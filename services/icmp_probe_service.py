@@ -0,0 +1,321 @@
+"""
+ICMP Probe Service - Measures latency with in-process ICMP echo requests
+Follows Single Responsibility Principle (SRP)
+
+Drop-in replacement for PingService: instead of spawning the system ``ping``
+binary for every check, echo requests are sent from an ICMP socket owned by
+this process. Unprivileged ICMP datagram sockets are used where the kernel
+allows them (Linux ``net.ipv4.ping_group_range``), raw sockets otherwise. If
+neither can be opened (e.g. Windows without admin rights) the service falls
+back to the subprocess-based PingService.
+"""
+import itertools
+import os
+import select
+import socket
+import struct
+import time
+from typing import List, Optional
+
+from services.dns_cache_service import DnsCacheService
+from services.ping_service import PingService
+from services.probe_service import overlapped_pings
+
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMPV6_ECHO_REQUEST = 128
+ICMPV6_ECHO_REPLY = 129
+
+_ICMP_HEADER = struct.Struct("!BBHHH")
+_PAYLOAD_SIZE = 56
+
+# Raw sockets see every ICMP reply on the host, so each instance gets its own id
+_identifiers = itertools.count(os.getpid())
+
+
+def _checksum(data: bytes) -> int:
+    """
+    Compute the RFC 1071 Internet checksum.
+
+    Args:
+        data: Bytes to checksum
+
+    Returns:
+        int: 16-bit one's complement checksum
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class IcmpProbeService:
+    """Service to measure latency with native ICMP echo requests."""
+
+    def __init__(self, host: str = "8.8.8.8", timeout: float = 5.0,
+                 resolver: Optional[DnsCacheService] = None):
+        """
+        Initialize the ICMP probe service.
+
+        Args:
+            host: The host to probe (default: Google DNS 8.8.8.8)
+            timeout: Seconds to wait for an echo reply (default: 5)
+            resolver: Optional DNS cache providing the address to probe
+        """
+        self.host = host
+        self.timeout = timeout
+        self.resolver = resolver
+        self.backend = None
+
+        self._socket = None
+        self._family = None
+        self._address = None
+        self._resolved_host = None
+        self._identifier = next(_identifiers) & 0xFFFF
+        self._sequence = 0
+        self._fallback = None
+
+    def ping(self) -> Optional[float]:
+        """
+        Send one echo request and return latency in milliseconds.
+
+        Returns:
+            float: Latency in milliseconds, or None if no reply arrived
+        """
+        if self._fallback is not None:
+            self._fallback.host = self.host
+            return self._fallback.ping()
+
+        try:
+            if not self._prepare():
+                return None
+            if self._fallback is not None:
+                return self._fallback.ping()
+            # close() from another thread must not swap the socket mid-echo
+            sock = self._socket
+            if sock is None:
+                return None
+            return self._echo(sock)
+
+        except (OSError, ValueError):
+            return None
+
+    def ping_many(self, count: int, spacing: float) -> List[Optional[float]]:
+        """
+        Send count echo requests spacing seconds apart and match the replies.
+
+        Replies are matched by sequence number while the remaining requests
+        are sent; all share one deadline, timeout seconds after the last send.
+
+        Args:
+            count: Number of echo requests
+            spacing: Seconds between consecutive requests
+
+        Returns:
+            List of latencies in ms in send order, None for lost requests
+        """
+        latencies: List[Optional[float]] = [None] * count
+        try:
+            if self._fallback is None and not self._prepare():
+                return latencies
+            if self._fallback is not None:
+                self._fallback.host = self.host
+                return overlapped_pings([self._fallback.ping] * count, spacing, self.timeout)
+
+            # close() from another thread must not swap the socket mid-burst
+            sock = self._socket
+            if sock is None:
+                return latencies
+            spacing_ns = int(spacing * 1_000_000_000)
+            outstanding = {}
+            sent = 0
+            next_send_ns = time.perf_counter_ns()
+            deadline_ns = None
+            while True:
+                now_ns = time.perf_counter_ns()
+                if sent < count and now_ns >= next_send_ns:
+                    packet = self._build_packet()
+                    outstanding[self._sequence] = (sent, time.perf_counter_ns())
+                    sock.sendto(packet, self._address)
+                    sent += 1
+                    next_send_ns += spacing_ns
+                    if sent == count:
+                        deadline_ns = now_ns + int(self.timeout * 1_000_000_000)
+                    continue
+                if sent == count and (not outstanding or now_ns >= deadline_ns):
+                    break
+
+                wake_ns = next_send_ns if sent < count else deadline_ns
+                readable, _, _ = select.select([sock], [], [], max(0, wake_ns - now_ns) / 1_000_000_000)
+                if readable:
+                    data, _ = sock.recvfrom(2048)
+                    received_ns = time.perf_counter_ns()
+                    sequence = self._reply_sequence(data)
+                    if sequence in outstanding:
+                        index, start_ns = outstanding.pop(sequence)
+                        latencies[index] = (received_ns - start_ns) / 1_000_000
+            return latencies
+
+        except (OSError, ValueError):
+            return latencies
+
+    def _prepare(self) -> bool:
+        """
+        Resolve the target and open the socket, or switch to the subprocess fallback.
+
+        Returns:
+            bool: False if the host could not be resolved
+        """
+        if self.resolver is not None:
+            self.resolver.host = self.host
+            target = self.resolver.resolve()
+            if target is None:
+                return False
+        else:
+            target = self.host
+
+        if self._resolved_host != target:
+            self._resolve(target)
+        if self._socket is None and not self._open_socket():
+            # No ICMP socket available on this system
+            self._fallback = PingService(host=self.host, resolver=self.resolver)
+            self.backend = "subprocess"
+        return True
+
+    def close(self) -> None:
+        """Close the underlying socket."""
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def _resolve(self, target: str) -> None:
+        """
+        Resolve the target and reset the socket if the address family changed.
+
+        Args:
+            target: Host name or IP address to probe
+        """
+        info = socket.getaddrinfo(target, None)[0]
+        family, address = info[0], info[4]
+
+        if family != self._family:
+            self.close()
+            self.backend = None
+
+        self._family = family
+        self._address = address
+        self._resolved_host = target
+
+    def _open_socket(self) -> bool:
+        """
+        Open an ICMP socket, preferring unprivileged datagram sockets.
+
+        Returns:
+            bool: True if a socket was opened, False otherwise
+        """
+        proto = socket.IPPROTO_ICMPV6 if self._family == socket.AF_INET6 else socket.IPPROTO_ICMP
+
+        for sock_type, backend in ((socket.SOCK_DGRAM, "dgram"), (socket.SOCK_RAW, "raw")):
+            try:
+                self._socket = socket.socket(self._family, sock_type, proto)
+                self._socket.setblocking(False)
+                self.backend = backend
+                return True
+            except (OSError, AttributeError):
+                continue
+
+        return False
+
+    def _build_packet(self) -> bytes:
+        """Build an echo request packet with the next sequence number."""
+        self._sequence = (self._sequence + 1) & 0xFFFF
+        request_type = ICMPV6_ECHO_REQUEST if self._family == socket.AF_INET6 else ICMP_ECHO_REQUEST
+        payload = struct.pack("!Q", time.perf_counter_ns()).ljust(_PAYLOAD_SIZE, b"\x00")
+
+        header = _ICMP_HEADER.pack(request_type, 0, 0, self._identifier, self._sequence)
+        # The kernel fills in the ICMPv6 checksum (it covers a pseudo-header)
+        if self._family != socket.AF_INET6:
+            checksum = _checksum(header + payload)
+            header = _ICMP_HEADER.pack(request_type, 0, checksum, self._identifier, self._sequence)
+
+        return header + payload
+
+    def _echo(self, sock: socket.socket) -> Optional[float]:
+        """
+        Send an echo request and wait for the matching reply.
+
+        Args:
+            sock: ICMP socket to use; a socket closed meanwhile raises OSError
+                or ValueError
+
+        Returns:
+            float: Latency in milliseconds, or None on timeout
+        """
+        packet = self._build_packet()
+        sequence = self._sequence
+
+        start_ns = time.perf_counter_ns()
+        sock.sendto(packet, self._address)
+        deadline_ns = start_ns + int(self.timeout * 1_000_000_000)
+
+        while True:
+            remaining = (deadline_ns - time.perf_counter_ns()) / 1_000_000_000
+            if remaining <= 0:
+                return None
+
+            readable, _, _ = select.select([sock], [], [], remaining)
+            if not readable:
+                return None
+
+            data, _ = sock.recvfrom(2048)
+            received_ns = time.perf_counter_ns()
+
+            if self._is_reply(data, sequence):
+                return (received_ns - start_ns) / 1_000_000
+
+    def _is_reply(self, data: bytes, sequence: int) -> bool:
+        """
+        Check whether a received packet is the reply to our request.
+
+        Args:
+            data: Raw packet bytes as returned by the socket
+            sequence: Sequence number of the outstanding request
+
+        Returns:
+            bool: True if the packet is the matching echo reply
+        """
+        return self._reply_sequence(data) == sequence
+
+    def _reply_sequence(self, data: bytes) -> Optional[int]:
+        """
+        Get the sequence number of a received echo reply to this service.
+
+        Args:
+            data: Raw packet bytes as returned by the socket
+
+        Returns:
+            int: Sequence number, or None if the packet is not one of our replies
+        """
+        # Raw IPv4 sockets deliver the IP header as well
+        if self.backend == "raw" and self._family == socket.AF_INET:
+            data = data[(data[0] & 0x0F) * 4:]
+
+        if len(data) < _ICMP_HEADER.size:
+            return None
+
+        reply_type, _, _, identifier, reply_sequence = _ICMP_HEADER.unpack_from(data)
+        expected_type = ICMPV6_ECHO_REPLY if self._family == socket.AF_INET6 else ICMP_ECHO_REPLY
+
+        if reply_type != expected_type:
+            return None
+
+        # Datagram sockets rewrite the identifier, the kernel already filtered
+        if self.backend != "dgram" and identifier != self._identifier:
+            return None
+        return reply_sequence
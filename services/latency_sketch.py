@@ -0,0 +1,190 @@
+"""
+Latency Sketch - Mergeable histogram for streaming latency percentiles
+Follows Single Responsibility Principle (SRP)
+
+Latencies are counted in logarithmic buckets, each about 2% wider than the
+one before (like an HDR histogram with 1% relative precision):
+- adding a latency is O(1): one logarithm and one dictionary update
+- memory is bounded: 1 us to 1 hour spans about 1,100 buckets, and only
+  buckets that were hit are stored
+- sketches of different targets or time windows merge by adding bucket
+  counts, giving the same sketch as if every latency had been added to one
+- percentiles are within 1% of the exact value
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional: vectorized add_all()
+    np = None
+
+
+class LatencySketch:
+    """Log-bucketed latency histogram answering percentile queries."""
+
+    RELATIVE_ACCURACY = 0.01
+    # Latencies below this (ms) are counted as zero
+    MIN_LATENCY = 0.001
+    PERCENTILES = (50, 90, 95, 99, 99.9)
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        """
+        Args:
+            relative_accuracy: Maximum relative error of a percentile
+        """
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        # Bucket i counts latencies in (gamma^(i-1), gamma^i]
+        self._buckets: Dict[int, int] = {}
+        # Sorted bucket keys, None after a new bucket was hit
+        self._keys = None
+        self._zeros = 0
+        self.count = 0
+        # Percentiles of the last query and the count they were computed at
+        self._cached = (None, None)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, latency: float, count: int = 1) -> None:
+        """
+        Count a latency.
+
+        Args:
+            latency: Latency in ms
+            count: Number of times it was measured
+        """
+        if latency < self.MIN_LATENCY:
+            self._zeros += count
+        else:
+            key = math.ceil(math.log(latency) / self._log_gamma)
+            if key in self._buckets:
+                self._buckets[key] += count
+            else:
+                self._buckets[key] = count
+                self._keys = None
+        self.count += count
+
+    def add_all(self, latencies: Iterable[float]) -> None:
+        """
+        Count many latencies, vectorized for NumPy arrays.
+
+        Args:
+            latencies: Latencies in ms (no failed measurements)
+        """
+        if np is not None and isinstance(latencies, np.ndarray):
+            small = latencies < self.MIN_LATENCY
+            self._zeros += int(small.sum())
+            keys = np.ceil(np.log(latencies[~small]) / self._log_gamma).astype(np.int64)
+            if len(keys):
+                # Keys span a few hundred buckets: count them in linear time
+                lowest = int(keys.min())
+                counts = np.bincount(keys - lowest)
+                for offset in np.flatnonzero(counts).tolist():
+                    key = lowest + offset
+                    self._buckets[key] = self._buckets.get(key, 0) + int(counts[offset])
+                self._keys = None
+            self.count += len(latencies)
+        else:
+            for latency in latencies:
+                self.add(latency)
+
+    def merge(self, other: "LatencySketch") -> None:
+        """
+        Add the latencies counted by another sketch.
+
+        Raises:
+            ValueError: If the sketches were created with different accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge latency sketches of different accuracy")
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._keys = None
+        self._zeros += other._zeros
+        self.count += other.count
+
+    @classmethod
+    def merged(cls, sketches: Iterable["LatencySketch"]) -> "LatencySketch":
+        """Create a sketch of the latencies of several sketches (e.g. all targets)."""
+        result = cls()
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def clear(self) -> None:
+        """Forget all latencies."""
+        self._buckets.clear()
+        self._keys = None
+        self._zeros = 0
+        self.count = 0
+        self._cached = (None, None)
+
+    def percentiles(self, percentiles: Iterable[float] = PERCENTILES) -> Dict[float, float]:
+        """
+        Compute several percentiles in one pass over the buckets.
+
+        Args:
+            percentiles: Percentiles between 0 and 100
+
+        Returns:
+            Dictionary of percentile -> latency in ms (empty without latencies)
+        """
+        percentiles = tuple(percentiles)
+        cached_count, cached = self._cached
+        if cached_count == self.count and cached is not None and tuple(cached) == percentiles:
+            return dict(cached)
+        if not self.count:
+            return {}
+
+        result = {}
+        if self._keys is None:
+            self._keys = sorted(self._buckets)
+        keys = self._keys
+        position, seen = 0, self._zeros
+        for pct in sorted(percentiles):
+            # Latency at 0-based rank floor(pct% of count - 1)
+            rank = pct / 100 * (self.count - 1)
+            while seen <= rank and position < len(keys):
+                seen += self._buckets[keys[position]]
+                position += 1
+            if position == 0:
+                result[pct] = 0.0
+            else:
+                # Midpoint of the bucket (relative error <= relative_accuracy)
+                result[pct] = 2 * self._gamma ** keys[position - 1] / (self._gamma + 1)
+        result = {pct: result[pct] for pct in percentiles}
+        self._cached = (self.count, result)
+        return dict(result)
+
+    def quantile(self, pct: float) -> Optional[float]:
+        """
+        Compute one percentile.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Latency in ms, or None without latencies
+        """
+        return self.percentiles((pct,)).get(pct)
+
+    def to_dict(self) -> Dict:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            'accuracy': self.relative_accuracy,
+            'zeros': self._zeros,
+            'buckets': {str(key): count for key, count in self._buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencySketch":
+        """Create a sketch from to_dict() output."""
+        sketch = cls(data['accuracy'])
+        sketch._zeros = data['zeros']
+        sketch._buckets = {int(key): count for key, count in data['buckets'].items()}
+        sketch._keys = None
+        sketch.count = sketch._zeros + sum(sketch._buckets.values())
+        return sketch
@@ -0,0 +1,861 @@
+"""
+Log Analysis - Bulk parsing and aggregate analysis of measurement logs
+Follows Single Responsibility Principle (SRP)
+
+With NumPy installed, text logs are parsed in chunks by scanning the raw
+bytes: newline positions are found vectorized and the fixed-width timestamp
+and the latency digits are gathered by offset, without regular expressions,
+strptime or per-line float() calls. Binary logs are read straight into a
+structured array. Aggregates (percentiles, loss rate, hourly buckets and
+outages) are then computed on the arrays.
+
+Without NumPy the same results are produced by a pure-Python line parser.
+
+Large logs are split into line-aligned byte ranges that are parsed by a pool
+of worker processes (analyze_logs); the partial aggregates are merged in log
+order, joining outages that straddle range boundaries.
+
+Command line:
+    python -m services.log_analysis log.txt [more logs] [--archives] [--workers N]
+                                    [--hourly] [--outages] [--min-failures N]
+"""
+import bisect
+import gzip
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional: falls back to the pure-Python parser
+    np = None
+
+from services.log_format import (
+    FLAG_BURST, FLAG_DNS, FLAG_NO_RESPONSE, HEADER, RECORD, archived_segments, is_binary_log,
+    parse_burst_details, parse_text_line, read_segment_records
+)
+
+HAS_NUMPY = np is not None
+
+KIND_CHECK = 0
+KIND_DNS = 1
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Counters that add up across log segments, as stored in archive summaries
+COUNTERS = (
+    'total_pings', 'failed_pings', 'total_latency',
+    'dns_lookups', 'dns_failures', 'total_dns_ms',
+    'burst_checks', 'burst_failed_checks', 'burst_probes_sent',
+    'burst_probes_lost', 'total_jitter'
+)
+
+# Byte layout of a text log line: "[YYYY-MM-DD HH:MM:SS] Latency: 25.00 ms"
+_PREFIX_LENGTH = 22
+_LATENCY_TAG = b"Latency: "
+_DNS_TAG = b"DNS: "
+_BURST_TAG = " (burst "
+_MAX_DIGITS = 12
+_WINDOW = 48
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class LogArrays:
+    """Measurements of a log as parallel columns."""
+
+    def __init__(self, timestamps, latencies, kinds, burst_lines: List[str]):
+        """
+        Args:
+            timestamps: Local wall-clock seconds since 1970-01-01 (naive)
+            latencies: Latency in ms, NaN for failed measurements
+            kinds: KIND_CHECK or KIND_DNS per measurement
+            burst_lines: Raw text of burst check lines, whose details
+                (probes sent, loss, jitter) are not part of the columns
+        """
+        self.timestamps = timestamps
+        self.latencies = latencies
+        self.kinds = kinds
+        self.burst_lines = burst_lines
+
+    def __len__(self) -> int:
+        return len(self.latencies)
+
+
+def load_log(path, end: Optional[int] = None, chunk_size: int = 4 * 1024 * 1024,
+             start: int = 0) -> LogArrays:
+    """
+    Parse a text or binary log into columns.
+
+    Uses NumPy arrays when available, Python lists otherwise.
+
+    Args:
+        path: Log file
+        end: Only parse up to this byte offset
+        chunk_size: Bytes parsed per NumPy pass over a text log
+        start: Byte offset of the first line (or record) to parse;
+            must be line-aligned, see split_ranges()
+    """
+    path = Path(path)
+    if path.suffix == ".gz":
+        binary = Path(path.stem).suffix == ".bin"
+    else:
+        binary = is_binary_log(path)
+
+    if binary:
+        return _load_binary(path, start, end)
+    if HAS_NUMPY:
+        return _load_text_numpy(path, start, end, chunk_size)
+    return _load_text_python(path, start, end)
+
+
+def _load_binary(path: Path, start: int, end: Optional[int]) -> LogArrays:
+    """Read a binary log; epoch timestamps are shifted to local wall-clock time."""
+    if HAS_NUMPY:
+        dtype = np.dtype([('epoch', '<f8'), ('latency', '<f4'), ('flags', 'u1')])
+        if path.suffix == ".gz":
+            with gzip.open(path, "rb") as f:
+                data = f.read()
+            start = max(start, HEADER.size)
+            count = max(0, (len(data) - start) // RECORD.size)
+            records = np.frombuffer(data, dtype=dtype, count=count, offset=start)
+        else:
+            start = max(start, HEADER.size)
+            size = path.stat().st_size if end is None else end
+            count = max(0, (size - start) // RECORD.size)
+            records = np.fromfile(path, dtype=dtype, count=count, offset=start)
+        failed = (records['flags'] & FLAG_NO_RESPONSE) != 0
+        latencies = np.where(failed, np.nan, records['latency'].astype(np.float64))
+        kinds = np.where(records['flags'] & FLAG_DNS, KIND_DNS, KIND_CHECK).astype(np.uint8)
+        # One UTC offset for the whole log; a DST change shifts later hours by the difference
+        epochs = records['epoch']
+        offset = time.localtime(epochs[0]).tm_gmtoff if len(epochs) else 0
+        return LogArrays((epochs + offset).astype(np.int64), latencies, kinds, [])
+
+    records = read_segment_records(path)
+    first = max(0, start - HEADER.size) // RECORD.size
+    last = None if end is None else max(0, (end - HEADER.size) // RECORD.size)
+    records = itertools.islice(records, first, last)
+    timestamps, latencies, kinds = [], [], []
+    for epoch, latency, flags in records:
+        timestamps.append(int((datetime.fromtimestamp(epoch) - _EPOCH).total_seconds()))
+        latencies.append(math.nan if flags & FLAG_NO_RESPONSE else latency)
+        kinds.append(KIND_DNS if flags & FLAG_DNS else KIND_CHECK)
+    return LogArrays(timestamps, latencies, kinds, [])
+
+
+def _load_text_python(path: Path, start: int, end: Optional[int]) -> LogArrays:
+    """Parse a text log line by line (fallback without NumPy)."""
+    timestamps, latencies, kinds, burst_lines = [], [], [], []
+    position = start
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            position += len(raw)
+            if end is not None and position > end:
+                break
+            line = raw.decode("utf-8", errors="replace")
+            parsed = parse_text_line(line)
+            if parsed is None:
+                continue
+            timestamp, latency, flags, _ = parsed
+            timestamps.append(int((timestamp - _EPOCH).total_seconds()))
+            latencies.append(math.nan if latency is None else latency)
+            kinds.append(KIND_DNS if flags & FLAG_DNS else KIND_CHECK)
+            if flags & FLAG_BURST:
+                burst_lines.append(line.rstrip("\r\n"))
+    return LogArrays(timestamps, latencies, kinds, burst_lines)
+
+
+def _load_text_numpy(path: Path, start: int, end: Optional[int], chunk_size: int) -> LogArrays:
+    """Parse a text log in chunks of whole lines with vectorized byte scanning."""
+    columns = ([], [], [])
+    burst_lines = []
+    remaining = None if end is None else end - start
+    carry = b""
+
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        f.seek(start)
+        while True:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            data = f.read(size) if size > 0 else b""
+            if remaining is not None:
+                remaining -= len(data)
+            if not data:
+                # A last line without newline still counts
+                chunk, carry = (carry + b"\n" if carry else b""), b""
+            else:
+                data = carry + data
+                cut = data.rfind(b"\n") + 1
+                chunk, carry = data[:cut], data[cut:]
+
+            if chunk:
+                for column, values in zip(columns, _parse_chunk(chunk, burst_lines)):
+                    column.append(values)
+            if not data:
+                break
+
+    if not columns[0]:
+        return LogArrays(np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.uint8), burst_lines)
+    timestamps, latencies, kinds = (np.concatenate(column) for column in columns)
+    return LogArrays(timestamps, latencies, kinds, burst_lines)
+
+
+def _parse_chunk(chunk: bytes, burst_lines: List[str]):
+    """
+    Parse a block of complete lines.
+
+    Args:
+        chunk: Lines ending with a newline
+        burst_lines: Burst check lines of the block are appended here
+
+    Returns:
+        Tuple of (timestamps, latencies, kinds) arrays for the latency and
+        DNS lines of the block
+    """
+    buf = np.frombuffer(chunk, dtype=np.uint8)
+    padded = np.concatenate([buf, np.zeros(_WINDOW, dtype=np.uint8)])
+
+    line_ends = np.flatnonzero(buf == ord("\n"))
+    starts = np.concatenate([[0], line_ends[:-1] + 1])
+    lengths = line_ends - starts
+
+    # "[YYYY-MM-DD HH:MM:SS] " prefix
+    valid = (lengths > _PREFIX_LENGTH + len(_DNS_TAG)) & (padded[starts] == ord("[")) \
+        & (padded[starts + 20] == ord("]"))
+    starts, line_ends = starts[valid], line_ends[valid]
+
+    # The first bytes of every line as one (lines x _WINDOW) matrix
+    rows = np.lib.stride_tricks.sliding_window_view(padded, _WINDOW)[starts]
+
+    latency_value = _PREFIX_LENGTH + len(_LATENCY_TAG)
+    dns_value = _PREFIX_LENGTH + len(_DNS_TAG)
+    is_latency = (rows[:, _PREFIX_LENGTH:latency_value] == _bytes(_LATENCY_TAG)).all(axis=1)
+    is_dns = ~is_latency & (rows[:, _PREFIX_LENGTH:dns_value] == _bytes(_DNS_TAG)).all(axis=1)
+    keep = is_latency | is_dns
+    starts, line_ends, rows, is_latency = starts[keep], line_ends[keep], rows[keep], is_latency[keep]
+
+    number = np.where(is_latency[:, None], rows[:, latency_value:latency_value + _MAX_DIGITS],
+                      rows[:, dns_value:dns_value + _MAX_DIGITS])
+    latencies, well_formed = _parse_latencies(number)
+
+    # Burst details "(burst ...)" close the line; only those lines are checked further
+    last = np.where(padded[line_ends - 1] == ord("\r"), line_ends - 2, line_ends - 1)
+    candidates = np.flatnonzero(is_latency & well_formed & (padded[last] == ord(")")))
+    for index in candidates:
+        line = chunk[starts[index]:last[index] + 1].decode("utf-8", errors="replace")
+        if _BURST_TAG in line:
+            burst_lines.append(line)
+
+    rows, latencies, is_latency = rows[well_formed], latencies[well_formed], is_latency[well_formed]
+    kinds = np.where(is_latency, KIND_CHECK, KIND_DNS).astype(np.uint8)
+    return _timestamps(rows), latencies, kinds
+
+
+def _bytes(text: bytes):
+    """View bytes as a uint8 array for comparisons."""
+    return np.frombuffer(text, dtype=np.uint8)
+
+
+def _parse_latencies(number):
+    """
+    Parse "12.34 ms", "NO RESPONSE" and "FAILED" values.
+
+    Args:
+        number: (lines x _MAX_DIGITS) bytes starting at each value
+
+    Returns:
+        Tuple of (latencies with NaN for failures, well_formed mask)
+    """
+    failed = (number[:, 0] == ord("N")) | (number[:, 0] == ord("F"))
+    latencies = np.full(len(number), np.nan)
+    well_formed = failed.copy()
+
+    # Two decimals are always written, so the rows with the dot at the same
+    # position share one weight vector for their digits (in hundredths)
+    is_dot = number == ord(".")
+    dot = np.where(is_dot.any(axis=1) & ~failed, is_dot.argmax(axis=1), 0)
+    digits = number - np.uint8(ord("0"))  # non-digits wrap around to > 9
+    for position in np.unique(dot[dot > 0]).tolist():
+        selected = np.flatnonzero(dot == position)
+        value_digits = np.concatenate(
+            [digits[selected, :position], digits[selected, position + 1:position + 3]], axis=1)
+        ok = (value_digits <= 9).all(axis=1)
+        weights = 10 ** np.arange(position + 1, -1, -1, dtype=np.int64)
+        latencies[selected[ok]] = (value_digits[ok].astype(np.int64) @ weights) / 100.0
+        well_formed[selected[ok]] = True
+    return latencies, well_formed
+
+
+# Digit weights of year, month, day, hour, minute and second in "YYYY-MM-DD HH:MM:SS"
+_TIMESTAMP_WEIGHTS = np.zeros((19, 6)) if HAS_NUMPY else None
+if HAS_NUMPY:
+    for _field, (_offset, _width) in enumerate(((0, 4), (5, 2), (8, 2), (11, 2), (14, 2), (17, 2))):
+        _TIMESTAMP_WEIGHTS[_offset:_offset + _width, _field] = 10 ** np.arange(_width - 1, -1, -1)
+
+
+def _timestamps(rows):
+    """Convert the fixed-width "[YYYY-MM-DD HH:MM:SS]" line prefixes to naive epoch seconds."""
+    # Separators have zero weight; a float product is exact and uses BLAS
+    digits = (rows[:, 1:20] - np.uint8(ord("0"))).astype(np.float64)
+    fields = (digits @ _TIMESTAMP_WEIGHTS).astype(np.int64)
+    year, month, day, hour, minute, second = fields.T
+
+    # Days since 1970-01-01 of a proleptic Gregorian date (Howard Hinnant's algorithm)
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+
+    return days * 86400 + hour * 3600 + minute * 60 + second
+
+
+def to_datetime(seconds) -> datetime:
+    """Convert naive epoch seconds from LogArrays back to a datetime."""
+    return _EPOCH + timedelta(seconds=int(seconds))
+
+
+def summarize(arrays: LogArrays, with_percentiles: bool = True) -> Dict:
+    """
+    Compute totals of the checks and DNS lookups in a log.
+
+    Args:
+        arrays: Parsed log
+        with_percentiles: False skips sorting the latencies for percentiles
+
+    Returns:
+        Dictionary with checks, failed, total_latency, min/avg/max latency,
+        loss_pct, percentiles, trailing_failures (failed checks at the end),
+        dns_lookups, dns_failures, total_dns_ms, first and last timestamps
+    """
+    if HAS_NUMPY and isinstance(arrays.latencies, np.ndarray):
+        kinds = arrays.kinds
+        checks = arrays.latencies[kinds == KIND_CHECK]
+        dns = arrays.latencies[kinds == KIND_DNS]
+        failed = np.isnan(checks)
+        ok = checks[~failed]
+        succeeded = np.flatnonzero(~failed)
+        trailing = len(checks) - (succeeded[-1] + 1) if len(succeeded) else len(checks)
+        check_times = arrays.timestamps[kinds == KIND_CHECK]
+        percentiles = {}
+        if with_percentiles and len(ok):
+            percentiles = dict(zip(PERCENTILES, np.percentile(ok, PERCENTILES).tolist()))
+        dns_failed = int(np.isnan(dns).sum())
+        total_latency, total_dns = float(ok.sum()), float(np.nansum(dns))
+        minimum, maximum = (float(ok.min()), float(ok.max())) if len(ok) else (None, None)
+        first, last = (check_times[0], check_times[-1]) if len(check_times) else (None, None)
+        count, failed_count, dns_count = len(checks), int(failed.sum()), len(dns)
+    else:
+        checks = [(t, l) for t, l, k in zip(arrays.timestamps, arrays.latencies, arrays.kinds) if k == KIND_CHECK]
+        dns = [l for l, k in zip(arrays.latencies, arrays.kinds) if k == KIND_DNS]
+        ok = sorted(l for _, l in checks if not math.isnan(l))
+        trailing = 0
+        for _, latency in reversed(checks):
+            if not math.isnan(latency):
+                break
+            trailing += 1
+        percentiles = {p: _percentile(ok, p) for p in PERCENTILES} if with_percentiles and ok else {}
+        dns_failed = sum(1 for l in dns if math.isnan(l))
+        total_latency, total_dns = sum(ok), sum(l for l in dns if not math.isnan(l))
+        minimum, maximum = (ok[0], ok[-1]) if ok else (None, None)
+        first, last = (checks[0][0], checks[-1][0]) if checks else (None, None)
+        count, failed_count, dns_count = len(checks), len(checks) - len(ok), len(dns)
+
+    return {
+        'checks': count,
+        'failed': failed_count,
+        'total_latency': total_latency,
+        'min_latency': minimum,
+        'avg_latency': total_latency / (count - failed_count) if count > failed_count else None,
+        'max_latency': maximum,
+        'loss_pct': failed_count / count * 100 if count else 0.0,
+        'percentiles': percentiles,
+        'trailing_failures': int(trailing),
+        'dns_lookups': dns_count,
+        'dns_failures': dns_failed,
+        'total_dns_ms': total_dns,
+        'first': to_datetime(first) if first is not None else None,
+        'last': to_datetime(last) if last is not None else None
+    }
+
+
+def count_arrays(arrays: LogArrays, summary: Optional[Dict] = None) -> Dict:
+    """
+    Compute the additive counters (COUNTERS) of a parsed log.
+
+    Args:
+        arrays: Parsed log
+        summary: summarize() output of the same arrays, if already computed
+
+    Returns:
+        Dictionary of counter name -> value
+    """
+    if summary is None:
+        summary = summarize(arrays, with_percentiles=False)
+    counters = dict.fromkeys(COUNTERS, 0)
+    counters.update(
+        total_pings=summary['checks'],
+        failed_pings=summary['failed'],
+        total_latency=summary['total_latency'],
+        dns_lookups=summary['dns_lookups'],
+        dns_failures=summary['dns_failures'],
+        total_dns_ms=summary['total_dns_ms']
+    )
+
+    # Burst details are parsed per line; burst checks are rare
+    for line in arrays.burst_lines:
+        _, latency, _, rest = parse_text_line(line, with_timestamp=False)
+        try:
+            sent, _, _, loss_pct, jitter = parse_burst_details(rest)
+        except (IndexError, ValueError):
+            continue
+        counters['burst_checks'] += 1
+        counters['burst_probes_sent'] += sent
+        counters['burst_probes_lost'] += round(sent * loss_pct / 100)
+        counters['total_jitter'] += jitter
+        if latency is None:
+            counters['burst_failed_checks'] += 1
+    return counters
+
+
+def check_latencies(arrays: LogArrays):
+    """
+    Get the latencies of the successful checks in a log, in log order.
+
+    Args:
+        arrays: Parsed log
+
+    Returns:
+        NumPy array (or list without NumPy) of latencies in ms
+    """
+    if HAS_NUMPY and isinstance(arrays.latencies, np.ndarray):
+        checks = arrays.latencies[arrays.kinds == KIND_CHECK]
+        return checks[~np.isnan(checks)]
+    return [l for l, k in zip(arrays.latencies, arrays.kinds) if k == KIND_CHECK and not math.isnan(l)]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a sorted list (same method as NumPy's default)."""
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def hourly(arrays: LogArrays) -> List[Dict]:
+    """
+    Bucket checks by hour.
+
+    Returns:
+        List of dicts with hour (datetime), checks, failed, loss_pct,
+        avg_latency and max_latency, oldest first
+    """
+    return _hourly_dicts(_hourly_rows(arrays))
+
+
+def _hourly_rows(arrays: LogArrays) -> List[tuple]:
+    """Get (hour, checks, failed, latency sum, max latency) rows, oldest first."""
+    if HAS_NUMPY and isinstance(arrays.latencies, np.ndarray):
+        mask = arrays.kinds == KIND_CHECK
+        hours = arrays.timestamps[mask] // 3600
+        latencies = arrays.latencies[mask]
+        if not len(hours):
+            return []
+        buckets, index = np.unique(hours, return_inverse=True)
+        failed = np.isnan(latencies)
+        counts = np.bincount(index, minlength=len(buckets))
+        failures = np.bincount(index, weights=failed, minlength=len(buckets))
+        sums = np.bincount(index, weights=np.where(failed, 0.0, latencies), minlength=len(buckets))
+        maxima = np.full(len(buckets), -np.inf)
+        np.maximum.at(maxima, index[~failed], latencies[~failed])
+        return list(zip(buckets.tolist(), counts.tolist(), failures.astype(np.int64).tolist(),
+                        sums.tolist(), maxima.tolist()))
+
+    grouped = {}
+    for timestamp, latency, kind in zip(arrays.timestamps, arrays.latencies, arrays.kinds):
+        if kind != KIND_CHECK:
+            continue
+        bucket = grouped.setdefault(timestamp // 3600, [0, 0, 0.0, -math.inf])
+        bucket[0] += 1
+        if math.isnan(latency):
+            bucket[1] += 1
+        else:
+            bucket[2] += latency
+            bucket[3] = max(bucket[3], latency)
+    return [(hour,) + tuple(values) for hour, values in sorted(grouped.items())]
+
+
+def _hourly_dicts(rows) -> List[Dict]:
+    """Convert hourly rows to the dicts returned by hourly()."""
+    result = []
+    for hour, count, failures, total, maximum in rows:
+        succeeded = count - failures
+        result.append({
+            'hour': to_datetime(hour * 3600),
+            'checks': int(count),
+            'failed': int(failures),
+            'loss_pct': failures / count * 100,
+            'avg_latency': total / succeeded if succeeded else None,
+            'max_latency': maximum if succeeded else None
+        })
+    return result
+
+
+def outages(arrays: LogArrays, min_failures: int = 3) -> List[Dict]:
+    """
+    Find runs of consecutive failed checks.
+
+    Args:
+        arrays: Parsed log
+        min_failures: Minimum run length reported as an outage
+
+    Returns:
+        List of dicts with start, end (first successful check after the run,
+        or the last failure if the log ends down), failures and duration in seconds
+    """
+    runs, _, _ = _failure_runs(arrays)
+    return _outage_dicts(run for run in runs if run[2] >= min_failures)
+
+
+def _failure_runs(arrays: LogArrays):
+    """
+    Find all runs of consecutive failed checks.
+
+    Returns:
+        Tuple of (runs, first check time, whether the first check failed);
+        each run is [start, end, failures, closed] where end is the time of
+        the first successful check after the run (closed) or of its last failure
+    """
+    if HAS_NUMPY and isinstance(arrays.latencies, np.ndarray):
+        mask = arrays.kinds == KIND_CHECK
+        times = arrays.timestamps[mask].tolist()
+        failed = np.isnan(arrays.latencies[mask]).astype(np.int8)
+        edges = np.diff(np.concatenate([[0], failed, [0]]))
+        bounds = zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist())
+    else:
+        times = [t for t, k in zip(arrays.timestamps, arrays.kinds) if k == KIND_CHECK]
+        failed = [math.isnan(l) for l, k in zip(arrays.latencies, arrays.kinds) if k == KIND_CHECK]
+        bounds, run_start = [], None
+        for i, is_failed in enumerate(failed + [False]):
+            if is_failed and run_start is None:
+                run_start = i
+            elif not is_failed and run_start is not None:
+                bounds.append((run_start, i))  # end is exclusive
+                run_start = None
+
+    runs = []
+    for start, end in bounds:
+        closed = end < len(times)
+        runs.append([times[start], times[end] if closed else times[end - 1], end - start, closed])
+    if not times:
+        return runs, None, False
+    return runs, times[0], bool(failed[0])
+
+
+def _outage_dicts(runs) -> List[Dict]:
+    """Convert failure runs to the dicts returned by outages()."""
+    return [{
+        'start': to_datetime(start),
+        'end': to_datetime(end),
+        'failures': failures,
+        'duration': end - start
+    } for start, end, failures, _ in runs]
+
+
+class LogAggregate:
+    """
+    Mergeable totals of a part of a log.
+
+    Parts are built independently (for example in worker processes) and
+    merged in log order. Counters come from count_arrays(), which the
+    tray app's SegmentCounter uses as well, so totals match what it shows.
+    """
+
+    def __init__(self, min_failures: int = 3):
+        """
+        Args:
+            min_failures: Minimum run of failed checks reported as an outage
+        """
+        self.min_failures = min_failures
+        self.counters = {}
+        self.min_latency = None
+        self.max_latency = None
+        self.first = None
+        self.last = None
+        # Check latencies in hundredths of a ms (the log's resolution) -> count
+        self.histogram = {}
+        self.hours = {}
+        # Failure runs; only the last may be open (not followed by a success yet)
+        self.runs = []
+        self._first_check = None
+        self._starts_failed = False
+
+    @classmethod
+    def from_arrays(cls, arrays: LogArrays, min_failures: int = 3) -> "LogAggregate":
+        """Build the aggregate of one contiguous part of a log."""
+        aggregate = cls(min_failures)
+        summary = summarize(arrays, with_percentiles=False)
+        aggregate.counters = count_arrays(arrays, summary)
+        aggregate.min_latency, aggregate.max_latency = summary['min_latency'], summary['max_latency']
+        aggregate.first, aggregate.last = summary['first'], summary['last']
+
+        if HAS_NUMPY and isinstance(arrays.latencies, np.ndarray):
+            latencies = arrays.latencies[arrays.kinds == KIND_CHECK]
+            values, counts = np.unique(np.round(latencies[~np.isnan(latencies)] * 100).astype(np.int64),
+                                       return_counts=True)
+            aggregate.histogram = dict(zip(values.tolist(), counts.tolist()))
+        else:
+            for latency, kind in zip(arrays.latencies, arrays.kinds):
+                if kind == KIND_CHECK and not math.isnan(latency):
+                    value = round(latency * 100)
+                    aggregate.histogram[value] = aggregate.histogram.get(value, 0) + 1
+
+        aggregate.hours = {row[0]: list(row[1:]) for row in _hourly_rows(arrays)}
+
+        runs, aggregate._first_check, aggregate._starts_failed = _failure_runs(arrays)
+        # Short runs can be dropped unless a neighbouring part may extend them
+        aggregate.runs = [run for i, run in enumerate(runs)
+                          if run[2] >= min_failures or not run[3]
+                          or (i == 0 and aggregate._starts_failed)]
+        return aggregate
+
+    def merge(self, other: "LogAggregate") -> None:
+        """
+        Add the aggregate of the part of the log that follows this one.
+
+        Args:
+            other: Aggregate of the next part
+        """
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        if other.min_latency is not None:
+            self.min_latency = other.min_latency if self.min_latency is None else min(self.min_latency, other.min_latency)
+            self.max_latency = other.max_latency if self.max_latency is None else max(self.max_latency, other.max_latency)
+        if other.first is not None:
+            self.first = other.first if self.first is None else min(self.first, other.first)
+            self.last = other.last if self.last is None else max(self.last, other.last)
+        for value, count in other.histogram.items():
+            self.histogram[value] = self.histogram.get(value, 0) + count
+        for hour, (count, failures, total, maximum) in other.hours.items():
+            bucket = self.hours.setdefault(hour, [0, 0, 0.0, -math.inf])
+            bucket[0] += count
+            bucket[1] += failures
+            bucket[2] += total
+            bucket[3] = max(bucket[3], maximum)
+
+        if other._first_check is None:
+            return
+        if self._first_check is None:
+            self._first_check, self._starts_failed = other._first_check, other._starts_failed
+
+        # An outage that straddles the boundary continues into the next part
+        runs = list(other.runs)
+        if self.runs and not self.runs[-1][3]:
+            last = self.runs[-1]
+            if other._starts_failed:
+                head = runs.pop(0)
+                last[1], last[2], last[3] = head[1], last[2] + head[2], head[3]
+            else:
+                last[1], last[3] = other._first_check, True
+        self.runs = [run for i, run in enumerate(self.runs + runs)
+                     if run[2] >= self.min_failures or not run[3] or (i == 0 and self._starts_failed)]
+
+    def summary(self) -> Dict:
+        """
+        Get the totals in the format of summarize(), plus the COUNTERS totals.
+        """
+        checks = self.counters.get('total_pings', 0)
+        failed = self.counters.get('failed_pings', 0)
+        total_latency = self.counters.get('total_latency', 0.0)
+        result = dict(self.counters)
+        result.update({
+            'checks': checks,
+            'failed': failed,
+            'total_latency': total_latency,
+            'min_latency': self.min_latency,
+            'avg_latency': total_latency / (checks - failed) if checks > failed else None,
+            'max_latency': self.max_latency,
+            'loss_pct': failed / checks * 100 if checks else 0.0,
+            'percentiles': self._percentiles(),
+            'dns_lookups': self.counters.get('dns_lookups', 0),
+            'dns_failures': self.counters.get('dns_failures', 0),
+            'total_dns_ms': self.counters.get('total_dns_ms', 0.0),
+            'first': self.first,
+            'last': self.last
+        })
+        return result
+
+    def _percentiles(self) -> Dict:
+        """Interpolated percentiles from the histogram (same method as summarize())."""
+        if not self.histogram:
+            return {}
+        values = sorted(self.histogram)
+        ranks = list(itertools.accumulate(self.histogram[value] for value in values))
+        total = ranks[-1]
+
+        def value_at(rank):
+            return values[bisect.bisect_right(ranks, rank)] / 100
+
+        result = {}
+        for pct in PERCENTILES:
+            position = (total - 1) * pct / 100
+            lower = math.floor(position)
+            low, high = value_at(lower), value_at(min(lower + 1, total - 1))
+            result[pct] = low + (high - low) * (position - lower)
+        return result
+
+    def hourly(self) -> List[Dict]:
+        """Get the hourly buckets in the format of hourly()."""
+        return _hourly_dicts((hour,) + tuple(self.hours[hour]) for hour in sorted(self.hours))
+
+    def outages(self) -> List[Dict]:
+        """Get the outages in the format of outages()."""
+        return _outage_dicts(run for run in self.runs if run[2] >= self.min_failures)
+
+
+def split_ranges(path, parts: int, min_size: int = 8 * 1024 * 1024) -> List[tuple]:
+    """
+    Split a log into line-aligned byte ranges.
+
+    Compressed segments can only be read from the start and form one range.
+
+    Args:
+        path: Text or binary log
+        parts: Desired number of ranges
+        min_size: Smallest range worth a separate task
+
+    Returns:
+        List of (start, end) byte offsets covering the file in order
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    if path.suffix == ".gz":
+        return [(0, None)]
+
+    parts = max(1, min(parts, size // max(1, min_size)))
+    binary = is_binary_log(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            offset = size * i // parts
+            if binary:
+                offset = HEADER.size + (offset - HEADER.size) // RECORD.size * RECORD.size
+            else:
+                f.seek(offset)
+                f.readline()  # move to the start of the next line
+                offset = f.tell()
+            if bounds[-1] < offset < size:
+                bounds.append(offset)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _analyze_range(path, start: int, end: Optional[int], min_failures: int) -> LogAggregate:
+    """Aggregate one byte range of a log (runs in a worker process)."""
+    return LogAggregate.from_arrays(load_log(path, end, start=start), min_failures)
+
+
+def analyze_logs(paths, workers: Optional[int] = None, min_failures: int = 3) -> LogAggregate:
+    """
+    Aggregate logs in parallel.
+
+    Every file is split into line-aligned byte ranges that are parsed by a
+    pool of worker processes; the partial aggregates are merged in log order.
+
+    Args:
+        paths: Log files, oldest first (e.g. rotated segments, then the active log)
+        workers: Number of worker processes (default: CPU count); 1 parses in this process
+        min_failures: Minimum run of failed checks reported as an outage
+
+    Returns:
+        The merged LogAggregate
+    """
+    workers = workers or os.cpu_count() or 1
+    # A few ranges per worker keep the pool busy when ranges parse at different speeds
+    tasks = [(path, start, end) for path in paths for start, end in split_ranges(path, workers * 4)]
+
+    result = LogAggregate(min_failures)
+    if workers == 1 or len(tasks) == 1:
+        for path, start, end in tasks:
+            result.merge(_analyze_range(path, start, end, min_failures))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_analyze_range, path, start, end, min_failures)
+                   for path, start, end in tasks]
+        for future in futures:
+            result.merge(future.result())
+    return result
+
+
+def main(argv=None) -> int:
+    """Command line entry point: print a summary of one or more logs."""
+    argv = sys.argv[1:] if argv is None else argv
+    options = {"--min-failures": 3, "--workers": 0}
+    paths = []
+    args = iter(argv)
+    for arg in args:
+        if arg in options:
+            options[arg] = int(next(args))
+        elif not arg.startswith("--"):
+            paths.append(arg)
+    if not paths:
+        print(__doc__.split("Command line:")[1].rstrip())
+        return 1
+
+    if "--archives" in argv:
+        paths = [str(segment) for path in paths for segment in archived_segments(path)] + paths
+    min_failures = options["--min-failures"]
+
+    start = time.perf_counter()
+    aggregate = analyze_logs(paths, options["--workers"] or None, min_failures)
+    elapsed = time.perf_counter() - start
+    summary = aggregate.summary()
+
+    measurements = summary['checks'] + summary['dns_lookups']
+    print(f"{', '.join(paths)}: {measurements:,} measurements parsed in {elapsed:.2f} s "
+          f"({'numpy' if HAS_NUMPY else 'pure Python'})")
+    if summary['first'] is not None:
+        print(f"Period:       {summary['first']} - {summary['last']}")
+    print(f"Checks:       {summary['checks']:,} ({summary['failed']:,} failed, {summary['loss_pct']:.2f}% loss)")
+    if summary['avg_latency'] is not None:
+        print(f"Latency:      min {summary['min_latency']:.2f} / avg {summary['avg_latency']:.2f} / "
+              f"max {summary['max_latency']:.2f} ms")
+        print("Percentiles:  " + ", ".join(f"p{p} {v:.2f} ms" for p, v in summary['percentiles'].items()))
+    if summary['dns_lookups']:
+        print(f"DNS lookups:  {summary['dns_lookups']:,} ({summary['dns_failures']:,} failed)")
+    if summary['burst_checks']:
+        loss = summary['burst_probes_lost'] / summary['burst_probes_sent'] * 100 if summary['burst_probes_sent'] else 0
+        print(f"Burst checks: {summary['burst_checks']:,} ({loss:.2f}% probe loss)")
+
+    if "--hourly" in argv:
+        print()
+        print(f"{'Hour':<17} {'Checks':>7} {'Loss':>7} {'Avg ms':>9} {'Max ms':>9}")
+        for bucket in aggregate.hourly():
+            avg = f"{bucket['avg_latency']:.2f}" if bucket['avg_latency'] is not None else "-"
+            peak = f"{bucket['max_latency']:.2f}" if bucket['max_latency'] is not None else "-"
+            print(f"{bucket['hour']:%Y-%m-%d %H:00} {bucket['checks']:>7} "
+                  f"{bucket['loss_pct']:>6.1f}% {avg:>9} {peak:>9}")
+
+    if "--outages" in argv:
+        print()
+        found = aggregate.outages()
+        print(f"Outages ({min_failures}+ consecutive failures): {len(found)}")
+        for outage in found:
+            print(f"  {outage['start']} - {outage['end']}  {outage['failures']} failed checks, "
+                  f"{timedelta(seconds=int(outage['duration']))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
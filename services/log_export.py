@@ -0,0 +1,331 @@
+"""
+Log Export - Columnar export of measurement history
+Follows Single Responsibility Principle (SRP)
+
+Logs (and the SQLite store) are exported in chunks of bounded size to NumPy
+.npz files, or Arrow IPC files when pyarrow is installed, with the columns:
+    timestamp  local time (datetime64[s])
+    latency    latency or DNS lookup time in ms, NaN when it failed
+    kind       0 = check, 1 = DNS lookup
+    status     0 = ok, 1 = failed
+    target     target host
+
+Logs are parsed by the same bulk parser that StatsTrackerService uses to
+restore its totals. A manifest in the export directory records how far each
+source has been exported, so later runs only append new records; a log that
+was rotated in the meantime is finished from its rotated segment.
+
+Command line:
+    python -m services.log_export log.txt exports/ [--target NAME] [--format npz|arrow]
+    python -m services.log_export --store measurements.db exports/ [--format npz|arrow]
+"""
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional: required for .npz export
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional: only needed for Arrow export
+    pa = None
+
+from services.log_analysis import load_log, split_ranges
+from services.log_format import HEADER, RECORD, archived_segments, is_binary_log, segment_name
+
+MANIFEST_VERSION = 1
+
+
+class LogExporter:
+    """Service to export measurements to columnar files, incrementally."""
+
+    FORMAT_NPZ = "npz"
+    FORMAT_ARROW = "arrow"
+
+    STATUS_OK = 0
+    STATUS_FAILED = 1
+
+    def __init__(self, out_dir: str, fmt: str = FORMAT_NPZ,
+                 chunk_bytes: int = 64 * 1024 * 1024, chunk_rows: int = 1_000_000):
+        """
+        Initialize the exporter.
+
+        Args:
+            out_dir: Directory receiving the chunk files and the manifest
+            fmt: "npz" or "arrow"
+            chunk_bytes: Log bytes parsed per chunk file
+            chunk_rows: Store rows per chunk file
+        """
+        if fmt == self.FORMAT_ARROW and pa is None:
+            raise RuntimeError("Arrow export requires pyarrow (pip install pyarrow)")
+        if np is None:
+            raise RuntimeError("Export requires NumPy (pip install numpy)")
+
+        self.out_dir = Path(out_dir)
+        self.fmt = fmt
+        self.chunk_bytes = chunk_bytes
+        self.chunk_rows = chunk_rows
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.out_dir / "manifest.json"
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict:
+        """Load the manifest of earlier runs, or start a new one."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION and manifest.get("format") == self.fmt:
+                return manifest
+            print(f"⚠️ Ignoring manifest of a different export format in {self.out_dir}")
+        except (OSError, ValueError):
+            pass
+        return {"version": MANIFEST_VERSION, "format": self.fmt, "sources": {}, "chunks": []}
+
+    def _save_manifest(self) -> None:
+        """Write the manifest atomically."""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def export_log(self, log_file: str, target: Optional[str] = None) -> int:
+        """
+        Export the records of a log and its rotated segments not exported yet.
+
+        Args:
+            log_file: Text or binary log
+            target: Value of the target column (default: the log file name)
+
+        Returns:
+            Number of records exported by this run
+        """
+        log_path = Path(log_file)
+        target = target or log_path.name
+        state = self.manifest["sources"].setdefault(str(log_path.resolve()), {
+            "segments": [], "identity": None, "offset": 0
+        })
+
+        exported = 0
+        for segment in archived_segments(log_path):
+            name = segment_name(segment)
+            if name in state["segments"]:
+                continue
+            # The segment is the log exported last time: continue where it stopped
+            start = state["offset"] if _identity(segment) == state["identity"] else 0
+            exported += self._export_file(segment, target, start, None)
+            state["segments"].append(name)
+            if start:
+                state["identity"], state["offset"] = None, 0
+            self._save_manifest()
+
+        if log_path.exists():
+            identity = _identity(log_path)
+            size = _complete_size(log_path)
+            start = state["offset"] if identity == state["identity"] and size >= state["offset"] else 0
+            state["identity"], state["offset"] = identity, start
+            exported += self._export_file(log_path, target, start, size, state)
+        return exported
+
+    def _export_file(self, path: Path, target: str, start: int, end: Optional[int],
+                     state: Optional[Dict] = None) -> int:
+        """
+        Export a byte range of a log in chunks.
+
+        Args:
+            path: Log or rotated segment
+            target: Value of the target column
+            start: First byte to export (line-aligned)
+            end: End of the range (None = end of file)
+            state: Manifest entry whose offset advances after every chunk
+        """
+        if path.suffix == ".gz":
+            ranges = [(start, None)]  # compressed segments are read whole
+        else:
+            ranges = self._ranges(path, start, path.stat().st_size if end is None else end)
+
+        exported = 0
+        for range_start, range_end in ranges:
+            arrays = load_log(path, range_end, start=range_start)
+            if len(arrays):
+                failed = np.isnan(arrays.latencies)
+                self._write_chunk(path.name, {
+                    "timestamp": np.asarray(arrays.timestamps, dtype="datetime64[s]"),
+                    "latency": np.asarray(arrays.latencies, dtype=np.float64),
+                    "kind": np.asarray(arrays.kinds, dtype=np.uint8),
+                    "status": np.where(failed, self.STATUS_FAILED, self.STATUS_OK).astype(np.uint8),
+                }, target)
+                exported += len(arrays)
+            if state is not None and range_end is not None:
+                state["offset"] = range_end
+                self._save_manifest()
+        return exported
+
+    def _ranges(self, path: Path, start: int, end: int) -> List[tuple]:
+        """Split the byte range start..end of a log into line-aligned chunks."""
+        if end <= start:
+            return []
+        ranges = [r for r in split_ranges(path, max(1, path.stat().st_size // self.chunk_bytes),
+                                          min_size=self.chunk_bytes) if r[1] > start and r[0] < end]
+        return [(max(range_start, start), min(range_end, end)) for range_start, range_end in ranges]
+
+    def export_store(self, store) -> int:
+        """
+        Export the rows of a MeasurementStoreService inserted since the last run.
+
+        Args:
+            store: MeasurementStoreService
+
+        Returns:
+            Number of records exported by this run
+        """
+        store.flush()
+        state = self.manifest["sources"].setdefault(f"store:{Path(store.db_path).resolve()}", {"last_id": 0})
+
+        exported = 0
+        while True:
+            rows = store.rows_after(state["last_id"], self.chunk_rows)
+            if not rows:
+                break
+            _, targets, epochs, kinds, latencies = zip(*rows)
+            # Local wall-clock time like the log timestamps (exact across DST changes)
+            timestamps = [datetime.fromtimestamp(epoch).replace(microsecond=0) for epoch in epochs]
+            latency = np.array([np.nan if value is None else value for value in latencies], dtype=np.float64)
+            self._write_chunk("store", {
+                "timestamp": np.array(timestamps, dtype="datetime64[s]"),
+                "latency": latency,
+                "kind": np.array(kinds, dtype=np.uint8),
+                "status": np.where(np.isnan(latency), self.STATUS_FAILED, self.STATUS_OK).astype(np.uint8),
+            }, np.array(targets))
+            exported += len(rows)
+            state["last_id"] = rows[-1][0]
+            self._save_manifest()
+        return exported
+
+    def _write_chunk(self, source: str, columns: Dict, target) -> None:
+        """
+        Write one chunk file and record it in the manifest.
+
+        Args:
+            source: Name the chunk file is derived from
+            columns: timestamp, latency, kind and status arrays
+            target: Target name, or an array of one target per row
+        """
+        rows = len(columns["latency"])
+        number = len(self.manifest["chunks"]) + 1
+        path = self.out_dir / f"{source}-{number:06d}.{self.fmt}"
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        if self.fmt == self.FORMAT_ARROW:
+            targets = pa.array(np.broadcast_to(np.asarray(target, dtype=str), (rows,))).dictionary_encode()
+            table = pa.table({
+                "timestamp": pa.array(columns["timestamp"]),
+                "latency": pa.array(columns["latency"]),
+                "kind": pa.array(columns["kind"]),
+                "status": pa.array(columns["status"]),
+                "target": targets,
+            })
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            # Repeated target names compress to almost nothing
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, target=np.broadcast_to(np.asarray(target, dtype=str), (rows,)),
+                                    **columns)
+        os.replace(tmp_path, path)
+
+        self.manifest["chunks"].append({
+            "file": path.name,
+            "rows": rows,
+            "first": str(columns["timestamp"][0]),
+            "last": str(columns["timestamp"][-1])
+        })
+
+
+def _identity(path: Path) -> str:
+    """First line of a plain or compressed log, which tells one log file from its successor."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        return f.readline(128).hex()
+
+
+def _complete_size(path: Path) -> int:
+    """Size of a log up to its last complete line (or binary record), excluding one being written."""
+    size = path.stat().st_size
+    if is_binary_log(path):
+        return HEADER.size + max(0, size - HEADER.size) // RECORD.size * RECORD.size
+    with open(path, "rb") as f:
+        position = size
+        while position > 0:
+            block = min(65536, position)
+            f.seek(position - block)
+            newline = f.read(block).rfind(b"\n")
+            if newline >= 0:
+                return position - block + newline + 1
+            position -= block
+    return 0
+
+
+def read_export(out_dir: str) -> Dict:
+    """
+    Load all chunks of an .npz export into memory as one set of columns.
+
+    Args:
+        out_dir: Export directory
+
+    Returns:
+        Dictionary of column name -> array, in export order
+    """
+    out_dir = Path(out_dir)
+    with open(out_dir / "manifest.json", "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    columns = {}
+    for chunk in manifest["chunks"]:
+        with np.load(out_dir / chunk["file"]) as data:
+            for name in data.files:
+                columns.setdefault(name, []).append(data[name])
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+
+def main(argv=None) -> int:
+    """Command line entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    options = {"--target": None, "--format": LogExporter.FORMAT_NPZ, "--store": None}
+    positional = []
+    args = iter(argv)
+    for arg in args:
+        if arg in options:
+            options[arg] = next(args, None)
+        else:
+            positional.append(arg)
+
+    if len(positional) != (1 if options["--store"] else 2):
+        print(__doc__.split("Command line:")[1].rstrip())
+        return 1
+
+    try:
+        exporter = LogExporter(positional[-1], options["--format"])
+        if options["--store"]:
+            from services.measurement_store_service import MeasurementStoreService
+            exported = exporter.export_store(MeasurementStoreService(options["--store"]))
+        else:
+            exported = exporter.export_log(positional[0], options["--target"])
+    except (RuntimeError, OSError) as e:
+        print(f"⚠️ Export failed: {e}")
+        return 1
+
+    print(f"📊 Exported {exported:,} records to {exporter.out_dir} "
+          f"({len(exporter.manifest['chunks'])} chunk files)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
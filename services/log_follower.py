@@ -0,0 +1,438 @@
+"""
+Log Follower - Stream new measurements as they are appended to a log
+Follows Single Responsibility Principle (SRP)
+
+A follower keeps the log open and only reads the bytes appended since its
+last read, so consumers (dashboards, alert routers) get every new record once
+without polling and re-reading the log. On Linux it sleeps on inotify events
+for the log's directory; elsewhere (or if inotify is unavailable) it checks
+the file size at a fixed interval.
+
+The log being replaced is handled like `tail -F`: when LoggerService rotates
+the log (rename to a segment) or clears it (delete and recreate), the rest of
+the old file is read through the still-open handle (and segments rotated
+after it while the follower was not reading) before the follower switches to
+the new log from its start. A log truncated in place is read
+again from its start. Text and binary logs are both supported.
+
+Records are dictionaries:
+    timestamp  datetime of the measurement
+    kind       "latency", "dns" or "error"
+    latency    latency or DNS lookup time in ms, None when it failed
+    message    error text (errors only)
+    burst      True for burst checks; text logs add sent, min_latency,
+               max_latency, loss_pct and jitter
+
+Command line (one JSON object per line on stdout):
+    python -m services.log_follower log.txt [--from-start] [--poll]
+"""
+import ctypes
+import ctypes.util
+import gzip
+import json
+import os
+import select
+import struct
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from services.log_format import (
+    FLAG_BURST, FLAG_DNS, FLAG_NO_RESPONSE, HEADER, MAGIC, RECORD, TIMESTAMP_FORMAT, archived_segments,
+    decode_record, parse_text_line, read_segment_lines, read_segment_records, segment_time
+)
+from services.stats_tracker_service import BurstStatsEntry
+
+KIND_LATENCY = "latency"
+KIND_DNS = "dns"
+KIND_ERROR = "error"
+
+# inotify(7) event masks for the watched directory
+_IN_MODIFY = 0x002
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_EVENT = struct.Struct("iIII")
+
+_ERROR_TAG = "ERROR: "
+# Bytes compared to recognize a log among its rotated segments
+_IDENTITY_BYTES = 128
+
+
+class _Inotify:
+    """Minimal inotify watch on a directory through libc (Linux only)."""
+
+    MASK = _IN_MODIFY | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, name: str, timeout: float) -> bool:
+        """
+        Wait for events of the directory.
+
+        Args:
+            name: File name the caller is interested in
+            timeout: Seconds to wait at most
+
+        Returns:
+            True if an event concerned name
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        wanted = os.fsencode(name)
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return relevant
+            position = 0
+            while position + _IN_EVENT.size <= len(data):
+                _, _, _, length = _IN_EVENT.unpack_from(data, position)
+                position += _IN_EVENT.size
+                event_name = data[position:position + length].rstrip(b"\0")
+                position += length
+                relevant = relevant or event_name == wanted
+
+    def close(self) -> None:
+        """Release the inotify instance."""
+        os.close(self.fd)
+
+
+class LogFollower:
+    """Service to follow a text or binary log and yield new records."""
+
+    def __init__(self, log_file: str, from_start: bool = False,
+                 poll_interval: float = 0.5, use_inotify: bool = True):
+        """
+        Initialize the follower.
+
+        Args:
+            log_file: Text or binary log to follow (need not exist yet)
+            from_start: Yield the records already in the log first
+                (default: only records appended from now on)
+            poll_interval: Seconds between size checks without inotify, and
+                the longest wait for a stop() request
+            use_inotify: Use inotify where available
+        """
+        self.log_file = Path(log_file)
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        self._file = None
+        self._offset = 0
+        self._partial = b""
+        # None until the first bytes of the file tell text from binary
+        self._binary = None
+        # Skip the rest of a line that was being written when we attached
+        self._skip_line = False
+        self._stopped = threading.Event()
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.follow()
+
+    def follow(self) -> Iterator[Dict]:
+        """
+        Yield records as they are appended, until stop() is called.
+
+        Yields:
+            Record dictionaries (see module docstring), oldest first
+        """
+        watcher = None
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                watcher = _Inotify(self.log_file.parent)
+            except (OSError, AttributeError) as e:
+                print(f"⚠️ inotify unavailable, polling {self.log_file}: {e}")
+
+        self._stopped.clear()
+        try:
+            while not self._stopped.is_set():
+                records = self.poll()
+                if records:
+                    yield from records
+                elif watcher is not None:
+                    watcher.wait(self.log_file.name, self.poll_interval)
+                else:
+                    self._stopped.wait(self.poll_interval)
+        finally:
+            if watcher is not None:
+                watcher.close()
+            self.close()
+
+    def stop(self) -> None:
+        """Make follow() return after its current wait (safe from other threads)."""
+        self._stopped.set()
+
+    def poll(self) -> List[Dict]:
+        """
+        Read the records appended since the last call, without waiting.
+
+        Returns:
+            New records, oldest first
+        """
+        if self._file is None and not self._open(self.from_start):
+            self.from_start = True  # everything in a log created later is new
+            return []
+
+        records = self._read_available()
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            stat = None
+        current = os.fstat(self._file.fileno())
+
+        if stat is None or (stat.st_dev, stat.st_ino) != (current.st_dev, current.st_ino):
+            # Rotated or cleared: finish the old file (lines may have been
+            # appended since the read above), then the segments rotated after
+            # it while we weren't looking, then the new log. The new log is
+            # opened first so it is recognized if it was rotated meanwhile.
+            records.extend(self._read_available())
+            old_file, self._file = self._file, None
+            self._open(True)
+            segments = self._segments_between(old_file)
+            old_file.close()
+            for segment in segments:
+                records.extend(self._read_segment(segment))
+            if self._file is not None:
+                records.extend(self._read_available())
+        elif stat.st_size < self._offset:
+            # Truncated in place
+            self._file.seek(0)
+            self._offset, self._partial, self._binary, self._skip_line = 0, b"", None, False
+            records.extend(self._read_available())
+        return records
+
+    def close(self) -> None:
+        """Close the followed file; a later poll() reopens the log from its end."""
+        self._close_file()
+        self.from_start = False
+
+    def _open(self, from_start: bool) -> bool:
+        """Open the log at its start or its end; False if it doesn't exist."""
+        try:
+            self._file = open(self.log_file, "rb")
+        except FileNotFoundError:
+            return False
+
+        self._offset, self._partial, self._binary, self._skip_line = 0, b"", None, False
+        # Later files (after rotation or clear) are always read from their start
+        self.from_start = True
+        if from_start:
+            return True
+
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            return True  # (nearly) empty: read it from the start
+        self._binary = self._file.read(len(MAGIC)) == MAGIC
+        if self._binary:
+            self._offset = HEADER.size + max(0, size - HEADER.size) // RECORD.size * RECORD.size
+        else:
+            self._file.seek(size - 1)
+            self._skip_line = self._file.read(1) != b"\n"
+            self._offset = size
+        self._file.seek(self._offset)
+        return True
+
+    def _segments_between(self, old_file) -> List[Path]:
+        """
+        Find the segments rotated after a rotated file and before the open log.
+
+        Files are recognized by inode, or by their first bytes once
+        compression has replaced them.
+
+        Args:
+            old_file: Handle of the rotated (or deleted) file
+
+        Returns:
+            Segments, oldest first
+        """
+        segments = archived_segments(self.log_file)
+        old = _identity(old_file)
+        new = _identity(self._file) if self._file is not None else None
+        for position in range(len(segments) - 1, -1, -1):
+            if _matches(segments[position], *old):
+                segments = segments[position + 1:]
+                break
+        else:
+            # Cleared (or deleted by retention): the segments left were all
+            # rotated after the old file's last write
+            last_write = datetime.fromtimestamp(old[0].st_mtime).replace(microsecond=0)
+            segments = [segment for segment in segments
+                        if (segment_time(segment) or last_write) >= last_write]
+
+        between = []
+        for segment in segments:
+            if new is not None and _matches(segment, *new):
+                break  # the log we just opened has been rotated too
+            between.append(segment)
+        return between
+
+    def _read_segment(self, segment: Path) -> List[Dict]:
+        """Read all records of a rotated segment."""
+        for path in (segment, Path(f"{segment}.gz")):
+            try:
+                try:
+                    return [_record(datetime.fromtimestamp(epoch), None if flags & FLAG_NO_RESPONSE else latency, flags)
+                            for epoch, latency, flags in read_segment_records(path)]
+                except ValueError:
+                    return [record for record in map(_parse_line, read_segment_lines(path)) if record is not None]
+            except FileNotFoundError:
+                continue  # compressed since it was listed
+            except (OSError, EOFError) as e:
+                print(f"⚠️ Error reading rotated segment {path}: {e}")
+                break
+        return []
+
+    def _close_file(self) -> None:
+        """Close the current file handle, if any."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_available(self) -> List[Dict]:
+        """Read and parse the complete lines or records appended to the open file."""
+        data = self._file.read()
+        if not data:
+            return []
+        self._offset += len(data)
+        data = self._partial + data
+
+        if self._binary is None:
+            if data[:1] != MAGIC[:1]:
+                self._binary = False
+            elif len(data) < HEADER.size:
+                self._partial = data  # header still being written
+                return []
+            else:
+                self._binary = data.startswith(MAGIC)
+                if self._binary:
+                    data = data[HEADER.size:]
+
+        if self._binary:
+            complete = len(data) // RECORD.size * RECORD.size
+            self._partial = data[complete:]
+            return [_record(*decode_record(data, offset)) for offset in range(0, complete, RECORD.size)]
+
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        lines = data[:end].decode("utf-8", errors="replace").splitlines()
+        if self._skip_line and end:
+            lines, self._skip_line = lines[1:], False
+        records = []
+        for line in lines:
+            record = _parse_line(line)
+            if record is not None:
+                records.append(record)
+        return records
+
+
+def _record(timestamp: datetime, latency: Optional[float], flags: int, rest: Optional[str] = None) -> Dict:
+    """Build a record dictionary from a parsed line or decoded binary record."""
+    record = {
+        'timestamp': timestamp,
+        'kind': KIND_DNS if flags & FLAG_DNS else KIND_LATENCY,
+        'latency': latency
+    }
+    if flags & FLAG_BURST:
+        record['burst'] = True
+        if rest is not None:
+            try:
+                entry = BurstStatsEntry.from_log_details(timestamp, latency, rest)
+            except (IndexError, KeyError, ValueError):
+                return record
+            record.update({
+                'sent': entry.sent,
+                'min_latency': entry.min_latency,
+                'max_latency': entry.max_latency,
+                'loss_pct': entry.loss_pct,
+                'jitter': entry.jitter
+            })
+    return record
+
+
+def _identity(f) -> tuple:
+    """Inode and first bytes of an open file."""
+    position = f.tell()
+    f.seek(0)
+    prefix = f.read(_IDENTITY_BYTES)
+    f.seek(position)
+    return os.fstat(f.fileno()), prefix
+
+
+def _matches(segment: Path, stat: os.stat_result, prefix: bytes) -> bool:
+    """Check whether a segment is the file with the given inode and first bytes."""
+    try:
+        segment_stat = os.stat(segment)
+        if (segment_stat.st_dev, segment_stat.st_ino) == (stat.st_dev, stat.st_ino):
+            return True
+        # Compression replaces the file: compare the content instead
+        opener = gzip.open if segment.suffix == ".gz" else open
+        with opener(segment, "rb") as f:
+            return bool(prefix) and f.read(_IDENTITY_BYTES) == prefix
+    except (OSError, EOFError):
+        return False
+
+
+def _parse_line(line: str) -> Optional[Dict]:
+    """Parse one text log line into a record, or None for lines that don't parse."""
+    parsed = parse_text_line(line)
+    if parsed is not None:
+        return _record(*parsed)
+
+    # Error lines: [YYYY-MM-DD HH:MM:SS] ERROR: message
+    line = line.strip()
+    if line.startswith("[") and "] " in line:
+        timestamp_str, rest = line[1:].split("] ", 1)
+        if rest.startswith(_ERROR_TAG):
+            try:
+                timestamp = datetime.strptime(timestamp_str, TIMESTAMP_FORMAT)
+            except ValueError:
+                return None
+            return {'timestamp': timestamp, 'kind': KIND_ERROR, 'latency': None,
+                    'message': rest[len(_ERROR_TAG):]}
+    return None
+
+
+def to_json(record: Dict) -> str:
+    """Render a record as one line of JSON."""
+    data = dict(record)
+    data['timestamp'] = record['timestamp'].strftime(TIMESTAMP_FORMAT)
+    return json.dumps(data)
+
+
+def main(argv=None) -> int:
+    """Command line entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    positional = [arg for arg in argv if not arg.startswith("--")]
+    flags = set(argv) - set(positional)
+    if len(positional) != 1 or not flags <= {"--from-start", "--poll"}:
+        print(__doc__.split("Command line (one JSON object per line on stdout):")[1].rstrip())
+        return 1
+
+    follower = LogFollower(positional[0], from_start="--from-start" in flags,
+                           use_inotify="--poll" not in flags)
+    try:
+        for record in follower.follow():
+            sys.stdout.write(to_json(record) + "\n")
+            sys.stdout.flush()
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,474 @@
+"""
+Log Format - Text and binary encodings of the measurement log
+Follows Single Responsibility Principle (SRP)
+
+The text log stores one line of about 40 bytes per sample:
+    [YYYY-MM-DD HH:MM:SS] Latency: 25.00 ms
+
+The binary log stores fixed-width records after an 8 byte header:
+    header: magic "NTLB", version (uint16), record size (uint16)
+    record: epoch timestamp (float64), latency in ms (float32), flags (uint8)
+
+Fixed-width records let readers seek straight to record N instead of
+scanning and parsing every line. Error messages and burst details (min/max,
+loss, jitter) do not fit a fixed-width record and stay in the text log.
+
+Rotated segments are named after the active log plus the rotation time,
+e.g. "log.20251028-221209.txt", and are gzip-compressed in the background
+("log.20251028-221209.txt.gz"). Counters of all archived segments are kept
+in a small summary next to the log ("log.txt.archive.json").
+
+Command line:
+    python -m services.log_format convert log.txt [log.bin]
+    python -m services.log_format render log.bin [count]
+"""
+import gzip
+import math
+import mmap
+import re
+import struct
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"NTLB"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<dfB")
+
+FLAG_NO_RESPONSE = 0x01
+FLAG_DNS = 0x02
+FLAG_BURST = 0x04
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+ARCHIVE_TIME_FORMAT = "%Y%m%d-%H%M%S"
+
+# (timestamp, latency in ms or None, flags)
+Record = Tuple[datetime, Optional[float], int]
+
+
+def binary_log_file(log_file: str) -> str:
+    """
+    Derive the binary log path from a text log path.
+
+    Args:
+        log_file: Text log path (e.g. "log.txt")
+
+    Returns:
+        str: Binary log path (e.g. "log.bin")
+    """
+    return str(Path(log_file).with_suffix(".bin"))
+
+
+def archive_segment_file(log_file, when: datetime, taken=()) -> Path:
+    """
+    Choose the name a log is renamed to when it is rotated.
+
+    Args:
+        log_file: Active log path (e.g. "log.txt")
+        when: Rotation time
+        taken: Segment names that must not be reused even if the file is gone
+
+    Returns:
+        Path: Unused segment path (e.g. "log.20251028-221209.txt")
+    """
+    path = Path(log_file)
+    base = f"{path.stem}.{when.strftime(ARCHIVE_TIME_FORMAT)}"
+    candidate = path.with_name(f"{base}{path.suffix}")
+    counter = 1
+    while candidate.exists() or Path(f"{candidate}.gz").exists() or candidate.name in taken:
+        candidate = path.with_name(f"{base}-{counter}{path.suffix}")
+        counter += 1
+    return candidate
+
+
+def archived_segments(log_file) -> List[Path]:
+    """
+    Find the rotated segments of a log, oldest first.
+
+    A segment that is being compressed may exist both plain and as .gz;
+    it is listed once, preferring the compressed file.
+
+    Args:
+        log_file: Active log path
+    """
+    path = Path(log_file)
+    pattern = re.compile(
+        re.escape(path.stem) + r"\.(\d{8}-\d{6}(?:-\d+)?)" + re.escape(path.suffix) + r"(\.gz)?$"
+    )
+
+    segments = {}
+    for candidate in path.parent.glob(f"{path.stem}.*"):
+        match = pattern.match(candidate.name)
+        if match and (match.group(2) or segment_name(candidate) not in segments):
+            segments[segment_name(candidate)] = (match.group(1), candidate)
+
+    # Same-second segments are numbered -1, -2, ... -10: sort the number numerically
+    return [candidate for _, candidate in sorted(
+        segments.values(), key=lambda item: (item[0][:15], int(item[0][16:] or 0))
+    )]
+
+
+def segment_name(path) -> str:
+    """Name identifying a segment whether or not it has been compressed yet."""
+    name = Path(path).name
+    return name[:-len(".gz")] if name.endswith(".gz") else name
+
+
+def archive_summary_file(log_file) -> Path:
+    """Path of the summary holding the counters of a log's archived segments."""
+    path = Path(log_file)
+    return path.with_name(f"{path.name}.archive.json")
+
+
+def index_file(log_file) -> Path:
+    """Path of the sparse time index of a text log ("log.txt.index")."""
+    path = Path(log_file)
+    return path.with_name(f"{path.name}.index")
+
+
+def segment_time(path) -> Optional[datetime]:
+    """Rotation time encoded in a segment name, None if the name has none."""
+    match = re.search(r"\.(\d{8}-\d{6})(?:-\d+)?\.", segment_name(path))
+    return datetime.strptime(match.group(1), ARCHIVE_TIME_FORMAT) if match else None
+
+
+def snapshot_file(log_file) -> Path:
+    """Path of the statistics snapshot covering the start of a log ("log.txt.snapshot.json")."""
+    path = Path(log_file)
+    return path.with_name(f"{path.name}.snapshot.json")
+
+
+def rollups_file(log_file) -> Path:
+    """Path of the minute/hour/day rollups of a log ("log.txt.rollups.json")."""
+    path = Path(log_file)
+    return path.with_name(f"{path.name}.rollups.json")
+
+
+def read_segment_lines(path) -> Iterator[str]:
+    """Iterate over the lines of a plain or gzip-compressed text segment."""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        yield from f
+
+
+def read_segment_records(path) -> Iterable[Tuple[float, float, int]]:
+    """
+    Read the undecoded records of a plain or gzip-compressed binary segment.
+
+    Raises:
+        ValueError: If the segment is not a binary log
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as f:
+        data = f.read()
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a binary log")
+    count = (len(data) - HEADER.size) // RECORD.size
+    return RECORD.iter_unpack(data[HEADER.size:HEADER.size + count * RECORD.size])
+
+
+def file_header() -> bytes:
+    """Return the header written at the start of every binary log."""
+    return HEADER.pack(MAGIC, VERSION, RECORD.size)
+
+
+def is_binary_log(path) -> bool:
+    """Check whether a file starts with the binary log header."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def encode_record(timestamp: datetime, latency: Optional[float], flags: int = 0) -> bytes:
+    """
+    Encode one measurement as a binary record.
+
+    Args:
+        timestamp: When the measurement was taken
+        latency: Latency in ms, or None for a failed measurement
+        flags: FLAG_DNS / FLAG_BURST; FLAG_NO_RESPONSE is added for None
+    """
+    if latency is None:
+        flags |= FLAG_NO_RESPONSE
+        latency = math.nan
+    return RECORD.pack(timestamp.timestamp(), latency, flags)
+
+
+def decode_record(data, offset: int = 0) -> Record:
+    """Decode the record starting at offset."""
+    epoch, latency, flags = RECORD.unpack_from(data, offset)
+    return datetime.fromtimestamp(epoch), (None if flags & FLAG_NO_RESPONSE else latency), flags
+
+
+def format_text_line(timestamp: datetime, latency: Optional[float], flags: int = 0) -> str:
+    """
+    Render a record in the text log format (without trailing newline).
+
+    Args:
+        timestamp: Time of the measurement
+        latency: Latency in ms, or None if it failed
+        flags: Record flags
+    """
+    prefix = f"[{timestamp.strftime(TIMESTAMP_FORMAT)}]"
+    if flags & FLAG_DNS:
+        return f"{prefix} DNS: {latency:.2f} ms" if latency is not None else f"{prefix} DNS: FAILED"
+    if latency is None:
+        return f"{prefix} Latency: NO RESPONSE"
+    return f"{prefix} Latency: {latency:.2f} ms"
+
+
+def parse_text_line(line: str, with_timestamp: bool = True) -> Optional[Tuple[datetime, Optional[float], int, str]]:
+    """
+    Parse a latency or DNS line of the text log.
+
+    Args:
+        line: One line of the text log
+        with_timestamp: False skips parsing the timestamp (returned as None),
+            which is most of the cost when only counting
+
+    Returns:
+        Tuple of (timestamp, latency or None, flags, text after the timestamp),
+        or None for error lines and lines that don't parse
+    """
+    line = line.strip()
+    if not line.startswith("[") or "] " not in line:
+        return None
+
+    timestamp_str, rest = line[1:].split("] ", 1)
+    try:
+        timestamp = datetime.strptime(timestamp_str, TIMESTAMP_FORMAT) if with_timestamp else None
+
+        # DNS lookup lines: [YYYY-MM-DD HH:MM:SS] DNS: X.XX ms
+        if rest.startswith("DNS: "):
+            value = rest[len("DNS: "):]
+            latency = None if value.startswith("FAILED") else float(value.split(" ms")[0])
+            return timestamp, latency, FLAG_DNS, rest
+
+        # Latency lines, optionally with phase or burst details in parentheses
+        if rest.startswith("Latency: "):
+            flags = FLAG_BURST if " (burst " in rest else 0
+            if "NO RESPONSE" in rest:
+                latency = None
+            else:
+                latency = float(rest.split("Latency: ")[1].split(" ms")[0])
+            return timestamp, latency, flags, rest
+    except (IndexError, ValueError):
+        pass
+
+    return None
+
+
+def parse_burst_details(rest: str) -> Tuple[int, Optional[float], Optional[float], float, float]:
+    """
+    Parse the details of a burst check line.
+
+    Args:
+        rest: Line text after the timestamp, containing
+            "(burst 5, min 24.00 ms, max 27.00 ms, loss 0.0%, jitter 1.20 ms)"
+
+    Returns:
+        Tuple of (probes sent, min latency, max latency, loss %, jitter);
+        min/max are None when every probe was lost
+
+    Raises:
+        IndexError, ValueError: If the details are malformed
+    """
+    details = rest.split(" (burst ", 1)[1].rstrip(")")
+    fields = details.split(", ")
+    values = {'burst': fields[0]}
+    for field in fields[1:]:
+        name, value = field.split(" ", 1)
+        values[name] = value.replace(" ms", "").rstrip("%")
+
+    return (
+        int(values['burst']),
+        float(values['min']) if 'min' in values else None,
+        float(values['max']) if 'max' in values else None,
+        float(values.get('loss', 0.0)),
+        float(values.get('jitter', 0.0))
+    )
+
+
+def read_lines_reversed(path, end: Optional[int] = None, block_size: int = 65536) -> Iterator[str]:
+    """
+    Iterate over the lines of a text log from the last to the first.
+
+    Reads fixed-size blocks backwards from the end, so taking the last few
+    lines of a large log only touches its last blocks.
+
+    Args:
+        path: Text log to read
+        end: Byte offset to start from (default: end of file)
+        block_size: Bytes read per seek
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, 2) if end is None else end
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+
+            # The first piece may be the end of a line that starts in the previous block
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line.decode("utf-8", errors="replace")
+
+        if remainder:
+            yield remainder.decode("utf-8", errors="replace")
+
+
+class BinaryLogReader:
+    """Memory-mapped, random-access reader for a binary log."""
+
+    def __init__(self, path):
+        """
+        Open a binary log.
+
+        Records appended after opening are not visible; open a new reader to
+        see them. A partially written last record is ignored.
+
+        Args:
+            path: Path to the binary log
+
+        Raises:
+            ValueError: If the file is not a binary log of a supported version
+        """
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = None
+        try:
+            header = self._file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{self.path} is not a binary log")
+            magic, version, record_size = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"{self.path} is not a version {VERSION} binary log")
+
+            size = self.path.stat().st_size
+            self._count = (size - HEADER.size) // RECORD.size
+            if self._count:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, index: int) -> Record:
+        """
+        Read one record.
+
+        Args:
+            index: Record number, negative values count from the end
+        """
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+        return decode_record(self._map, HEADER.size + index * RECORD.size)
+
+    def records(self, start: int = 0) -> Iterator[Record]:
+        """Iterate over the records from record number start."""
+        for index in range(max(0, start), self._count):
+            yield decode_record(self._map, HEADER.size + index * RECORD.size)
+
+    def raw_records(self) -> Iterator[Tuple[float, float, int]]:
+        """Iterate over undecoded (epoch, latency, flags) tuples, fastest for full scans."""
+        if not self._count:
+            return iter(())
+        end = HEADER.size + self._count * RECORD.size
+        return RECORD.iter_unpack(self._map[HEADER.size:end])
+
+    def tail(self, n: int) -> List[Record]:
+        """Read the last n records without touching the rest of the file."""
+        return list(self.records(self._count - n))
+
+    def close(self) -> None:
+        """Release the memory map and the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def convert_text_log(text_path, binary_path=None) -> int:
+    """
+    Convert a text log into a binary log.
+
+    Error lines and burst details are not converted.
+
+    Args:
+        text_path: Existing text log
+        binary_path: Output path (default: text_path with a .bin suffix)
+
+    Returns:
+        int: Number of records written
+    """
+    binary_path = binary_path or binary_log_file(text_path)
+    count = 0
+    with open(text_path, "r", encoding="utf-8") as src, open(binary_path, "wb") as dst:
+        dst.write(file_header())
+        for line in src:
+            parsed = parse_text_line(line)
+            if parsed is None:
+                continue
+            timestamp, latency, flags, _ = parsed
+            dst.write(encode_record(timestamp, latency, flags))
+            count += 1
+    return count
+
+
+def render_text_log(binary_path, count: Optional[int] = None) -> Iterator[str]:
+    """
+    Render a binary log in the text log format.
+
+    Args:
+        binary_path: Binary log to read
+        count: Only render the last count records
+    """
+    with BinaryLogReader(binary_path) as reader:
+        start = len(reader) - count if count is not None else 0
+        for timestamp, latency, flags in reader.records(start):
+            yield format_text_line(timestamp, latency, flags)
+
+
+def main(argv=None) -> int:
+    """Command line entry point for converting and rendering logs."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    if len(argv) >= 2 and argv[0] == "convert":
+        output = argv[2] if len(argv) > 2 else binary_log_file(argv[1])
+        count = convert_text_log(argv[1], output)
+        print(f"Converted {count} records to {output}")
+        return 0
+
+    if len(argv) >= 2 and argv[0] == "render":
+        count = int(argv[2]) if len(argv) > 2 else None
+        try:
+            for line in render_text_log(argv[1], count):
+                print(line)
+        except BrokenPipeError:
+            pass
+        return 0
+
+    print(__doc__.split("Command line:")[1].rstrip())
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
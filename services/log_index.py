@@ -0,0 +1,303 @@
+"""
+Log Index - Sparse time index for seeking into the text log by time
+Follows Single Responsibility Principle (SRP)
+
+The index is a side-car file next to the log ("log.txt.index") with one
+entry per minute that has log lines: the minute and the byte offset of its
+first line. LoggerService appends entries as it writes lines, so reading a
+time range seeks straight to the right minute instead of scanning the log.
+
+The index is only a hint. Readers validate it against the log and fall back
+to reading from the start; the logger rebuilds it from the log when it no
+longer matches (log cleared, replaced or rotated).
+
+    header: magic "NTLI", version (uint16), bucket seconds (uint16)
+    entry:  minute as local seconds since 1970-01-01 (int64), byte offset (uint64)
+
+Command line:
+    python -m services.log_index log.txt "2025-10-28 02:00" "2025-10-28 02:15"
+    python -m services.log_index rebuild log.txt
+"""
+import bisect
+import os
+import re
+import struct
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from services.log_format import (
+    TIMESTAMP_FORMAT, archived_segments, index_file, read_segment_lines, segment_time
+)
+
+INDEX_MAGIC = b"NTLI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sHH")
+INDEX_ENTRY = struct.Struct("<qQ")
+
+BUCKET_SECONDS = 60
+MINUTE_FORMAT = "%Y-%m-%d %H:%M"
+
+_EPOCH = datetime(1970, 1, 1)
+# "[YYYY-MM-DD HH:MM" of a log line
+_MINUTE = slice(1, 17)
+_TIMESTAMP = slice(1, 20)
+_TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d")
+
+
+def _minute_key(minute: str) -> int:
+    """Convert a "YYYY-MM-DD HH:MM" prefix to local seconds since 1970-01-01."""
+    return int((datetime.strptime(minute, MINUTE_FORMAT) - _EPOCH).total_seconds())
+
+
+def _minute_text(key: int) -> str:
+    """Convert an index key back to its "YYYY-MM-DD HH:MM" prefix."""
+    return (_EPOCH + timedelta(seconds=key)).strftime(MINUTE_FORMAT)
+
+
+def _split_lines(text: str) -> Iterator[str]:
+    """Split text after every "\n" (the only line break the log is written with)."""
+    start = 0
+    while start < len(text):
+        newline = text.find("\n", start)
+        end = len(text) if newline < 0 else newline + 1
+        yield text[start:end]
+        start = end
+
+
+class LogIndex:
+    """Sparse minute -> byte offset index of a text log."""
+
+    def __init__(self, log_file: str):
+        """
+        Args:
+            log_file: Path to the text log
+        """
+        self.log_file = Path(log_file)
+        self.index_path = index_file(log_file)
+        # Minute of the last entry and log size covered, None until synced
+        self._last_minute = None
+        self._end = None
+        # Text files translate "\n" on write (os.linesep)
+        self._newline_extra = len(os.linesep) - 1
+
+    def add_lines(self, lines: List[str], offset: int, end: int) -> None:
+        """
+        Index lines that were just appended to the log (caller serializes appends).
+
+        Args:
+            lines: Appended text, one or more lines per item
+            offset: Log size before the append
+            end: Log size after the append
+        """
+        try:
+            if self._end != offset:
+                # First append, or the log changed behind our back
+                self._sync(offset)
+
+            entries = []
+            for text in lines:
+                if self._last_minute is not None and text[_MINUTE] <= self._last_minute:
+                    # Common case: the minute already has an entry; missing an
+                    # entry for a later line of the same text only makes seeks
+                    # start earlier
+                    length = len(text) if text.isascii() else len(text.encode("utf-8"))
+                    offset += length + self._newline_extra * text.count("\n")
+                    continue
+                for line in _split_lines(text):
+                    minute = line[_MINUTE]
+                    if (line.startswith("[") and (self._last_minute is None or minute > self._last_minute)
+                            and _TIMESTAMP_PATTERN.fullmatch(minute)):
+                        entries.append((_minute_key(minute), offset))
+                        self._last_minute = minute
+                    length = len(line) if line.isascii() else len(line.encode("utf-8"))
+                    offset += length + self._newline_extra * line.endswith("\n")
+
+            self._write_entries(entries)
+            # A mismatch means the offsets are off; rescan on the next append
+            self._end = end if offset == end else None
+        except (OSError, ValueError) as e:
+            self._end = None
+            print(f"Error updating log index: {e}")
+
+    def reset(self) -> None:
+        """Drop the index, e.g. after the log was rotated or cleared."""
+        try:
+            if self.index_path.exists():
+                self.index_path.unlink()
+        except OSError as e:
+            print(f"Error removing log index: {e}")
+        self._last_minute = None
+        self._end = None
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the index from the whole log.
+
+        Returns:
+            Number of index entries
+        """
+        size = self.log_file.stat().st_size if self.log_file.exists() else 0
+        self.reset()
+        self._sync(size)
+        return len(self.entries())
+
+    def _sync(self, size: int) -> None:
+        """Bring the index up to date with the first size bytes of the log."""
+        entries = self.entries()
+        if entries and entries[-1][1] >= size:
+            entries = None  # log shrank: cleared or replaced
+        if not entries:
+            self.index_path.write_bytes(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, BUCKET_SECONDS))
+            self._last_minute, position = None, 0
+        else:
+            # Drop a partially written entry so new ones stay aligned
+            os.truncate(self.index_path, INDEX_HEADER.size + len(entries) * INDEX_ENTRY.size)
+            self._last_minute, position = _minute_text(entries[-1][0]), entries[-1][1]
+
+        # Index lines written since the last entry (or all lines after a rebuild)
+        new_entries = []
+        with open(self.log_file, "rb") as f:
+            f.seek(position)
+            for raw in f:
+                if position + len(raw) > size:
+                    break
+                minute = raw[_MINUTE].decode("ascii", errors="replace")
+                if (raw.startswith(b"[") and (self._last_minute is None or minute > self._last_minute)
+                        and _TIMESTAMP_PATTERN.fullmatch(minute)):
+                    new_entries.append((_minute_key(minute), position))
+                    self._last_minute = minute
+                position += len(raw)
+        self._write_entries(new_entries)
+        self._end = size
+
+    def _write_entries(self, entries: List[Tuple[int, int]]) -> None:
+        """Append entries to the index file."""
+        if entries:
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(INDEX_ENTRY.pack(key, offset) for key, offset in entries))
+
+    def entries(self) -> List[Tuple[int, int]]:
+        """
+        Load the index if it matches the log.
+
+        Returns:
+            List of (minute key, byte offset), empty if the index is missing
+            or does not match the log
+        """
+        try:
+            data = self.index_path.read_bytes()
+            size = self.log_file.stat().st_size
+        except OSError:
+            return []
+
+        if len(data) < INDEX_HEADER.size:
+            return []
+        magic, version, bucket = INDEX_HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or bucket != BUCKET_SECONDS:
+            return []
+
+        # A partially written last entry is ignored
+        count = (len(data) - INDEX_HEADER.size) // INDEX_ENTRY.size
+        entries = list(INDEX_ENTRY.iter_unpack(data[INDEX_HEADER.size:INDEX_HEADER.size + count * INDEX_ENTRY.size]))
+        if entries and not self._matches(entries[-1], size):
+            return []
+        return entries
+
+    def _matches(self, entry: Tuple[int, int], size: int) -> bool:
+        """Check that the log line at an entry's offset starts in the entry's minute."""
+        key, offset = entry
+        if offset >= size:
+            return False
+        with open(self.log_file, "rb") as f:
+            f.seek(offset)
+            prefix = f.read(_MINUTE.stop)
+        return prefix == f"[{_minute_text(key)}".encode("ascii")
+
+    def offset_of(self, start: datetime) -> int:
+        """
+        Find where to start reading to get the lines at or after a time.
+
+        Args:
+            start: Start of the time range
+
+        Returns:
+            Byte offset of the first line of start's minute (or of the
+            closest earlier indexed minute; 0 without a usable index)
+        """
+        entries = self.entries()
+        key = int((start.replace(second=0, microsecond=0) - _EPOCH).total_seconds())
+        position = bisect.bisect_right([entry[0] for entry in entries], key)
+        return entries[position - 1][1] if position else 0
+
+
+def read_time_range(log_file: str, start: datetime, end: Optional[datetime] = None) -> Iterator[str]:
+    """
+    Stream the lines of a text log and its rotated segments in a time range.
+
+    Rotated segments that ended before start are skipped; the active log is
+    entered at the offset found in its index. Lines are compared on their
+    timestamp text, so no line is parsed.
+
+    Args:
+        log_file: Path to the text log
+        start: First time included
+        end: First time excluded (default: up to the end of the log)
+
+    Yields:
+        Log lines (without line break) with start <= timestamp < end, oldest first
+    """
+    start_text = start.strftime(TIMESTAMP_FORMAT)
+    end_text = end.strftime(TIMESTAMP_FORMAT) if end is not None else None
+
+    for segment in archived_segments(log_file):
+        rotated = segment_time(segment)
+        if rotated is not None and rotated < start:
+            continue
+        for line in read_segment_lines(segment):
+            timestamp = line[_TIMESTAMP]
+            if timestamp < start_text:
+                continue
+            if end_text is not None and timestamp >= end_text:
+                return
+            yield line.rstrip("\r\n")
+
+    log_path = Path(log_file)
+    if not log_path.exists():
+        return
+    with open(log_path, "rb") as f:
+        f.seek(LogIndex(log_file).offset_of(start))
+        for raw in f:
+            line = raw.decode("utf-8", errors="replace")
+            timestamp = line[_TIMESTAMP]
+            if not line.startswith("[") or timestamp < start_text:
+                continue
+            if end_text is not None and timestamp >= end_text:
+                return
+            yield line.rstrip("\r\n")
+
+
+def _parse_time(text: str) -> datetime:
+    """Parse "YYYY-MM-DD HH:MM[:SS]" from the command line."""
+    return datetime.strptime(text, TIMESTAMP_FORMAT if text.count(":") == 2 else MINUTE_FORMAT)
+
+
+def main(argv=None) -> int:
+    """Command line entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 2 and argv[0] == "rebuild":
+        print(f"Indexed {LogIndex(argv[1]).rebuild()} minutes of {argv[1]}")
+        return 0
+    if len(argv) in (2, 3) and argv[0] != "rebuild":
+        end = _parse_time(argv[2]) if len(argv) == 3 else None
+        for line in read_time_range(argv[0], _parse_time(argv[1]), end):
+            print(line)
+        return 0
+
+    print(__doc__.split("Command line:")[1].rstrip())
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,48 +2,224 @@
 Logger Service - Responsible for logging latency measurements
 Follows Single Responsibility Principle (SRP)
 """
+import gzip
+import os
+import queue
+import re
+import shutil
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+from services.log_format import (
+    FLAG_BURST, FLAG_DNS, HEADER, RECORD, archive_segment_file, archive_summary_file, archived_segments,
+    binary_log_file, decode_record, encode_record, file_header, parse_text_line, rollups_file,
+    segment_name, snapshot_file
+)
+from services.log_follower import LogFollower
+from services.log_index import LogIndex
+from services.segment_counter import summarize_archived_segments, summarized_segments
+
+
+def target_log_file(log_file: str, target: str) -> str:
+    """
+    Derive the per-target log file name used when monitoring several hosts.
+    
+    Args:
+        log_file: Configured log file path (e.g. "log.txt")
+        target: Target host name or address
+        
+    Returns:
+        str: Log file path for the target (e.g. "log_8.8.8.8.txt")
+    """
+    path = Path(log_file)
+    safe_target = re.sub(r"[^A-Za-z0-9._-]+", "_", target).strip("_")
+    return str(path.with_name(f"{path.stem}_{safe_target}{path.suffix}"))
 
 
 class LoggerService:
     """Service to log network latency measurements to file."""
     
-    def __init__(self, log_file: str = "log.txt"):
+    FSYNC_NONE = "none"
+    FSYNC_BATCH = "batch"
+    
+    # Queued by flush() to end the current batch early
+    _FLUSH = object()
+    
+    def __init__(self, log_file: str = "log.txt", batched: bool = False,
+                 flush_interval: float = 1.0, batch_size: int = 256,
+                 fsync: str = FSYNC_NONE, binary: bool = False,
+                 rotate_bytes: int = 0, rotate_seconds: float = 0,
+                 compress: bool = True, max_archives: int = 0,
+                 max_archive_days: float = 0, store=None, store_target: Optional[str] = None):
         """
         Initialize the logger service.
         
+        In batched mode log calls only queue the line; a writer thread
+        appends queued lines to the file in one write per batch. Call
+        close() (or flush()) before exiting so queued lines are not lost.
+        
         Args:
             log_file: Path to the log file
+            batched: Write through a background writer thread instead of
+                opening the file for every line
+            flush_interval: Maximum seconds a queued line waits before it is written
+            batch_size: Maximum number of lines per write
+            fsync: "batch" to fsync after every write, "none" to leave it to the OS
+            binary: Write latency and DNS measurements as fixed-width records
+                to the binary log (log_file with a .bin suffix); errors stay
+                in the text log
+            rotate_bytes: Rotate a log once it reaches this size (0 = never)
+            rotate_seconds: Rotate a log once its first entry is this old (0 = never)
+            compress: Gzip rotated segments in a background thread
+            max_archives: Rotated segments to keep per log (0 = all)
+            max_archive_days: Delete rotated segments older than this (0 = never)
+            store: Optional MeasurementStoreService; measurements are stored
+                there instead of the log file, errors stay in the text log
+            store_target: Target name measurements are stored under
         """
         self.log_file = Path(log_file)
+        self.binary_file = Path(binary_log_file(log_file)) if binary else None
+        self.store = store
+        self.store_target = store_target or str(log_file)
+        self.batched = batched
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.fsync = fsync
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.max_archives = max_archives
+        self.max_archive_days = max_archive_days
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._append_lock = threading.Lock()
+        self._archive_lock = threading.Lock()
+        self._segment_started = {}
+        # Sparse time index of the text log, kept up to date on every append
+        self._index = LogIndex(str(self.log_file))
         self._ensure_log_file_exists()
+        
+        # Finish archiving segments left uncompressed by a previous run
+        if self.compress and any(
+            segment.suffix != ".gz" for log_path in self._log_files() for segment in archived_segments(log_path)
+        ):
+            threading.Thread(target=self._archive_segments, daemon=True).start()
+    
+    def _log_files(self):
+        """Get the active log files written by this logger."""
+        return [self.log_file] if self.binary_file is None else [self.log_file, self.binary_file]
+    
+    def follow(self, from_start: bool = False) -> LogFollower:
+        """
+        Get a follower yielding the measurements appended to this log.
+        
+        With the binary log the follower reads the binary records (errors
+        stay in the text log); measurements kept in the SQLite store are not
+        written to a log and can't be followed.
+        
+        Args:
+            from_start: Also yield the records already in the log
+            
+        Returns:
+            LogFollower; iterate over it (or its follow()) to receive records
+        """
+        return LogFollower(str(self.binary_file or self.log_file), from_start=from_start)
     
     def _ensure_log_file_exists(self) -> None:
         """Create log file if it doesn't exist."""
         if not self.log_file.exists():
             self.log_file.touch()
+        if self.binary_file is not None and not self.binary_file.exists():
+            self.binary_file.write_bytes(file_header())
     
-    def log_latency(self, latency: Optional[float]) -> None:
+    def log_latency(self, latency: Optional[float], phases: Optional[Dict[str, float]] = None) -> None:
         """
         Log a latency measurement to the log file.
         
         Args:
             latency: Latency in milliseconds, or None if ping failed
+            phases: Optional per-phase breakdown in ms (e.g. HTTP dns/connect/tls/first_byte)
         """
+        if self.store is not None:
+            self.store.add(self.store_target, datetime.now(), latency)
+            return
+        
+        if self.binary_file is not None:
+            self._write(encode_record(datetime.now(), latency))
+            return
+        
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         if latency is not None:
-            message = f"[{timestamp}] Latency: {latency:.2f} ms\n"
+            message = f"[{timestamp}] Latency: {latency:.2f} ms"
+            if phases:
+                breakdown = ", ".join(f"{name} {value:.2f} ms" for name, value in phases.items())
+                message += f" ({breakdown})"
+            message += "\n"
         else:
             message = f"[{timestamp}] Latency: NO RESPONSE\n"
         
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(message)
-        except Exception as e:
-            print(f"Error writing to log file: {e}")
+        self._write(message)
+    
+    def log_burst(self, result) -> None:
+        """
+        Log the aggregated result of a burst check as one line.
+        
+        The line starts like a single-sample line (average latency), followed
+        by "(burst N, min X ms, max Y ms, loss Z%, jitter W ms)". The binary
+        log keeps only the average latency.
+        
+        Args:
+            result: BurstResult from BurstSampler
+        """
+        if self.store is not None:
+            self.store.add(self.store_target, result.timestamp, result.avg_latency, burst=result)
+            return
+        
+        if self.binary_file is not None:
+            self._write(encode_record(result.timestamp, result.avg_latency, FLAG_BURST))
+            return
+        
+        timestamp = result.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        
+        if result.avg_latency is not None:
+            message = (
+                f"[{timestamp}] Latency: {result.avg_latency:.2f} ms "
+                f"(burst {result.sent}, min {result.min_latency:.2f} ms, max {result.max_latency:.2f} ms, "
+                f"loss {result.loss_pct:.1f}%, jitter {result.jitter:.2f} ms)\n"
+            )
+        else:
+            message = f"[{timestamp}] Latency: NO RESPONSE (burst {result.sent}, loss 100.0%)\n"
+        
+        self._write(message)
+    
+    def log_dns(self, lookup_ms: Optional[float]) -> None:
+        """
+        Log a DNS lookup time to the log file.
+        
+        Args:
+            lookup_ms: Lookup time in milliseconds, or None if the lookup failed
+        """
+        if self.store is not None:
+            self.store.add(self.store_target, datetime.now(), lookup_ms, kind=self.store.KIND_DNS)
+            return
+        
+        if self.binary_file is not None:
+            self._write(encode_record(datetime.now(), lookup_ms, FLAG_DNS))
+            return
+        
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        if lookup_ms is not None:
+            message = f"[{timestamp}] DNS: {lookup_ms:.2f} ms\n"
+        else:
+            message = f"[{timestamp}] DNS: FAILED\n"
+        
+        self._write(message)
     
     def log_error(self, error_message: str) -> None:
         """
@@ -55,8 +231,256 @@ class LoggerService:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         message = f"[{timestamp}] ERROR: {error_message}\n"
         
+        self._write(message)
+    
+    def _write(self, message) -> None:
+        """
+        Append a text line (str) or binary record (bytes) now, or queue it
+        for the writer thread in batched mode.
+        """
+        if not self.batched:
+            self._append([message])
+            return
+        
+        self._ensure_writer()
+        self._queue.put(message)
+    
+    def _append(self, messages) -> None:
+        """
+        Append text lines and binary records to their log files, one write per file.
+        
+        Files are reopened for every write so that a log file deleted or
+        replaced by "Clear Log" is recreated instead of written to unlinked.
+        """
+        lines = [message for message in messages if isinstance(message, str)]
+        records = [message for message in messages if isinstance(message, bytes)]
+        
+        with self._append_lock:
+            try:
+                if lines:
+                    with open(self.log_file, "a", encoding="utf-8") as f:
+                        offset = f.tell()
+                        f.write("".join(lines))
+                        self._sync(f)
+                        size = f.tell()
+                    self._index.add_lines(lines, offset, size)
+                    self._rotate_if_due(self.log_file, size)
+                if records:
+                    with open(self.binary_file, "ab") as f:
+                        if f.tell() == 0:
+                            f.write(file_header())
+                        f.write(b"".join(records))
+                        self._sync(f)
+                        size = f.tell()
+                    self._rotate_if_due(self.binary_file, size)
+            except Exception as e:
+                print(f"Error writing to log file: {e}")
+    
+    def _rotate_if_due(self, log_path: Path, size: int) -> None:
+        """
+        Rotate a log that reached the size or age limit (caller holds _append_lock).
+        
+        The active log is renamed to a timestamped segment and a new one is
+        started; compression and retention run in a background thread.
+        """
+        if self.rotate_bytes and size >= self.rotate_bytes:
+            due = True
+        elif self.rotate_seconds:
+            due = time.time() - self._segment_start(log_path) >= self.rotate_seconds
+        else:
+            due = False
+        if not due:
+            return
+        
+        segment = archive_segment_file(log_path, datetime.now(), summarized_segments(str(log_path)))
         try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(message)
-        except Exception as e:
-            print(f"Error writing to log file: {e}")
+            os.replace(log_path, segment)
+        except OSError as e:
+            print(f"Error rotating log file: {e}")
+            return
+        
+        if log_path == self.binary_file:
+            log_path.write_bytes(file_header())
+        else:
+            log_path.touch()
+            self._index.reset()
+        self._segment_started[log_path] = time.time()
+        
+        threading.Thread(target=self._archive_segments, daemon=True).start()
+    
+    def _segment_start(self, log_path: Path) -> float:
+        """Get the epoch time of the first entry of the active log."""
+        if log_path not in self._segment_started:
+            started = None
+            try:
+                if log_path == self.binary_file:
+                    with open(log_path, "rb") as f:
+                        data = f.read(HEADER.size + RECORD.size)
+                    if len(data) == HEADER.size + RECORD.size:
+                        started = decode_record(data, HEADER.size)[0].timestamp()
+                else:
+                    with open(log_path, "r", encoding="utf-8") as f:
+                        parsed = parse_text_line(f.readline())
+                    if parsed is not None:
+                        started = parsed[0].timestamp()
+            except (OSError, ValueError, IndexError):
+                pass
+            self._segment_started[log_path] = started or time.time()
+        return self._segment_started[log_path]
+    
+    def _archive_segments(self) -> None:
+        """
+        Summarize, compress and prune rotated segments (runs in background thread).
+        
+        Segments are summarized before they are compressed or deleted so the
+        archive summary always covers them.
+        """
+        with self._archive_lock:
+            for log_path in self._log_files():
+                try:
+                    self._archive_log_segments(log_path)
+                except Exception as e:
+                    print(f"Error archiving log segments: {e}")
+    
+    def _archive_log_segments(self, log_path: Path) -> None:
+        """Archive the rotated segments of one log file."""
+        summarize_archived_segments(str(log_path))
+        
+        if self.compress:
+            for segment in archived_segments(log_path):
+                if segment.suffix != ".gz":
+                    self._compress_segment(segment)
+        
+        self._apply_retention(log_path)
+    
+    @staticmethod
+    def _compress_segment(segment: Path) -> None:
+        """Gzip a segment next to itself and remove the plain file."""
+        compressed = segment.with_name(segment.name + ".gz")
+        partial = segment.with_name(segment.name + ".gz.tmp")
+        with open(segment, "rb") as src, gzip.open(partial, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(partial, compressed)
+        segment.unlink()
+    
+    def _apply_retention(self, log_path: Path) -> None:
+        """Delete rotated segments beyond the configured count and age."""
+        segments = archived_segments(log_path)
+        expired = []
+        summarized = summarized_segments(str(log_path))
+        if self.max_archives and len(segments) > self.max_archives:
+            expired = segments[:len(segments) - self.max_archives]
+        if self.max_archive_days:
+            cutoff = time.time() - self.max_archive_days * 86400
+            expired += [segment for segment in segments
+                        if segment not in expired and segment.stat().st_mtime < cutoff]
+        
+        # Segments rotated after the last summarize are left for the next pass
+        for segment in expired:
+            if segment_name(segment) in summarized:
+                segment.unlink()
+    
+    def _sync(self, f) -> None:
+        """Force a write to disk if the fsync policy asks for it."""
+        if self.fsync == self.FSYNC_BATCH:
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _ensure_writer(self) -> None:
+        """Start the writer thread if it is not running."""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+    
+    def _writer_loop(self) -> None:
+        """Group queued lines into batches and append them (runs in writer thread)."""
+        stopping = False
+        while not stopping:
+            message = self._queue.get()
+            if message is None:
+                self._queue.task_done()
+                break
+            
+            # Collect until the batch is full, the oldest line has waited long
+            # enough or flush() asks for the batch to be written now
+            batch = []
+            taken = 1
+            deadline = time.monotonic() + self.flush_interval
+            while message is not self._FLUSH:
+                batch.append(message)
+                if len(batch) >= self.batch_size:
+                    break
+                timeout = deadline - time.monotonic()
+                try:
+                    message = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if message is None:
+                    stopping = True
+                    break
+            
+            if batch:
+                self._append(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+    
+    def flush(self) -> None:
+        """Write every queued line now and wait until it is written (batched mode)."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(self._FLUSH)
+            self._queue.join()
+        if self.store is not None:
+            self.store.flush()
+    
+    def close(self) -> None:
+        """
+        Write all queued lines and stop the writer thread.
+        
+        Logging after close() starts a new writer thread. A shared
+        measurement store is flushed but left open.
+        """
+        if self.store is not None:
+            self.store.flush()
+        
+        with self._writer_lock:
+            writer = self._writer
+            if writer is None or not writer.is_alive():
+                return
+            self._queue.put(None)
+        writer.join()
+        
+        # Lines queued while the writer was shutting down
+        pending = []
+        while True:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if message is not None:
+                pending.append(message)
+        if pending:
+            self._append(pending)
+    
+    def clear(self) -> None:
+        """Delete the log, its rotated segments, archive summary, snapshot and rollups, and start a new log."""
+        self.flush()
+        if self.store is not None:
+            self.store.clear(self.store_target)
+        with self._append_lock:
+            for log_path in self._log_files():
+                for path in archived_segments(log_path) + [
+                    log_path, archive_summary_file(log_path), snapshot_file(log_path),
+                    rollups_file(log_path)
+                ]:
+                    if path.exists():
+                        path.unlink()
+                        print(f"Cleared log file: {path}")
+                self._segment_started.pop(log_path, None)
+            self._index.reset()
+            self._ensure_log_file_exists()
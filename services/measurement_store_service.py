@@ -0,0 +1,306 @@
+"""
+Measurement Store Service - Stores measurements of all targets in SQLite
+Follows Single Responsibility Principle (SRP)
+
+Measurements are inserted in batches by a writer thread into a database in
+WAL mode, so readers (statistics restore, the statistics window) never block
+the writer and queries by target and time range use an index instead of
+scanning a log file.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS measurements (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    kind INTEGER NOT NULL DEFAULT 0,
+    latency REAL,
+    sent INTEGER,
+    min_latency REAL,
+    max_latency REAL,
+    loss_pct REAL,
+    jitter REAL
+);
+CREATE INDEX IF NOT EXISTS idx_measurements_target_time
+    ON measurements (target, timestamp);
+CREATE INDEX IF NOT EXISTS idx_measurements_target_failures
+    ON measurements (target, timestamp) WHERE latency IS NULL;
+"""
+
+INSERT = """
+INSERT INTO measurements (target, timestamp, kind, latency, sent, min_latency, max_latency, loss_pct, jitter)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# (timestamp, latency, sent, min_latency, max_latency, loss_pct, jitter)
+Row = Tuple[datetime, Optional[float], Optional[int], Optional[float], Optional[float], Optional[float], Optional[float]]
+
+
+class MeasurementStoreService:
+    """Service to store and query measurements in a SQLite database."""
+
+    KIND_CHECK = 0
+    KIND_DNS = 1
+
+    def __init__(self, db_path: str = "measurements.db", flush_interval: float = 1.0,
+                 batch_size: int = 256):
+        """
+        Initialize the store and create the schema if needed.
+
+        Args:
+            db_path: Path to the SQLite database
+            flush_interval: Maximum seconds a measurement waits before it is inserted
+            batch_size: Maximum number of measurements per transaction
+        """
+        self.db_path = Path(db_path)
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._local = threading.local()
+
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        connection.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection for the calling thread."""
+        connection = sqlite3.connect(str(self.db_path), timeout=30)
+        # WAL only needs a sync per checkpoint to stay consistent
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get the calling thread's read connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def add(self, target: str, timestamp: datetime, latency: Optional[float],
+            kind: int = KIND_CHECK, burst=None) -> None:
+        """
+        Queue a measurement for insertion.
+
+        Args:
+            target: Target host the measurement belongs to
+            timestamp: When the measurement was taken
+            latency: Latency (or DNS lookup time) in ms, None if it failed
+            kind: KIND_CHECK or KIND_DNS
+            burst: Optional BurstResult with the aggregates of a burst check
+        """
+        row = (target, timestamp.timestamp(), kind, latency)
+        if burst is not None:
+            row += (burst.sent, burst.min_latency, burst.max_latency, burst.loss_pct, burst.jitter)
+        else:
+            row += (None, None, None, None, None)
+
+        self._ensure_writer()
+        self._queue.put(row)
+
+    def _ensure_writer(self) -> None:
+        """Start the writer thread if it is not running."""
+        if self._writer is not None and self._writer.is_alive():
+            return
+
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self) -> None:
+        """Insert queued measurements in batched transactions (runs in writer thread)."""
+        connection = self._connect()
+        stopping = False
+        try:
+            while not stopping:
+                row = self._queue.get()
+                if row is None:
+                    self._queue.task_done()
+                    break
+
+                # Collect until the batch is full or the oldest row has waited long enough
+                batch = [row]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        row = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if row is None:
+                        stopping = True
+                        break
+                    batch.append(row)
+
+                try:
+                    with connection:
+                        connection.executemany(INSERT, batch)
+                except sqlite3.Error as e:
+                    print(f"Error writing to measurement store: {e}")
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+        finally:
+            connection.close()
+
+    def flush(self) -> None:
+        """Block until every queued measurement has been inserted."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Insert all queued measurements and stop the writer thread."""
+        with self._writer_lock:
+            writer = self._writer
+            if writer is None or not writer.is_alive():
+                return
+            self._queue.put(None)
+        writer.join()
+
+    def query(self, target: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              failures_only: bool = False, kind: int = KIND_CHECK,
+              limit: Optional[int] = None) -> List[Row]:
+        """
+        Fetch measurements of a target, newest first.
+
+        Args:
+            target: Target host
+            start: Only measurements at or after this time
+            end: Only measurements before this time
+            failures_only: Only failed measurements
+            kind: KIND_CHECK or KIND_DNS
+            limit: Maximum number of rows
+
+        Returns:
+            List of (timestamp, latency, sent, min_latency, max_latency, loss_pct, jitter)
+        """
+        sql = ("SELECT timestamp, latency, sent, min_latency, max_latency, loss_pct, jitter "
+               "FROM measurements WHERE target = ? AND kind = ?")
+        params = [target, kind]
+        sql, params = self._add_range(sql, params, start, end)
+        if failures_only:
+            sql += " AND latency IS NULL"
+        sql += " ORDER BY timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._reader().execute(sql, params).fetchall()
+        return [(datetime.fromtimestamp(row[0]),) + tuple(row[1:]) for row in rows]
+
+    def iter_checks(self, target: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    batch_size: int = 10000) -> Iterator[Tuple[datetime, Optional[float]]]:
+        """
+        Iterate over the checks of a target, oldest first, without loading them all.
+
+        Args:
+            target: Target host
+            start: Only checks at or after this time
+            end: Only checks before this time
+            batch_size: Rows fetched from SQLite at a time
+
+        Yields:
+            (timestamp, latency) tuples, latency None for failed checks
+        """
+        sql = "SELECT timestamp, latency FROM measurements WHERE target = ? AND kind = ?"
+        sql, params = self._add_range(sql, [target, self.KIND_CHECK], start, end)
+        cursor = self._reader().execute(sql + " ORDER BY timestamp", params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for timestamp, latency in rows:
+                yield datetime.fromtimestamp(timestamp), latency
+
+    def aggregate(self, target: str, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None) -> Dict:
+        """
+        Compute totals of a target in SQL.
+
+        Args:
+            target: Target host
+            start: Only measurements at or after this time
+            end: Only measurements before this time
+
+        Returns:
+            Dictionary with the counters used by StatsTrackerService plus
+            min_latency and max_latency
+        """
+        sql = (
+            "SELECT COUNT(*), SUM(latency IS NULL), TOTAL(latency), MIN(latency), MAX(latency), "
+            "COUNT(sent), SUM(sent IS NOT NULL AND latency IS NULL), TOTAL(sent), "
+            "TOTAL(ROUND(sent * loss_pct / 100)), TOTAL(jitter) "
+            "FROM measurements WHERE target = ? AND kind = ?"
+        )
+        sql, params = self._add_range(sql, [target, self.KIND_CHECK], start, end)
+        checks = self._reader().execute(sql, params).fetchone()
+
+        sql = "SELECT COUNT(*), SUM(latency IS NULL), TOTAL(latency) FROM measurements WHERE target = ? AND kind = ?"
+        sql, params = self._add_range(sql, [target, self.KIND_DNS], start, end)
+        dns = self._reader().execute(sql, params).fetchone()
+
+        return {
+            'total_pings': checks[0],
+            'failed_pings': checks[1] or 0,
+            'total_latency': checks[2],
+            'min_latency': checks[3],
+            'max_latency': checks[4],
+            'burst_checks': checks[5],
+            'burst_failed_checks': checks[6] or 0,
+            'burst_probes_sent': int(checks[7]),
+            'burst_probes_lost': int(checks[8]),
+            'total_jitter': checks[9],
+            'dns_lookups': dns[0],
+            'dns_failures': dns[1] or 0,
+            'total_dns_ms': dns[2]
+        }
+
+    def rows_after(self, after_id: int = 0, limit: int = 100000) -> List[tuple]:
+        """
+        Fetch measurements of all targets in insertion order, for exports.
+
+        Args:
+            after_id: Only rows with a larger id (the last id of the previous call)
+            limit: Maximum number of rows
+
+        Returns:
+            List of (id, target, epoch timestamp, kind, latency)
+        """
+        sql = ("SELECT id, target, timestamp, kind, latency FROM measurements "
+               "WHERE id > ? ORDER BY id LIMIT ?")
+        return self._reader().execute(sql, (after_id, limit)).fetchall()
+
+    @staticmethod
+    def _add_range(sql: str, params: list, start: Optional[datetime], end: Optional[datetime]):
+        """Append time range conditions to a query."""
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(start.timestamp())
+        if end is not None:
+            sql += " AND timestamp < ?"
+            params.append(end.timestamp())
+        return sql, params
+
+    def clear(self, target: Optional[str] = None) -> None:
+        """
+        Delete stored measurements.
+
+        Args:
+            target: Only delete this target's measurements (default: all)
+        """
+        self.flush()
+        connection = self._reader()
+        with connection:
+            if target is None:
+                connection.execute("DELETE FROM measurements")
+            else:
+                connection.execute("DELETE FROM measurements WHERE target = ?", (target,))
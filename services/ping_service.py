@@ -6,21 +6,46 @@ import subprocess
 import platform
 import re
 import sys
-from typing import Optional
+import threading
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+from services.dns_cache_service import DnsCacheService
 
 
 class PingService:
     """Service to perform ping operations and measure latency."""
     
-    def __init__(self, host: str = "8.8.8.8"):
+    MODE_SINGLE = "single"
+    MODE_STREAM = "stream"
+    
+    # Shortest interval an unprivileged `ping -i` accepts on Linux
+    MIN_STREAM_INTERVAL = 0.2
+    
+    def __init__(self, host: str = "8.8.8.8", mode: str = MODE_SINGLE, stream_interval: float = 1.0,
+                 resolver: Optional[DnsCacheService] = None):
         """
         Initialize the ping service.
         
         Args:
             host: The host to ping (default: Google DNS 8.8.8.8)
+            mode: "single" runs one ping process per sample, "stream" keeps
+                one long-running ping process and parses its output (see stream())
+            stream_interval: Seconds between echo requests in stream mode
+            resolver: Optional DNS cache; when set the cached address is pinged
+                instead of resolving the host name on every ping
         """
-        self.host = host
+        self._host = host
+        self.resolver = resolver
+        self.mode = mode
+        self.stream_interval = max(self.MIN_STREAM_INTERVAL, stream_interval)
         self._is_windows = platform.system().lower() == "windows"
+        self._is_linux = platform.system().lower() == "linux"
+        
+        self._stream_lock = threading.Lock()
+        self._stream_process = None
+        # Set by close(); stream() ends and no new ping process is started
+        self._stream_closed = threading.Event()
         
         # Windows-specific: Create startup info to hide console window
         if self._is_windows:
@@ -37,6 +62,32 @@ class PingService:
             self._startupinfo = None
             self._creationflags = 0
     
+    @property
+    def host(self) -> str:
+        """The host being pinged."""
+        return self._host
+    
+    @host.setter
+    def host(self, value: str) -> None:
+        """Change the host, restarting the stream process if one is running."""
+        if value != self._host:
+            self._host = value
+            if self.resolver is not None:
+                self.resolver.host = value
+            self._stop_stream_process()
+    
+    def _target_address(self) -> Optional[str]:
+        """
+        Get the address to ping.
+        
+        Returns:
+            str: Cached IP address (or host name without a resolver), None if
+            the resolver has no usable address
+        """
+        if self.resolver is None:
+            return self._host
+        return self.resolver.resolve()
+    
     def ping(self) -> Optional[float]:
         """
         Perform a ping operation and return latency in milliseconds.
@@ -45,12 +96,16 @@ class PingService:
             float: Latency in milliseconds, or None if ping failed
         """
         try:
+            address = self._target_address()
+            if address is None:
+                return None
+            
             # Prepare ping command based on OS
             param = "-n" if self._is_windows else "-c"
             timeout_param = "-w" if self._is_windows else "-W"
             
             # Execute ping command with 1 packet and 5 second timeout
-            command = ["ping", param, "1", timeout_param, "5000" if self._is_windows else "5", self.host]
+            command = ["ping", param, "1", timeout_param, "5000" if self._is_windows else "5", address]
             
             result = subprocess.run(
                 command,
@@ -97,3 +152,155 @@ class PingService:
             
         except (ValueError, AttributeError):
             return None
+    
+    def stream(self) -> Iterator[Tuple[datetime, Optional[float]]]:
+        """
+        Run one long-lived ping process and yield its results as they arrive.
+        
+        Lost sequence numbers are reported as failures. The child process is
+        restarted when it dies or when the host changes; the generator ends
+        once close() is called, and yields nothing after close() until
+        start() is called again. The child is terminated when the consumer
+        stops iterating.
+        
+        Yields:
+            tuple: (timestamp, latency in ms or None if the echo was lost)
+        """
+        while not self._stream_closed.is_set():
+            process = self._start_stream_process()
+            if process is None:
+                if self._stream_closed.is_set():
+                    break
+                # ping binary unavailable - report a failure and retry later
+                yield datetime.now(), None
+                self._stream_closed.wait(max(self.stream_interval, 1.0))
+                continue
+            
+            try:
+                last_sequence = None
+                for line in process.stdout:
+                    parsed = self._parse_stream_line(line)
+                    if parsed is None:
+                        continue
+                    
+                    sequence, latency = parsed
+                    now = datetime.now()
+                    
+                    if sequence is not None:
+                        if last_sequence is not None:
+                            gap = (sequence - last_sequence) & 0xFFFF
+                            if gap == 0 or gap > 0x8000:
+                                # Duplicate, or a late reply already counted as lost
+                                continue
+                            for _ in range(gap - 1):
+                                yield now, None
+                        last_sequence = sequence
+                    
+                    yield now, latency
+                
+                process.wait()
+            finally:
+                # Also reached when the consumer breaks out of the loop
+                with self._stream_lock:
+                    if self._stream_process is process:
+                        self._stop_stream_process_locked()
+            
+            # Child died or was restarted; avoid a tight respawn loop
+            self._stream_closed.wait(min(self.stream_interval, 1.0))
+    
+    def start(self) -> None:
+        """Allow stream() to run again after close()."""
+        self._stream_closed.clear()
+    
+    def close(self) -> None:
+        """Stop streaming and terminate the ping process, if any."""
+        with self._stream_lock:
+            self._stream_closed.set()
+            self._stop_stream_process_locked()
+    
+    def _stream_command(self) -> list:
+        """Build the command line for a long-running ping process."""
+        address = self._target_address() or self._host
+        if self._is_windows:
+            # Windows ping has a fixed one second interval
+            return ["ping", "-t", address]
+        
+        command = ["ping", "-i", f"{self.stream_interval:g}"]
+        if self._is_linux:
+            # Report "no answer yet" so outages show up without waiting for a reply
+            command.append("-O")
+        command.append(address)
+        return command
+    
+    def _start_stream_process(self) -> Optional[subprocess.Popen]:
+        """
+        Start the long-running ping process.
+        
+        Returns:
+            subprocess.Popen: The child process, or None if it could not start
+                or close() was called
+        """
+        with self._stream_lock:
+            self._stop_stream_process_locked()
+            if self._stream_closed.is_set():
+                return None
+            try:
+                self._stream_process = subprocess.Popen(
+                    self._stream_command(),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    stdin=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1,
+                    startupinfo=self._startupinfo if self._is_windows else None,
+                    creationflags=self._creationflags if self._is_windows else 0
+                )
+            except OSError:
+                self._stream_process = None
+            return self._stream_process
+    
+    def _stop_stream_process(self) -> None:
+        """Terminate the stream process so the reader restarts or exits."""
+        with self._stream_lock:
+            self._stop_stream_process_locked()
+    
+    def _stop_stream_process_locked(self) -> None:
+        """Terminate the stream process; caller must hold the stream lock."""
+        process = self._stream_process
+        self._stream_process = None
+        if process is None or process.poll() is not None:
+            return
+        
+        try:
+            process.terminate()
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        except OSError:
+            pass
+    
+    def _parse_stream_line(self, line: str) -> Optional[Tuple[Optional[int], Optional[float]]]:
+        """
+        Parse one line of continuous ping output.
+        
+        Args:
+            line: A line of ping output
+            
+        Returns:
+            tuple: (sequence number or None, latency in ms or None for a loss),
+            or None if the line carries no result
+        """
+        line = line.lower()
+        
+        sequence_match = re.search(r"icmp_seq[= ](\d+)", line)
+        sequence = int(sequence_match.group(1)) if sequence_match else None
+        
+        if any(marker in line for marker in ("no answer yet", "request timeout", "request timed out",
+                                             "unreachable", "general failure")):
+            return sequence, None
+        
+        latency = self._parse_latency(line)
+        if latency is None:
+            return None
+        
+        return sequence, latency
@@ -0,0 +1,478 @@
+"""
+Probe Service - Measures latency with TCP, UDP and HTTP(S) probes
+Follows Open/Closed Principle (OCP)
+
+Every probe type exposes the same ``host`` / ``ping()`` / ``close()``
+interface as PingService, so it plugs into GUINetworkMonitor and feeds the
+StatsTrackerService/LoggerService pipeline unchanged. Targets select a probe
+type with a URL-style prefix:
+
+    tcp://example.com:443    TCP connect time
+    udp://10.0.0.1:7         UDP echo round trip
+    http://example.com/      HTTP HEAD or GET (per-phase timing)
+    https://example.com/x    HTTPS HEAD or GET (per-phase timing)
+"""
+import abc
+import http.client
+import socket
+import select
+import ssl
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from services.dns_cache_service import DnsCacheService
+
+
+def overlapped_pings(pings: Sequence[Callable[[], Optional[float]]], spacing: float,
+                     timeout: float) -> List[Optional[float]]:
+    """
+    Start blocking probes on a fixed schedule without waiting for earlier ones.
+
+    Each probe runs in its own thread, started spacing seconds after the
+    previous one. All share one deadline, timeout seconds after the last
+    start; probes still running then count as lost.
+
+    Args:
+        pings: One ping() callable per probe; they must be safe to run concurrently
+        spacing: Seconds between the starts of consecutive probes
+        timeout: Seconds the last probe may take
+
+    Returns:
+        List of latencies in ms in start order, None for lost probes
+    """
+    results: List[Optional[float]] = [None] * len(pings)
+
+    def run(index, ping):
+        results[index] = ping()
+
+    threads = []
+    start = time.monotonic()
+    for index, ping in enumerate(pings):
+        delay = start + index * spacing - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        thread = threading.Thread(target=run, args=(index, ping), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    # Copy, so probes finishing after the deadline do not change the result
+    return list(results)
+
+
+class ProbeService(abc.ABC):
+    """Base class for latency probes."""
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        """
+        Initialize the probe.
+
+        Args:
+            host: Host name or address to probe
+            port: Port to probe
+            timeout: Seconds to wait before considering the probe failed
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        # Optional DNS cache providing the address to probe
+        self.resolver: Optional[DnsCacheService] = None
+        # Per-phase timings in ms of the last successful probe (if supported)
+        self.last_phases: Dict[str, float] = {}
+
+    @abc.abstractmethod
+    def ping(self) -> Optional[float]:
+        """
+        Perform one probe and return latency in milliseconds.
+
+        Returns:
+            float: Latency in milliseconds, or None if the probe failed
+        """
+
+    def ping_many(self, count: int, spacing: float) -> List[Optional[float]]:
+        """
+        Send count probes spacing seconds apart without waiting for replies.
+
+        The default overlaps ping() calls in threads, which suits probes
+        that keep no state between calls; others override this.
+
+        Args:
+            count: Number of probes
+            spacing: Seconds between consecutive probes
+
+        Returns:
+            List of latencies in ms in send order, None for lost probes
+        """
+        return overlapped_pings([self.ping] * count, spacing, self.timeout)
+
+    def close(self) -> None:
+        """Release any connection kept between probes."""
+
+    def _resolve(self, socktype: int) -> tuple:
+        """
+        Resolve host and port.
+
+        Args:
+            socktype: socket.SOCK_STREAM or socket.SOCK_DGRAM
+
+        Returns:
+            tuple: (family, sockaddr) of the first address returned
+        """
+        host = self.host
+        if self.resolver is not None:
+            host = self.resolver.resolve()
+            if host is None:
+                raise OSError(f"Could not resolve {self.host}")
+
+        info = socket.getaddrinfo(host, self.port, type=socktype)[0]
+        return info[0], info[4]
+
+
+class TcpProbeService(ProbeService):
+    """Probe measuring TCP connect (three-way handshake) time."""
+
+    def __init__(self, host: str, port: int = 443, timeout: float = 5.0):
+        super().__init__(host, port, timeout)
+
+    def ping(self) -> Optional[float]:
+        """
+        Open and close a TCP connection, timing the handshake.
+
+        A new connection is made on every probe because the handshake is
+        what is being measured.
+
+        Returns:
+            float: Connect time in milliseconds, or None if it failed
+        """
+        try:
+            family, address = self._resolve(socket.SOCK_STREAM)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                start_ns = time.perf_counter_ns()
+                sock.connect(address)
+                latency = (time.perf_counter_ns() - start_ns) / 1_000_000
+            finally:
+                sock.close()
+
+            self.last_phases = {'connect': latency}
+            return latency
+
+        except OSError:
+            return None
+
+
+class UdpProbeService(ProbeService):
+    """Probe measuring the round trip to a UDP echo service."""
+
+    def __init__(self, host: str, port: int = 7, timeout: float = 5.0):
+        super().__init__(host, port, timeout)
+        self._socket = None
+        self._sequence = 0
+
+    def ping(self) -> Optional[float]:
+        """
+        Send a datagram and wait for it to be echoed back.
+
+        The connected socket is kept between probes.
+
+        Returns:
+            float: Round trip time in milliseconds, or None if no echo arrived
+        """
+        try:
+            if self._socket is None:
+                family, address = self._resolve(socket.SOCK_DGRAM)
+                self._socket = socket.socket(family, socket.SOCK_DGRAM)
+                self._socket.connect(address)
+
+            self._sequence += 1
+            token = f"nettester {self._sequence}".encode("ascii")
+            deadline = time.perf_counter() + self.timeout
+
+            start_ns = time.perf_counter_ns()
+            self._socket.send(token)
+
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._socket.settimeout(remaining)
+                # Stale echoes of earlier (timed out) probes are skipped
+                if self._socket.recv(2048) == token:
+                    latency = (time.perf_counter_ns() - start_ns) / 1_000_000
+                    self.last_phases = {'round_trip': latency}
+                    return latency
+
+        except socket.timeout:
+            return None
+        except OSError:
+            # e.g. ICMP port unreachable reported on the connected socket
+            self.close()
+            return None
+
+    def ping_many(self, count: int, spacing: float) -> List[Optional[float]]:
+        """
+        Send count datagrams spacing seconds apart and match the echoes.
+
+        Echoes are matched by their sequence token while the remaining
+        datagrams are sent; all share one deadline, timeout seconds after
+        the last send.
+
+        Returns:
+            List of round trip times in ms in send order, None for lost datagrams
+        """
+        latencies: List[Optional[float]] = [None] * count
+        try:
+            if self._socket is None:
+                family, address = self._resolve(socket.SOCK_DGRAM)
+                self._socket = socket.socket(family, socket.SOCK_DGRAM)
+                self._socket.connect(address)
+            sock = self._socket
+
+            outstanding = {}
+            sent = 0
+            next_send = time.perf_counter()
+            deadline = None
+            while True:
+                now = time.perf_counter()
+                if sent < count and now >= next_send:
+                    self._sequence += 1
+                    token = f"nettester {self._sequence}".encode("ascii")
+                    outstanding[token] = (sent, time.perf_counter_ns())
+                    sock.send(token)
+                    sent += 1
+                    next_send += spacing
+                    if sent == count:
+                        deadline = now + self.timeout
+                    continue
+                if sent == count and (not outstanding or now >= deadline):
+                    break
+
+                wake = next_send if sent < count else deadline
+                readable, _, _ = select.select([sock], [], [], max(0.0, wake - now))
+                if readable:
+                    token = sock.recv(2048)
+                    received_ns = time.perf_counter_ns()
+                    # Stale echoes of earlier probes are skipped
+                    if token in outstanding:
+                        index, start_ns = outstanding.pop(token)
+                        latencies[index] = (received_ns - start_ns) / 1_000_000
+                        self.last_phases = {'round_trip': latencies[index]}
+            return latencies
+
+        except (OSError, ValueError):
+            # e.g. ICMP port unreachable reported on the connected socket
+            self.close()
+            return latencies
+
+    def close(self) -> None:
+        """Close the UDP socket."""
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+
+class HttpProbeService(ProbeService):
+    """Probe timing an HTTP(S) request with a DNS/connect/TLS/first-byte breakdown."""
+
+    def __init__(self, url: str, method: str = "HEAD", timeout: float = 10.0,
+                 reuse_connection: bool = True):
+        """
+        Initialize the HTTP probe.
+
+        Args:
+            url: URL to request (http:// or https://)
+            method: HTTP method, "HEAD" or "GET"
+            timeout: Seconds to wait before considering the probe failed
+            reuse_connection: Keep the connection alive between probes so only
+                the request/first-byte phase is paid after the first probe
+        """
+        parts = urlsplit(url)
+        self.url = url
+        self.scheme = parts.scheme.lower()
+        default_port = 443 if self.scheme == "https" else 80
+        super().__init__(parts.hostname, parts.port or default_port, timeout)
+
+        self.method = method.upper()
+        if self.method not in ("HEAD", "GET"):
+            raise ValueError(f"Unsupported HTTP probe method: {method}")
+        self.reuse_connection = reuse_connection
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.last_status = None
+
+        self._connection = None
+        self._ssl_context = ssl.create_default_context() if self.scheme == "https" else None
+
+    def ping(self) -> Optional[float]:
+        """
+        Perform one request and return the total time in milliseconds.
+
+        Phase timings (dns, connect, tls, first_byte) are stored in
+        ``last_phases``; phases skipped thanks to a reused connection are 0.
+        A 5xx status counts as a failure. A kept-alive connection the server
+        has closed is replaced once, within the same timeout.
+
+        Returns:
+            float: Total latency in milliseconds, or None if the request failed
+        """
+        try:
+            phases = {'dns': 0.0, 'connect': 0.0, 'tls': 0.0, 'first_byte': 0.0}
+            deadline = time.monotonic() + self.timeout
+
+            reused = self._connection is not None
+            if not reused:
+                self._connection = self._connect(phases)
+
+            try:
+                status = self._request(phases)
+            except (ConnectionResetError, BrokenPipeError):
+                # RemoteDisconnected is a ConnectionResetError
+                if not reused:
+                    raise
+                # The server closed the idle keep-alive connection; retry once
+                # with what is left of the timeout
+                self.close()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._connection = self._connect(phases, remaining)
+                status = self._request(phases)
+
+            self.last_status = status
+            if status >= 500:
+                return None
+
+            self.last_phases = phases
+            return sum(phases.values())
+
+        except (http.client.HTTPException, OSError, ssl.SSLError):
+            self.close()
+            return None
+
+    def ping_many(self, count: int, spacing: float) -> List[Optional[float]]:
+        """
+        Send count requests spacing seconds apart without waiting for responses.
+
+        Overlapping requests cannot share the kept-alive connection, so each
+        is made on a new one and includes the dns/connect/tls phases.
+
+        Returns:
+            List of total latencies in ms in send order, None for failed requests
+        """
+        probes = [HttpProbeService(self.url, self.method, self.timeout, reuse_connection=False)
+                  for _ in range(count)]
+        for probe in probes:
+            probe.resolver = self.resolver
+        latencies = overlapped_pings([probe.ping for probe in probes], spacing, self.timeout)
+
+        for probe, latency in zip(probes, latencies):
+            if probe.last_status is not None:
+                self.last_status = probe.last_status
+            if latency is not None:
+                self.last_phases = probe.last_phases
+        return latencies
+
+    def close(self) -> None:
+        """Close the kept-alive connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self, phases: Dict[str, float],
+                 timeout: Optional[float] = None) -> http.client.HTTPConnection:
+        """
+        Resolve, connect and (for HTTPS) complete the TLS handshake.
+
+        Args:
+            phases: Phase timings to fill in
+            timeout: Socket timeout in seconds (default: the probe timeout)
+
+        Returns:
+            http.client.HTTPConnection: Connection bound to the new socket
+        """
+        start_ns = time.perf_counter_ns()
+        family, address = self._resolve(socket.SOCK_STREAM)
+        resolved_ns = time.perf_counter_ns()
+        phases['dns'] = (resolved_ns - start_ns) / 1_000_000
+
+        timeout = self.timeout if timeout is None else timeout
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+            connected_ns = time.perf_counter_ns()
+            phases['connect'] = (connected_ns - resolved_ns) / 1_000_000
+
+            if self._ssl_context is not None:
+                sock = self._ssl_context.wrap_socket(sock, server_hostname=self.host)
+                phases['tls'] = (time.perf_counter_ns() - connected_ns) / 1_000_000
+        except (OSError, ssl.SSLError):
+            sock.close()
+            raise
+
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        connection.sock = sock
+        return connection
+
+    def _request(self, phases: Dict[str, float]) -> int:
+        """
+        Send the request and wait for the response status line.
+
+        Args:
+            phases: Phase timings to fill in
+
+        Returns:
+            int: HTTP status code
+        """
+        default_port = 443 if self.scheme == "https" else 80
+        host_header = self.host if self.port == default_port else f"{self.host}:{self.port}"
+        headers = {'Host': host_header, 'User-Agent': 'NetworkTester'}
+        if not self.reuse_connection:
+            headers['Connection'] = 'close'
+
+        start_ns = time.perf_counter_ns()
+        self._connection.request(self.method, self.path, headers=headers)
+        response = self._connection.getresponse()
+        phases['first_byte'] = (time.perf_counter_ns() - start_ns) / 1_000_000
+
+        # Drain the body so the connection can be reused
+        response.read()
+        if response.will_close or not self.reuse_connection:
+            self.close()
+
+        return response.status
+
+
+def create_probe(target: str, timeout: Optional[float] = None,
+                 http_method: str = "HEAD") -> Optional[ProbeService]:
+    """
+    Create a probe for a URL-style target.
+
+    Args:
+        target: Target such as "tcp://host:443", "udp://host:7" or "https://host/path"
+        timeout: Probe timeout in seconds (default: probe type default)
+        http_method: Method of HTTP(S) probes, "HEAD" or "GET"
+
+    Returns:
+        ProbeService: The probe, or None if the target has no probe prefix
+        (plain hosts are pinged with ICMP)
+    """
+    parts = urlsplit(target)
+    scheme = parts.scheme.lower()
+    kwargs = {'timeout': timeout} if timeout is not None else {}
+
+    if scheme == "tcp":
+        return TcpProbeService(parts.hostname, parts.port or 443, **kwargs)
+    if scheme == "udp":
+        return UdpProbeService(parts.hostname, parts.port or 7, **kwargs)
+    if scheme in ("http", "https"):
+        return HttpProbeService(target, http_method, **kwargs)
+
+    return None
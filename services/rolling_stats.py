@@ -0,0 +1,296 @@
+"""
+Rolling Stats - Sliding time-window statistics and alert rules on them
+Follows Single Responsibility Principle (SRP)
+
+Lifetime averages hardly move after weeks of uptime. A RollingWindow keeps
+running sums over the checks of the last N seconds instead: each check is
+added once and expired once, so updates are amortized O(1). The maximum is
+kept in a monotonic queue of the checks that can still become the maximum.
+
+After a restart the windows are seeded from the restored history and, for
+the part of a window the history does not reach back to, from per-minute
+rollup buckets (expired as a whole, so a window is accurate to a minute).
+"""
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def window_label(seconds: float) -> str:
+    """Short label of a window length, e.g. "5 min", "1 h", "24 h"."""
+    if seconds >= 3600 and seconds % 3600 == 0:
+        return f"{seconds // 3600:.0f} h"
+    if seconds >= 60 and seconds % 60 == 0:
+        return f"{seconds // 60:.0f} min"
+    return f"{seconds:g} s"
+
+
+class RollingWindow:
+    """Success rate, mean, max and packet loss of the checks in the last length seconds."""
+
+    def __init__(self, length: float):
+        """
+        Args:
+            length: Window length in seconds
+        """
+        self.length = length
+        # (timestamp, checks, failures, latency sum, probes sent, probes lost)
+        # in time order; one entry per check, or per seeded rollup bucket
+        self._checks = deque()
+        # (timestamp, latency) with decreasing latencies; the front is the max
+        self._max_window = deque()
+        self._count = 0
+        self._failures = 0
+        self._total_latency = 0.0
+        self._probes_sent = 0
+        self._probes_lost = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def oldest(self) -> Optional[float]:
+        """Timestamp of the oldest check (or bucket) held, None if empty."""
+        return self._checks[0][0] if self._checks else None
+
+    def add(self, timestamp: float, latency: Optional[float], sent: int = 1,
+            lost: Optional[int] = None) -> None:
+        """
+        Add a check; checks must be added in time order.
+
+        Args:
+            timestamp: Epoch seconds of the check
+            latency: Latency in ms, or None if it failed
+            sent: Probes sent (burst checks send several)
+            lost: Probes lost (default: all if the check failed, else none)
+        """
+        if lost is None:
+            lost = sent if latency is None else 0
+        failed = latency is None
+        self._checks.append((timestamp, 1, int(failed), 0.0 if failed else latency, sent, lost))
+        self._count += 1
+        self._probes_sent += sent
+        self._probes_lost += lost
+        if failed:
+            self._failures += 1
+        else:
+            self._total_latency += latency
+            while self._max_window and self._max_window[-1][1] <= latency:
+                self._max_window.pop()
+            self._max_window.append((timestamp, latency))
+        self.expire(timestamp)
+
+    def prepend(self, timestamp: float, checks: int, failures: int, total_latency: float,
+                max_latency: Optional[float]) -> None:
+        """
+        Add an aggregate of checks older than every check held (a rollup bucket).
+
+        Args:
+            timestamp: Epoch seconds the aggregate expires by (bucket start)
+            checks: Number of checks
+            failures: Number of failed checks
+            total_latency: Sum of the latencies of the successful checks
+            max_latency: Maximum latency, None without successful checks
+        """
+        # Rollups do not keep probe counts; each check counts as one probe
+        self._checks.appendleft((timestamp, checks, failures, total_latency, checks, failures))
+        self._count += checks
+        self._failures += failures
+        self._total_latency += total_latency
+        self._probes_sent += checks
+        self._probes_lost += failures
+        # An older maximum only matters if it is larger than every newer one
+        if max_latency is not None and (not self._max_window or max_latency > self._max_window[0][1]):
+            self._max_window.appendleft((timestamp, max_latency))
+
+    def expire(self, now: float) -> None:
+        """Drop the checks older than length seconds before now."""
+        cutoff = now - self.length
+        checks = self._checks
+        while checks and checks[0][0] <= cutoff:
+            _, count, failures, total_latency, sent, lost = checks.popleft()
+            self._count -= count
+            self._failures -= failures
+            self._total_latency -= total_latency
+            self._probes_sent -= sent
+            self._probes_lost -= lost
+        while self._max_window and self._max_window[0][0] <= cutoff:
+            self._max_window.popleft()
+        if self._count == self._failures:
+            # No successful checks left: drop rounding residue of the sum
+            self._total_latency = 0.0
+
+    def clear(self) -> None:
+        """Forget all checks."""
+        self._checks.clear()
+        self._max_window.clear()
+        self._count = 0
+        self._failures = 0
+        self._total_latency = 0.0
+        self._probes_sent = 0
+        self._probes_lost = 0
+
+    def stats(self) -> Dict:
+        """
+        Get the window's statistics (call expire() first).
+
+        Returns:
+            Dictionary with checks, failed, success_rate, avg_latency,
+            max_latency and packet_loss; rates and latencies are None
+            without checks (or successful checks)
+        """
+        count = self._count
+        successes = count - self._failures
+        return {
+            'checks': count,
+            'failed': self._failures,
+            'success_rate': successes / count * 100 if count else None,
+            'avg_latency': self._total_latency / successes if successes else None,
+            'max_latency': self._max_window[0][1] if self._max_window else None,
+            'packet_loss': self._probes_lost / self._probes_sent * 100 if self._probes_sent else None
+        }
+
+
+class RollingStats:
+    """Rolling windows of several lengths fed by the same checks."""
+
+    # 5 minutes, 1 hour, 24 hours
+    DEFAULT_LENGTHS = (300, 3600, 86400)
+
+    def __init__(self, lengths: Iterable[float] = DEFAULT_LENGTHS):
+        """
+        Args:
+            lengths: Window lengths in seconds
+        """
+        self.windows = [RollingWindow(length) for length in sorted(set(lengths))]
+
+    @property
+    def lengths(self):
+        """Window lengths in seconds, shortest first."""
+        return [window.length for window in self.windows]
+
+    def add(self, timestamp: float, latency: Optional[float], sent: int = 1,
+            lost: Optional[int] = None) -> None:
+        """Add a check to every window, see RollingWindow.add()."""
+        for window in self.windows:
+            window.add(timestamp, latency, sent, lost)
+
+    def seed(self, buckets: Iterable[Tuple], width: float, before: float,
+             now: Optional[float] = None) -> None:
+        """
+        Fill in each window, before its oldest check, from rollup buckets.
+
+        Only buckets that end by before and by the oldest check a window
+        holds are added, so no check is counted twice; the window starts up
+        to one bucket late instead.
+
+        Args:
+            buckets: (start epoch seconds, checks, failures, latency sum,
+                max latency or None) tuples, oldest first
+            width: Bucket length in seconds
+            before: Epoch seconds from which on the windows were fed with
+                checks directly
+            now: Epoch seconds (default: current time)
+        """
+        now = time.time() if now is None else now
+        buckets = list(buckets)
+        for window in self.windows:
+            limit = before if window.oldest is None else min(before, window.oldest)
+            cutoff = now - window.length
+            for bucket in reversed(buckets):
+                start = bucket[0]
+                if start <= cutoff:
+                    break
+                if start + width <= limit:
+                    window.prepend(*bucket)
+
+    def clear(self) -> None:
+        """Forget all checks."""
+        for window in self.windows:
+            window.clear()
+
+    def stats(self, now: Optional[float] = None) -> Dict[float, Dict]:
+        """
+        Expire old checks and get the statistics of every window.
+
+        Args:
+            now: Epoch seconds (default: current time)
+
+        Returns:
+            Dictionary of window length -> RollingWindow.stats()
+        """
+        now = time.time() if now is None else now
+        result = {}
+        for window in self.windows:
+            window.expire(now)
+            result[window.length] = window.stats()
+        return result
+
+
+class WindowAlert:
+    """Alert rule on one rolling window: low success rate, high mean latency or packet loss."""
+
+    def __init__(self, window: float = 300, min_success_rate: float = 0,
+                 max_avg_latency: float = 0, max_packet_loss: float = 0, min_checks: int = 5):
+        """
+        Args:
+            window: Length of the window the rule looks at, in seconds
+            min_success_rate: Alert below this success rate in % (0 = off)
+            max_avg_latency: Alert above this mean latency in ms (0 = off)
+            max_packet_loss: Alert above this packet loss in % (0 = off)
+            min_checks: Checks the window needs before the rule applies
+        """
+        self.window = window
+        self.min_success_rate = min_success_rate
+        self.max_avg_latency = max_avg_latency
+        self.max_packet_loss = max_packet_loss
+        self.min_checks = min_checks
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["WindowAlert"]:
+        """
+        Create a rule from the "rolling_windows" section of the monitoring config.
+
+        Returns:
+            WindowAlert, or None if no threshold is set
+        """
+        rule = cls(
+            window=config.get('alert_window_seconds', 300),
+            min_success_rate=config.get('alert_min_success_rate', 0),
+            max_avg_latency=config.get('alert_max_avg_latency_ms', 0),
+            max_packet_loss=config.get('alert_max_packet_loss', 0),
+            min_checks=config.get('alert_min_checks', 5)
+        )
+        if not (rule.min_success_rate or rule.max_avg_latency or rule.max_packet_loss):
+            return None
+        return rule
+
+    def check(self, windows: Dict[float, Dict]) -> Optional[str]:
+        """
+        Evaluate the rule.
+
+        Args:
+            windows: StatsTrackerService.get_windows() output; must include
+                this rule's window
+
+        Returns:
+            Description of the breach, or None if the window is healthy
+            (or has too few checks)
+        """
+        stats = windows.get(self.window)
+        if stats is None or stats['checks'] < max(self.min_checks, 1):
+            return None
+
+        label = window_label(self.window)
+        if self.min_success_rate and stats['success_rate'] < self.min_success_rate:
+            return (f"success rate {stats['success_rate']:.1f}% over the last {label} "
+                    f"(threshold {self.min_success_rate:g}%)")
+        avg_latency = stats['avg_latency']
+        if self.max_avg_latency and avg_latency is not None and avg_latency > self.max_avg_latency:
+            return (f"average latency {avg_latency:.1f} ms over the last {label} "
+                    f"(threshold {self.max_avg_latency:g} ms)")
+        packet_loss = stats['packet_loss']
+        if self.max_packet_loss and packet_loss is not None and packet_loss > self.max_packet_loss:
+            return (f"packet loss {packet_loss:.1f}% over the last {label} "
+                    f"(threshold {self.max_packet_loss:g}%)")
+        return None
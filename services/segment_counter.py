@@ -0,0 +1,261 @@
+"""
+Segment Counter - Counts the lifetime totals of log segments
+Follows Single Responsibility Principle (SRP)
+
+Rotated segments are counted once and kept as counters in the log's archive
+summary (log.txt.archive.json); the active log is counted when a tracker
+restores. LoggerService, StatsTrackerService and the log analyzer share this
+module, so every part of the app counts a log the same way.
+"""
+import itertools
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from services import log_analysis
+from services.latency_sketch import LatencySketch
+from services.log_format import (
+    FLAG_BURST, FLAG_DNS, FLAG_NO_RESPONSE, HEADER, RECORD, BinaryLogReader, archive_summary_file,
+    archived_segments, is_binary_log, parse_burst_details, parse_text_line, read_segment_lines,
+    read_segment_records, segment_name
+)
+
+# Serializes updates of archive summaries between the logger and trackers
+_summary_lock = threading.Lock()
+
+
+class SegmentCounter:
+    """Additive counters, failure streak and latency sketch of one or more log segments."""
+
+    COUNTERS = log_analysis.COUNTERS
+
+    def __init__(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.total_latency = 0.0
+        self.total_dns_ms = 0.0
+        self.total_jitter = 0.0
+        # Failed checks at the end of what was counted
+        self.consecutive_failures = 0
+        self.latency_sketch = LatencySketch()
+
+    def counters(self) -> Dict:
+        """Get the additive counters, as stored in archive summaries."""
+        return {name: getattr(self, name) for name in self.COUNTERS}
+
+    def add_counters(self, counters: Dict) -> None:
+        """Add counters of other segments (e.g. from an archive summary)."""
+        for name in self.COUNTERS:
+            value = counters.get(name)
+            if value:
+                setattr(self, name, getattr(self, name) + value)
+
+    def add_sketch(self, data: Optional[Dict]) -> None:
+        """Merge a persisted latency sketch (LatencySketch.to_dict() output)."""
+        if data:
+            self.latency_sketch.merge(LatencySketch.from_dict(data))
+
+    def merge(self, other: "SegmentCounter") -> None:
+        """Add the totals of the segment that follows the ones counted so far."""
+        if other.consecutive_failures == other.total_pings:
+            self.consecutive_failures += other.consecutive_failures
+        else:
+            self.consecutive_failures = other.consecutive_failures
+        self.add_counters(other.counters())
+        self.latency_sketch.merge(other.latency_sketch)
+
+    def count_check(self, latency: Optional[float]) -> None:
+        """Count one check (latency None if it failed)."""
+        self.total_pings += 1
+        if latency is None:
+            self.failed_pings += 1
+            self.consecutive_failures += 1
+        else:
+            self.total_latency += latency
+            self.consecutive_failures = 0
+            self.latency_sketch.add(latency)
+
+    def count_dns(self, lookup_ms: Optional[float]) -> None:
+        """Count one DNS lookup (None if it failed)."""
+        self.dns_lookups += 1
+        if lookup_ms is None:
+            self.dns_failures += 1
+        else:
+            self.total_dns_ms += lookup_ms
+
+    def count_burst(self, sent: int, loss_pct: float, jitter: float, latency: Optional[float]) -> None:
+        """Count the probes of one burst check (the check itself is counted by count_check())."""
+        self.burst_checks += 1
+        self.burst_probes_sent += sent
+        self.burst_probes_lost += round(sent * loss_pct / 100)
+        self.total_jitter += jitter
+        if latency is None:
+            self.burst_failed_checks += 1
+
+    def count_segment(self, log_path: Path, end: Optional[int] = None) -> None:
+        """
+        Count the measurements of one plain or compressed log segment.
+
+        Args:
+            log_path: Path to the segment
+            end: Only count the first end bytes of a plain segment
+        """
+        log_path = Path(log_path)
+        if log_analysis.HAS_NUMPY:
+            self.count_arrays(log_analysis.load_log(log_path, end))
+        elif log_path.suffix == ".gz":
+            if Path(log_path.stem).suffix == ".bin":
+                self.count_records(read_segment_records(log_path))
+            else:
+                self.count_text_lines(read_segment_lines(log_path))
+        elif is_binary_log(log_path):
+            with BinaryLogReader(log_path) as reader:
+                count = len(reader) if end is None else (end - HEADER.size) // RECORD.size
+                self.count_records(itertools.islice(reader.raw_records(), count))
+        else:
+            with open(log_path, 'rb') as f:
+                self.count_text_lines(_read_lines_until(f, end))
+
+    def count_arrays(self, arrays) -> None:
+        """Count a segment parsed by the vectorized bulk parser (log_analysis.load_log())."""
+        summary = log_analysis.summarize(arrays, with_percentiles=False)
+        segment = SegmentCounter()
+        segment.add_counters(log_analysis.count_arrays(arrays, summary))
+        segment.consecutive_failures = summary['trailing_failures']
+        segment.latency_sketch.add_all(log_analysis.check_latencies(arrays))
+        self.merge(segment)
+
+    def count_text_lines(self, lines: Iterable[str]) -> None:
+        """
+        Count the lines of a text log.
+
+        Timestamps are not parsed, which makes this several times cheaper
+        than restoring history entries.
+        """
+        for line in lines:
+            # Latency and DNS lines; errors and malformed lines are skipped
+            parsed = parse_text_line(line, with_timestamp=False)
+            if parsed is None:
+                continue
+
+            _, latency, flags, rest = parsed
+            if flags & FLAG_DNS:
+                self.count_dns(latency)
+                continue
+
+            # Burst checks carry "(burst N, min .., max .., loss ..%, jitter ..)"
+            if flags & FLAG_BURST:
+                try:
+                    sent, _, _, loss_pct, jitter = parse_burst_details(rest)
+                except (IndexError, ValueError):
+                    continue
+                self.count_burst(sent, loss_pct, jitter, latency)
+            self.count_check(latency)
+
+    def count_records(self, records) -> None:
+        """Count undecoded (epoch, latency, flags) binary records."""
+        for _, latency, flags in records:
+            if flags & FLAG_NO_RESPONSE:
+                latency = None
+            if flags & FLAG_DNS:
+                self.count_dns(latency)
+            else:
+                self.count_check(latency)
+
+
+def _read_lines_until(f, end: Optional[int]):
+    """Iterate over the decoded lines of a binary file object up to byte offset end."""
+    position = 0
+    for line in f:
+        position += len(line)
+        if end is not None and position > end:
+            break
+        yield line.decode('utf-8', errors='replace')
+
+
+def summarized_segments(log_file: str) -> set:
+    """
+    Get the names of the segments counted in a log's archive summary.
+
+    A name stays in the summary until the next summarize after its segment
+    was deleted, so rotation must not reuse it before then.
+
+    Args:
+        log_file: Active log path
+    """
+    summary_path = archive_summary_file(log_file)
+    with _summary_lock:
+        try:
+            return set(json.loads(summary_path.read_text(encoding='utf-8'))['segments'])
+        except (OSError, ValueError, KeyError):
+            return set()
+
+
+def summarize_archived_segments(log_file: str) -> SegmentCounter:
+    """
+    Fold archived segments that are not in the archive summary yet into it.
+
+    Each rotated segment is parsed once; afterwards its counters are read from
+    the summary, so the segment may be compressed or deleted by retention
+    without losing totals.
+
+    Args:
+        log_file: Active log path whose segments are summarized
+
+    Returns:
+        SegmentCounter with the summed counters and latency sketch of all
+        archived segments
+    """
+    summary_path = archive_summary_file(log_file)
+    with _summary_lock:
+        summary = {'segments': [], 'counters': {}}
+        try:
+            if summary_path.exists():
+                summary = json.loads(summary_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read archive summary, rebuilding it: {e}")
+
+        counter = SegmentCounter()
+        counter.add_counters(summary['counters'])
+        counter.add_sketch(summary.get('latency_sketch'))
+
+        segments = archived_segments(log_file)
+        known = set(summary['segments'])
+        new_segments = [path for path in segments if segment_name(path) not in known]
+        if not new_segments:
+            return counter
+
+        failed = set()
+        for path in new_segments:
+            # A plain segment may have been compressed since it was listed
+            candidates = [path] if path.suffix == ".gz" else [path, path.with_name(path.name + ".gz")]
+            for candidate in candidates:
+                segment = SegmentCounter()
+                try:
+                    segment.count_segment(candidate)
+                except FileNotFoundError:
+                    continue
+                except (OSError, EOFError, ValueError) as e:
+                    # A partial count is dropped, so the segment is counted whole later
+                    print(f"⚠️ Could not summarize log segment {candidate.name}: {e}")
+                    failed.add(segment_name(path))
+                    break
+                counter.add_counters(segment.counters())
+                counter.latency_sketch.merge(segment.latency_sketch)
+                break
+            else:
+                failed.add(segment_name(path))
+
+        # Segments removed by retention never come back; forget their names.
+        # Segments that could not be read are retried next time.
+        summary = {
+            'segments': [segment_name(path) for path in segments if segment_name(path) not in failed],
+            'counters': counter.counters(),
+            'latency_sketch': counter.latency_sketch.to_dict()
+        }
+        tmp_path = summary_path.with_name(summary_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+        os.replace(tmp_path, summary_path)
+        return counter
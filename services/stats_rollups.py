@@ -0,0 +1,396 @@
+"""
+Stats Rollups - Multi-resolution aggregates for long-term history
+Follows Single Responsibility Principle (SRP)
+
+Raw samples are only kept for the recent history. Every check is also added
+to a 1-minute, a 1-hour and a 1-day bucket holding count, failures, latency
+sum, min, max and a LatencySketch for percentiles. Each resolution keeps a
+limited span (2 days of minutes, 31 days of hours, 2 years of days), so
+memory stays bounded however long the monitor runs.
+
+Buckets are keyed by local wall-clock time in seconds since 1970-01-01, the
+clock of the log timestamps, so hours and days start on local boundaries.
+"""
+import json
+import math
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional: vectorized add_arrays()
+    np = None
+
+from services.latency_sketch import LatencySketch
+from services.log_analysis import KIND_CHECK
+
+ROLLUPS_VERSION = 1
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def local_seconds(timestamp: datetime) -> int:
+    """Convert a naive local datetime to local seconds since 1970-01-01."""
+    return (timestamp - _EPOCH) // timedelta(seconds=1)
+
+
+class RollupBucket:
+    """Aggregate of the checks in one time bucket."""
+
+    __slots__ = ('start', 'count', 'failures', 'total', 'min', 'max', 'sketch')
+
+    def __init__(self, start: int):
+        self.start = start
+        self.count = 0
+        self.failures = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = LatencySketch()
+
+    def add(self, latency: Optional[float]) -> None:
+        """Count one check (latency None if it failed)."""
+        self.count += 1
+        if latency is None:
+            self.failures += 1
+        else:
+            self.total += latency
+            self.min = min(self.min, latency)
+            self.max = max(self.max, latency)
+            self.sketch.add(latency)
+
+    def merge(self, other: "RollupBucket") -> None:
+        """Add the checks of another bucket of the same time span."""
+        self.count += other.count
+        self.failures += other.failures
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self) -> Dict:
+        """
+        Convert to a dictionary for display.
+
+        Returns:
+            Dictionary with start (datetime), count, failures, success_rate,
+            avg/min/max latency (None without successful checks) and
+            percentiles (50, 95, 99)
+        """
+        successes = self.count - self.failures
+        return {
+            'start': _EPOCH + timedelta(seconds=self.start),
+            'count': self.count,
+            'failures': self.failures,
+            'success_rate': successes / self.count * 100 if self.count else 0,
+            'avg_latency': self.total / successes if successes else None,
+            'min_latency': self.min if successes else None,
+            'max_latency': self.max if successes else None,
+            'percentiles': self.sketch.percentiles((50, 95, 99))
+        }
+
+    def to_window_bucket(self) -> tuple:
+        """
+        Convert to the tuple RollingStats.seed() takes.
+
+        Returns:
+            (start in epoch seconds, count, failures, latency sum, max latency
+            or None)
+        """
+        start = (_EPOCH + timedelta(seconds=self.start)).timestamp()
+        return (start, self.count, self.failures, self.total,
+                self.max if self.count > self.failures else None)
+
+    def to_row(self) -> list:
+        """Convert to the list stored in the rollups file."""
+        return [self.start, self.count, self.failures, self.total,
+                self.min if self.count > self.failures else None,
+                self.max if self.count > self.failures else None,
+                self.sketch.to_dict()]
+
+    @classmethod
+    def from_row(cls, row: list) -> "RollupBucket":
+        """Create a bucket from to_row() output."""
+        bucket = cls(row[0])
+        bucket.count, bucket.failures, bucket.total = row[1], row[2], row[3]
+        bucket.min = math.inf if row[4] is None else row[4]
+        bucket.max = -math.inf if row[5] is None else row[5]
+        bucket.sketch = LatencySketch.from_dict(row[6])
+        return bucket
+
+
+class StatsRollups:
+    """1-minute, 1-hour and 1-day rollups of the checks of one target."""
+
+    MINUTE, HOUR, DAY = MINUTE, HOUR, DAY
+    RESOLUTIONS = (MINUTE, HOUR, DAY)
+    # Span kept per resolution, in seconds
+    RETENTION = {MINUTE: 2 * DAY, HOUR: 31 * DAY, DAY: 731 * DAY}
+
+    def __init__(self):
+        # Resolution -> bucket start -> bucket, in time order
+        self._buckets = {resolution: {} for resolution in self.RESOLUTIONS}
+        # Serialized rows of the buckets, refreshed by to_dict() only for
+        # the buckets changed since (almost always just the newest ones)
+        self._rows = {resolution: {} for resolution in self.RESOLUTIONS}
+        self._dirty = {resolution: set() for resolution in self.RESOLUTIONS}
+        # Newest check added and how many checks were added in that second;
+        # tells which checks of a log are not in the rollups yet
+        self.last_time = None
+        self._last_count = 0
+        # Checks in the last_time second that a log replay still has to skip
+        self._skip = 0
+        # Offset and identity of the log when the rollups were saved (set by
+        # the owner), so a restore only has to parse the log beyond it
+        self.log_position = None
+
+    def add(self, timestamp: datetime, latency: Optional[float]) -> None:
+        """
+        Add one check to the bucket of every resolution.
+
+        Args:
+            timestamp: Local time of the check
+            latency: Latency in ms, or None if it failed
+        """
+        self._add_seconds(local_seconds(timestamp), latency)
+
+    def _add_seconds(self, seconds: int, latency: Optional[float]) -> None:
+        """Add one check at local seconds since 1970."""
+        for resolution in self.RESOLUTIONS:
+            start = seconds - seconds % resolution
+            buckets = self._buckets[resolution]
+            bucket = buckets.get(start)
+            if bucket is None:
+                bucket = buckets[start] = RollupBucket(start)
+                self._evict(resolution, start)
+            bucket.add(latency)
+            self._dirty[resolution].add(start)
+        self._advance(seconds, 1)
+
+    def _advance(self, seconds: int, count: int) -> None:
+        """Record that count checks at a time were added."""
+        if self.last_time is None or seconds > self.last_time:
+            self.last_time, self._last_count, self._skip = seconds, count, 0
+        elif seconds == self.last_time:
+            self._last_count += count
+
+    def _evict(self, resolution: int, newest: int) -> None:
+        """Drop the buckets of a resolution that are older than its retention."""
+        buckets = self._buckets[resolution]
+        oldest = newest - self.RETENTION[resolution]
+        while buckets:
+            start = next(iter(buckets))
+            if start >= oldest:
+                break
+            del buckets[start]
+            self._rows[resolution].pop(start, None)
+            self._dirty[resolution].discard(start)
+
+    def add_arrays(self, arrays) -> int:
+        """
+        Add the checks of a parsed log that are newer than the rollups.
+
+        Checks at or before last_time that were already added are skipped,
+        so the segments of a log can be replayed in time order onto rollups
+        restored from a file (see resume() for a replay from log_position).
+
+        Args:
+            arrays: LogArrays from log_analysis.load_log()
+
+        Returns:
+            Number of checks added
+        """
+        if np is None or not isinstance(arrays.latencies, np.ndarray):
+            added = 0
+            last_time = self.last_time
+            for seconds, latency, kind in zip(arrays.timestamps, arrays.latencies, arrays.kinds):
+                if kind != KIND_CHECK or last_time is not None and seconds < last_time:
+                    continue
+                if seconds == last_time and self._skip:
+                    self._skip -= 1
+                    continue
+                self._add_seconds(int(seconds), None if math.isnan(latency) else latency)
+                added += 1
+            return added
+
+        checks = arrays.kinds == KIND_CHECK
+        timestamps = arrays.timestamps[checks].astype(np.int64)
+        latencies = arrays.latencies[checks]
+        if self.last_time is not None:
+            new = timestamps > self.last_time
+            # Checks in the last covered second beyond those already added
+            same = np.flatnonzero(timestamps == self.last_time)
+            new[same[self._skip:]] = True
+            self._skip -= min(self._skip, len(same))
+            timestamps, latencies = timestamps[new], latencies[new]
+        if not len(timestamps):
+            return 0
+
+        for resolution in self.RESOLUTIONS:
+            keep = timestamps >= timestamps[-1] - timestamps[-1] % resolution - self.RETENTION[resolution]
+            starts = timestamps[keep] - timestamps[keep] % resolution
+            values = latencies[keep]
+            if not len(starts):
+                continue
+            # Consecutive runs of the same bucket (the log is in time order)
+            bounds = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1, [len(starts)]))
+            buckets = self._buckets[resolution]
+            for first, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+                start = int(starts[first])
+                part = values[first:stop]
+                ok = part[~np.isnan(part)]
+                bucket = buckets.get(start)
+                if bucket is None:
+                    bucket = buckets[start] = RollupBucket(start)
+                self._dirty[resolution].add(start)
+                bucket.count += len(part)
+                bucket.failures += len(part) - len(ok)
+                if len(ok):
+                    bucket.total += float(ok.sum())
+                    bucket.min = min(bucket.min, float(ok.min()))
+                    bucket.max = max(bucket.max, float(ok.max()))
+                    bucket.sketch.add_all(ok)
+            self._evict(resolution, max(buckets))
+
+        newest = int(timestamps[-1])
+        self._advance(newest, int((timestamps == newest).sum()))
+        return len(timestamps)
+
+    def merge(self, other: "StatsRollups") -> None:
+        """Add the checks counted by other rollups (of different checks)."""
+        for resolution in self.RESOLUTIONS:
+            buckets = self._buckets[resolution]
+            for start, bucket in other._buckets[resolution].items():
+                if start in buckets:
+                    buckets[start].merge(bucket)
+                else:
+                    buckets[start] = RollupBucket.from_row(bucket.to_row())
+                self._dirty[resolution].add(start)
+            # Keep the buckets in time order for eviction and range queries
+            self._buckets[resolution] = dict(sorted(buckets.items()))
+            if buckets:
+                self._evict(resolution, max(buckets))
+        if other.last_time is not None:
+            if self.last_time is None or other.last_time > self.last_time:
+                self.last_time, self._last_count, self._skip = other.last_time, other._last_count, 0
+            elif other.last_time == self.last_time:
+                self._last_count += other._last_count
+
+    def resume(self) -> None:
+        """Treat every check up to last_time as added, for a replay starting at log_position."""
+        self._skip = 0
+
+    def buckets(self, resolution: int, start: Optional[datetime] = None,
+                end: Optional[datetime] = None) -> List[RollupBucket]:
+        """
+        Get the buckets of a resolution overlapping a time range, oldest first.
+
+        Args:
+            resolution: MINUTE, HOUR or DAY
+            start: Only buckets ending after this time
+            end: Only buckets starting before this time
+        """
+        first = local_seconds(start) - resolution if start is not None else None
+        last = local_seconds(end) if end is not None else None
+        return [bucket for bucket_start, bucket in self._buckets[resolution].items()
+                if (first is None or bucket_start > first) and (last is None or bucket_start < last)]
+
+    @classmethod
+    def resolution_for(cls, span: timedelta, max_buckets: int) -> int:
+        """
+        Choose the finest resolution that shows a time span in at most max_buckets rows.
+
+        Args:
+            span: Length of the time range shown
+            max_buckets: Maximum number of rows
+
+        Returns:
+            MINUTE, HOUR or DAY (DAY if even that needs more rows)
+        """
+        seconds = span.total_seconds()
+        for resolution in cls.RESOLUTIONS:
+            if seconds / resolution <= max_buckets and seconds <= cls.RETENTION[resolution]:
+                return resolution
+        return DAY
+
+    def clear(self) -> None:
+        """Remove all buckets."""
+        for resolution in self.RESOLUTIONS:
+            self._buckets[resolution].clear()
+            self._rows[resolution].clear()
+            self._dirty[resolution].clear()
+        self.last_time = None
+        self._last_count = 0
+        self._skip = 0
+
+    def to_dict(self) -> Dict:
+        """
+        Convert to a JSON-serializable dictionary.
+
+        Only the buckets changed since the previous call are serialized
+        again; the rows of the others are reused. The rows are never
+        modified afterwards, so the result can be written out after the
+        owner's lock is released.
+        """
+        result = {}
+        for resolution, buckets in self._buckets.items():
+            rows = self._rows[resolution]
+            for start in self._dirty[resolution]:
+                rows[start] = buckets[start].to_row()
+            self._dirty[resolution].clear()
+            result[str(resolution)] = [rows[start] for start in buckets]
+        return {
+            'version': ROLLUPS_VERSION,
+            'last': [self.last_time, self._last_count],
+            'log': self.log_position,
+            'buckets': result
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "StatsRollups":
+        """Create rollups from to_dict() output."""
+        rollups = cls()
+        rollups.last_time, rollups._last_count = data['last']
+        rollups._skip = rollups._last_count
+        rollups.log_position = data.get('log')
+        for resolution in cls.RESOLUTIONS:
+            rows = data['buckets'].get(str(resolution), [])
+            rollups._buckets[resolution] = {row[0]: RollupBucket.from_row(row) for row in rows}
+            rollups._rows[resolution] = {row[0]: row for row in rows}
+        return rollups
+
+    @classmethod
+    def load(cls, path) -> Optional["StatsRollups"]:
+        """
+        Load rollups saved by save_data().
+
+        Returns:
+            StatsRollups, or None if the file is missing or unreadable
+        """
+        try:
+            data = json.loads(Path(path).read_text(encoding='utf-8'))
+            if data.get('version') != ROLLUPS_VERSION:
+                return None
+            return cls.from_dict(data)
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+
+    @staticmethod
+    def save_data(data: Dict, path) -> None:
+        """
+        Write to_dict() output atomically.
+
+        Args:
+            data: Output of to_dict(), taken while holding the owner's lock
+            path: Rollups file
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, path)
@@ -2,10 +2,34 @@
 Stats Tracker Service - Maintains ping statistics history
 Follows Single Responsibility Principle (SRP)
 """
-from datetime import datetime
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
 from collections import deque
-from typing import Optional, List, Dict
+from typing import Iterator, Optional, List, Dict, Tuple
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only needed for HistoryBuffer.arrays()
+    np = None
+
+from services import log_analysis
+from services.latency_sketch import LatencySketch
+from services.log_format import (
+    FLAG_BURST, FLAG_DNS, HEADER, RECORD, BinaryLogReader, archived_segments,
+    is_binary_log, parse_burst_details, parse_text_line, read_lines_reversed,
+    rollups_file, segment_name, segment_time, snapshot_file
+)
+from services.rolling_stats import RollingStats
+from services.segment_counter import SegmentCounter, summarize_archived_segments
+from services.stats_rollups import StatsRollups
 
 
 class StatsEntry:
@@ -31,180 +55,1044 @@ class StatsEntry:
         }
 
 
+class BurstStatsEntry(StatsEntry):
+    """Represents one burst check (several probes) with its aggregates."""
+    
+    def __init__(self, timestamp: datetime, latency: Optional[float], sent: int,
+                 min_latency: Optional[float], max_latency: Optional[float],
+                 loss_pct: float, jitter: float):
+        super().__init__(timestamp, latency)
+        self.sent = sent
+        self.min_latency = min_latency
+        self.max_latency = max_latency
+        self.loss_pct = loss_pct
+        self.jitter = jitter
+    
+    @classmethod
+    def from_result(cls, result) -> "BurstStatsEntry":
+        """Create an entry from a BurstResult."""
+        return cls(result.timestamp, result.avg_latency, result.sent, result.min_latency,
+                   result.max_latency, result.loss_pct, result.jitter)
+    
+    @classmethod
+    def from_log_details(cls, timestamp: datetime, latency: Optional[float], rest: str) -> "BurstStatsEntry":
+        """
+        Create an entry from the details of a burst log line.
+        
+        Args:
+            timestamp: Timestamp of the line
+            latency: Average latency parsed from the line
+            rest: Line text after the timestamp, containing
+                "(burst 5, min 24.00 ms, max 27.00 ms, loss 0.0%, jitter 1.20 ms)"
+        """
+        return cls(timestamp, latency, *parse_burst_details(rest))
+    
+    def __str__(self):
+        text = super().__str__()
+        if self.latency is not None:
+            text += f" ({self.min_latency:.2f}-{self.max_latency:.2f}, loss {self.loss_pct:.0f}%)"
+        return text
+    
+    def to_dict(self):
+        """Convert to dictionary for easy access."""
+        data = super().to_dict()
+        data.update({
+            'sent': self.sent,
+            'min_latency': self.min_latency,
+            'max_latency': self.max_latency,
+            'loss_pct': self.loss_pct,
+            'jitter': self.jitter
+        })
+        return data
+
+
+class HistoryBuffer:
+    """
+    Ring buffer holding the most recent measurements in typed arrays.
+    
+    Each measurement takes 16 bytes: its time (epoch seconds) and latency
+    (NaN when it failed), each in a preallocated array('d'). Burst details
+    take 18 more bytes per slot, in arrays allocated with the first burst
+    check. A million measurements fit in 16 MB (34 MB with bursts).
+    
+    StatsEntry objects are created only when entries are read; numeric
+    consumers can read the arrays through segments() (zero-copy
+    memoryviews) or arrays() (NumPy views).
+    """
+    
+    def __init__(self, maxlen: int):
+        """
+        Args:
+            maxlen: Number of measurements kept; older ones are overwritten
+        """
+        self.maxlen = maxlen
+        # Preallocated so views handed out by segments() stay valid
+        self._timestamps = array('d', bytes(8 * maxlen))
+        self._latencies = array('d', bytes(8 * maxlen))
+        # (sent, min, max, loss %, jitter) arrays, allocated on the first burst;
+        # sent == 0 marks a slot without burst details
+        self._burst = None
+        self._start = 0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays, in bytes."""
+        arrays = [self._timestamps, self._latencies] + list(self._burst or ())
+        return sum(len(values) * values.itemsize for values in arrays)
+    
+    def append(self, entry: StatsEntry) -> None:
+        """Append a StatsEntry or BurstStatsEntry, overwriting the oldest when full."""
+        burst = None
+        if isinstance(entry, BurstStatsEntry):
+            burst = (entry.sent, entry.min_latency, entry.max_latency, entry.loss_pct, entry.jitter)
+        self.append_values(entry.timestamp.timestamp(), entry.latency, burst)
+    
+    def append_values(self, timestamp: float, latency: Optional[float],
+                      burst: Optional[Tuple] = None) -> None:
+        """
+        Append a measurement without creating an entry object.
+        
+        Args:
+            timestamp: Epoch seconds
+            latency: Latency in ms, or None if it failed
+            burst: Optional (sent, min_latency, max_latency, loss_pct, jitter)
+        """
+        if not self.maxlen:
+            return
+        if self._size < self.maxlen:
+            slot = (self._start + self._size) % self.maxlen
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.maxlen
+        
+        self._timestamps[slot] = timestamp
+        self._latencies[slot] = math.nan if latency is None else latency
+        if burst is not None:
+            if self._burst is None:
+                self._burst = (array('H', bytes(2 * self.maxlen)),) + tuple(
+                    array('f', bytes(4 * self.maxlen)) for _ in range(4)
+                )
+            sent, min_latency, max_latency, loss_pct, jitter = burst
+            self._burst[0][slot] = min(sent, 0xFFFF)
+            self._burst[1][slot] = math.nan if min_latency is None else min_latency
+            self._burst[2][slot] = math.nan if max_latency is None else max_latency
+            self._burst[3][slot] = loss_pct
+            self._burst[4][slot] = jitter
+        elif self._burst is not None:
+            self._burst[0][slot] = 0
+    
+    def extend(self, entries) -> None:
+        """Append several entries, oldest first."""
+        for entry in entries:
+            self.append(entry)
+    
+    def clear(self) -> None:
+        """Remove all measurements (the arrays stay allocated)."""
+        self._start = 0
+        self._size = 0
+    
+    def _slot(self, index: int) -> int:
+        """Convert an index (0 = oldest, -1 = newest) to an array slot."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("history index out of range")
+        return (self._start + index) % self.maxlen
+    
+    def timestamp(self, index: int) -> float:
+        """Get the epoch time of a measurement without creating an entry."""
+        return self._timestamps[self._slot(index)]
+    
+    def latency(self, index: int) -> Optional[float]:
+        """Get the latency of a measurement (None if it failed) without creating an entry."""
+        latency = self._latencies[self._slot(index)]
+        return None if latency != latency else latency
+    
+    def _entry(self, slot: int) -> StatsEntry:
+        """Create the entry object for an array slot."""
+        timestamp = datetime.fromtimestamp(self._timestamps[slot])
+        latency = self._latencies[slot]
+        latency = None if latency != latency else latency
+        if self._burst is None or not self._burst[0][slot]:
+            return StatsEntry(timestamp, latency)
+        
+        sent, min_latency, max_latency, loss_pct, jitter = (values[slot] for values in self._burst)
+        return BurstStatsEntry(
+            timestamp, latency, sent,
+            None if min_latency != min_latency else min_latency,
+            None if max_latency != max_latency else max_latency,
+            loss_pct, jitter
+        )
+    
+    def __getitem__(self, index: int) -> StatsEntry:
+        return self._entry(self._slot(index))
+    
+    def __iter__(self) -> Iterator[StatsEntry]:
+        for index in range(self._size):
+            yield self._entry((self._start + index) % self.maxlen)
+    
+    def __reversed__(self) -> Iterator[StatsEntry]:
+        for index in range(self._size - 1, -1, -1):
+            yield self._entry((self._start + index) % self.maxlen)
+    
+    def entries(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[StatsEntry]:
+        """
+        Create the entries of a range, like list(history)[start:stop].
+        
+        Args:
+            start: First index (negative counts from the newest)
+            stop: End index (exclusive)
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        return [self._entry((self._start + index) % self.maxlen) for index in range(start, stop)]
+    
+    def index_at(self, timestamp: float) -> int:
+        """
+        Find the first measurement at or after a time by binary search.
+        
+        Measurements are appended in time order, so the timestamps are sorted.
+        
+        Args:
+            timestamp: Epoch seconds
+        
+        Returns:
+            Index of the measurement, len(self) if all are earlier
+        """
+        return bisect.bisect_left(_TimestampSequence(self), timestamp)
+    
+    def segments(self, start: Optional[int] = None,
+                 stop: Optional[int] = None) -> List[Tuple[memoryview, memoryview]]:
+        """
+        Get zero-copy views of the timestamps and latencies of a range.
+        
+        The range lies in one or two contiguous runs of the ring, returned
+        oldest first. The views reflect later appends; copy them to keep
+        the values.
+        
+        Args:
+            start: First index (negative counts from the newest)
+            stop: End index (exclusive)
+        
+        Returns:
+            List of (timestamps, latencies) memoryviews of doubles
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        if start >= stop:
+            return []
+        first = (self._start + start) % self.maxlen
+        last = first + (stop - start)
+        timestamps, latencies = memoryview(self._timestamps), memoryview(self._latencies)
+        if last <= self.maxlen:
+            return [(timestamps[first:last], latencies[first:last])]
+        last -= self.maxlen
+        return [(timestamps[first:], latencies[first:]), (timestamps[:last], latencies[:last])]
+    
+    def arrays(self, start: Optional[int] = None, stop: Optional[int] = None):
+        """
+        Get the timestamps and latencies of a range as NumPy arrays.
+        
+        Zero-copy views when the range does not wrap around the end of the
+        ring, otherwise one copy.
+        
+        Returns:
+            Tuple of (epoch timestamps, latencies with NaN for failures)
+        """
+        parts = [(np.frombuffer(timestamps), np.frombuffer(latencies))
+                 for timestamps, latencies in self.segments(start, stop)]
+        if not parts:
+            return np.empty(0), np.empty(0)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([part[0] for part in parts]), np.concatenate([part[1] for part in parts])
+
+
+class _TimestampSequence:
+    """Sequence view of a buffer's timestamps for bisect."""
+    
+    def __init__(self, buffer: HistoryBuffer):
+        self._buffer = buffer
+    
+    def __len__(self) -> int:
+        return len(self._buffer)
+    
+    def __getitem__(self, index: int) -> float:
+        return self._buffer.timestamp(index)
+
+
+class StatsSnapshot:
+    """
+    Consistent, read-only view of a tracker at one version.
+
+    The summary is computed once when the snapshot is taken. The history is
+    not copied: entries() reads the entries that were in the history at the
+    snapshot from the live buffer, ignoring everything appended since.
+    """
+
+    __slots__ = ('version', 'summary', '_tracker', '_generation', '_appended', '_length')
+
+    def __init__(self, tracker: "StatsTrackerService", version: int, summary: Dict):
+        """
+        Args:
+            tracker: Tracker the snapshot was taken of, while holding its lock
+            version: Tracker version the snapshot reflects
+            summary: get_summary() at that version
+        """
+        summary['percentiles'] = MappingProxyType(summary['percentiles'])
+        self.version = version
+        self.summary = MappingProxyType(summary)
+        self._tracker = tracker
+        self._generation = tracker._generation
+        self._appended = tracker._appended
+        self._length = len(tracker._history)
+
+    def __len__(self) -> int:
+        """Number of history entries at the snapshot."""
+        return self._length
+
+    def entries(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[StatsEntry]:
+        """
+        Get history entries as of the snapshot, oldest first.
+
+        Args:
+            start: First index, negative counts from the end (slice semantics)
+            stop: Index after the last entry
+
+        Returns:
+            List of StatsEntry objects; entries the history has dropped since
+            the snapshot (or all, after clear()) are left out
+        """
+        return self._tracker._snapshot_entries(self, *slice(start, stop).indices(self._length)[:2])
+
+    def last_n(self, n: int = 5) -> List[StatsEntry]:
+        """Get the last n history entries as of the snapshot."""
+        return self.entries(-n) if n > 0 else []
+
+    def since(self, cursor: Optional[int] = None,
+              limit: Optional[int] = None) -> Tuple[List[StatsEntry], int, bool]:
+        """
+        Get the history entries appended after a cursor, up to the snapshot.
+
+        Same as StatsTrackerService.get_since(), but the entries end where
+        the snapshot does, so they match its summary.
+
+        Args:
+            cursor: Cursor returned by the previous call (None on the first call)
+            limit: Return at most this many of the newest entries
+
+        Returns:
+            Tuple of (entries oldest first, new cursor, wrapped)
+        """
+        return self._tracker._snapshot_since(self, cursor, limit)
+
+
 class StatsTrackerService:
     """Service to track and manage ping statistics."""
     
-    def __init__(self, max_history: int = 1000, log_file: Optional[str] = None):
+    SNAPSHOT_VERSION = 2
+    
+    # Seconds between rollups file writes; checks since the last write are
+    # replayed from the log on restore, so a stale file only costs a longer
+    # catch-up
+    ROLLUPS_SAVE_INTERVAL = 600
+    
+    # Counters that add up across log segments
+    COUNTERS = SegmentCounter.COUNTERS
+    
+    def __init__(self, max_history: int = 1000, log_file: Optional[str] = None,
+                 store=None, target: Optional[str] = None,
+                 windows=RollingStats.DEFAULT_LENGTHS):
         """
         Initialize stats tracker.
         
         Args:
             max_history: Maximum number of entries to keep in history
             log_file: Optional path to log file to restore ping count from
+            store: Optional MeasurementStoreService to restore from and query
+                instead of the log file
+            target: Target name the measurements are stored under
+            windows: Lengths in seconds of the rolling windows (default
+                5 minutes, 1 hour and 24 hours)
         """
         self.max_history = max_history
-        self._history = deque(maxlen=max_history)
+        self.log_file = log_file
+        self.store = store
+        self.target = target
+        self._history = HistoryBuffer(max_history)
+        # Monotonic (position, latency) windows over the history for O(1) min/max
+        self._appended = 0
+        self._min_window = deque()
+        self._max_window = deque()
+        # Lifetime latency distribution of successful checks
+        self._latency_sketch = LatencySketch()
+        # Minute, hour and day aggregates reaching beyond the history
+        self._rollups = StatsRollups()
+        self._rollups_restored = threading.Event()
+        self._rollups_saved = time.monotonic()
+        # Sliding windows over the last minutes and hours of checks
+        self._windows = RollingStats(windows)
         self._consecutive_failures = 0
         self._total_pings = 0
         self._failed_pings = 0
         self._total_latency = 0.0
+        self._dns_lookups = 0
+        self._dns_failures = 0
+        self._total_dns_ms = 0.0
+        self._last_dns_ms = None
+        self._burst_checks = 0
+        self._burst_failed_checks = 0
+        self._burst_probes_sent = 0
+        self._burst_probes_lost = 0
+        self._total_jitter = 0.0
+        self._sample_interval = None
+        self._lock = threading.Lock()
+        self._restored = threading.Event()
+        self._generation = 0
+        # Bumped by every change readers can see; get_snapshot() reuses the
+        # snapshot of the current version
+        self._version = 0
+        self._snapshot = None
+        
+        # Restore ping count from the store or an existing log file if provided
+        restore_rollups = None
+        if store is not None:
+            self._restore_from_store()
+            restore_rollups = (self._restore_rollups_from_store, (datetime.now(),))
+        elif log_file:
+            log_path = Path(log_file)
+            end = log_path.stat().st_size if log_path.exists() else 0
+            self._restore_from_log(log_path, end)
+            restore_rollups = (self._restore_rollups, (log_path, end))
         
-        # Restore ping count from existing log file if provided
-        if log_file:
-            self._restore_from_log(log_file)
+        if not log_file or store is not None:
+            self._restored.set()
+        if restore_rollups is None:
+            self._rollups_restored.set()
+        
+        # Seed the windows with the restored history that falls inside them,
+        # before the rollups thread adds the checks older than that history
+        now = time.time()
+        with self._lock:
+            start = self._history.index_at(now - max(self._windows.lengths))
+            for entry in self._history.entries(start):
+                self._add_to_windows(entry)
+            self._windows_seeded_before = self._history[0].timestamp.timestamp() if len(self._history) else now
+        if restore_rollups is not None:
+            target, args = restore_rollups
+            threading.Thread(target=target, args=args, daemon=True).start()
     
-    def _restore_from_log(self, log_file: str) -> None:
+    def _restore_from_log(self, log_path: Path, end: int) -> None:
         """
         Restore ping count and historical entries from existing log file.
         
+        Starts from the snapshot written by checkpoint() when it still
+        matches the log, so only entries appended since are parsed.
+        
+        Otherwise the history is read backwards from the end of the log,
+        stopping after max_history entries, and the lifetime totals (rotated
+        segments from their archive summary plus the active log) are counted
+        in a background thread; wait_restored() waits for them.
+        
         Args:
-            log_file: Path to the log file to restore from
+            log_path: Path to the text or binary log file to restore from
+            end: Size of the log when the restore started
         """
         try:
-            log_path = Path(log_file)
-            if not log_path.exists():
+            if self._restore_from_snapshot(log_path):
+                self._restored.set()
+                print(f"📊 Restored stats: {self._total_pings} total pings, {len(self._history)} entries loaded from snapshot")
                 return
             
-            with open(log_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Parse lines that contain latency measurements (not errors)
-                    if "Latency:" in line and "ERROR:" not in line:
-                        try:
-                            # Parse: [YYYY-MM-DD HH:MM:SS] Latency: X.XX ms
-                            parts = line.split("] ")
-                            if len(parts) < 2:
-                                continue
-                            
-                            timestamp_str = parts[0].lstrip("[")
-                            rest = parts[1]
-                            
-                            # Parse timestamp
-                            try:
-                                timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                            except ValueError:
-                                continue
-                            
-                            # Parse latency
-                            if "NO RESPONSE" in rest:
-                                latency = None
-                                entry = StatsEntry(timestamp, latency)
-                                self._history.append(entry)
-                                self._total_pings += 1
-                                self._failed_pings += 1
-                                self._consecutive_failures += 1
-                            else:
-                                # Extract latency value: "Latency: X.XX ms"
-                                latency_str = rest.split("Latency: ")[1].split(" ms")[0]
-                                latency = float(latency_str)
-                                entry = StatsEntry(timestamp, latency)
-                                self._history.append(entry)
-                                self._total_pings += 1
-                                self._total_latency += latency
-                                self._consecutive_failures = 0
-                        except (IndexError, ValueError) as e:
-                            # Skip lines that don't parse correctly
-                            continue
+            tail_failures = self._restore_tail(log_path, end) if end else 0
             
-            print(f"📊 Restored stats: {self._total_pings} total pings, {len(self._history)} entries loaded from log file")
+            threading.Thread(target=self._restore_counters, args=(log_path, end, tail_failures),
+                             daemon=True).start()
+            print(f"📊 Restored stats: {len(self._history)} recent entries loaded from log file, counting totals in background")
         except Exception as e:
+            self._restored.set()
             print(f"⚠️ Could not restore stats from log: {e}")
     
-    def add_measurement(self, latency: Optional[float]) -> None:
+    def _restore_tail(self, log_path: Path, end: int) -> int:
         """
-        Add a new measurement to the history.
+        Load the last max_history measurements of a log into the history.
+        
+        The failed checks at the end of the tail seed the consecutive
+        failures, so an outage spanning a restart keeps counting before the
+        lifetime totals are restored.
         
         Args:
-            latency: Latency in milliseconds, or None if ping failed
+            log_path: Path to the text or binary log
+            end: Size of the log when the restore started
+            
+        Returns:
+            Number of failed checks at the end of the tail
         """
-        entry = StatsEntry(datetime.now(), latency)
-        self._history.append(entry)
+        entries = []
+        if is_binary_log(log_path):
+            with BinaryLogReader(log_path) as reader:
+                index = min(len(reader), (end - HEADER.size) // RECORD.size) - 1
+                while index >= 0 and len(entries) < self.max_history:
+                    timestamp, latency, flags = reader.record(index)
+                    if not flags & FLAG_DNS:
+                        entries.append(StatsEntry(timestamp, latency))
+                    elif self._last_dns_ms is None:
+                        self._last_dns_ms = latency
+                    index -= 1
+        else:
+            for line in read_lines_reversed(log_path, end):
+                if len(entries) >= self.max_history:
+                    break
+                parsed = parse_text_line(line)
+                if parsed is None:
+                    continue
+                
+                timestamp, latency, flags, rest = parsed
+                if flags & FLAG_DNS:
+                    if self._last_dns_ms is None:
+                        self._last_dns_ms = latency
+                elif flags & FLAG_BURST:
+                    try:
+                        entries.append(BurstStatsEntry.from_log_details(timestamp, latency, rest))
+                    except (IndexError, ValueError):
+                        continue
+                else:
+                    entries.append(StatsEntry(timestamp, latency))
         
-        self._total_pings += 1
+        # Entries are newest first
+        tail_failures = next((i for i, entry in enumerate(entries) if entry.latency is not None), len(entries))
+        self._extend_history(reversed(entries))
+        self._consecutive_failures = tail_failures
+        return tail_failures
+    
+    def _restore_counters(self, log_path: Path, end: int, tail_failures: int = 0) -> None:
+        """
+        Count the lifetime totals of a log and its rotated segments (runs in background thread).
         
-        if latency is None:
-            self._failed_pings += 1
-            self._consecutive_failures += 1
-        else:
-            self._consecutive_failures = 0
-            self._total_latency += latency
+        Args:
+            log_path: Path to the text or binary log
+            end: Size of the log when the restore started; later entries are
+                counted live by this tracker
+            tail_failures: Consecutive failures already seeded from the
+                restored tail, which the count of the whole log replaces
+        """
+        generation = self._generation
+        try:
+            counter = summarize_archived_segments(str(log_path))
+            if end:
+                counter.count_segment(log_path, end)
+            
+            with self._lock:
+                if generation != self._generation:
+                    return  # cleared while counting
+                
+                live_checks = self._total_pings
+                self._version += 1
+                self._add_counters(counter.counters())
+                self._latency_sketch.merge(counter.latency_sketch)
+                # Live failures continue a failure streak at the end of the log,
+                # which may reach back further than the restored tail
+                if self._consecutive_failures == tail_failures + live_checks:
+                    self._consecutive_failures = counter.consecutive_failures + live_checks
+            
+            print(f"📊 Restored stats: {self._total_pings} total pings counted from log file")
+        except Exception as e:
+            print(f"⚠️ Could not count stats from log: {e}")
+        finally:
+            self._restored.set()
     
-    def get_last_n(self, n: int = 5) -> List[StatsEntry]:
+    def _restore_rollups(self, log_path: Path, end: int) -> None:
         """
-        Get the last N measurements.
+        Restore the rollups of a log (runs in background thread).
+        
+        Loads the rollups file written by checkpoint() and adds the checks
+        logged after it: only the end of the active log when it was neither
+        rotated nor replaced since, otherwise the segments rotated since and
+        the active log. If the file is missing, the rollups are rebuilt from
+        every segment.
         
         Args:
-            n: Number of measurements to retrieve
+            log_path: Path to the text or binary log
+            end: Size of the log when the restore started; later entries are
+                added live by this tracker
+        """
+        generation = self._generation
+        try:
+            rollups = StatsRollups.load(rollups_file(log_path)) or StatsRollups()
+            position = rollups.log_position
+            if position is not None and end and self._log_continues(log_path, position, end):
+                # Everything before the saved offset is in the rollups already
+                rollups.resume()
+                if end > position['offset']:
+                    rollups.add_arrays(log_analysis.load_log(log_path, end, start=position['offset']))
+            else:
+                self._replay_log(rollups, log_path, end)
             
-        Returns:
-            List of StatsEntry objects
+            with self._lock:
+                if generation != self._generation:
+                    return  # cleared while restoring
+                rollups.merge(self._rollups)
+                self._rollups = rollups
+                self._seed_windows()
+        except Exception as e:
+            print(f"⚠️ Could not restore stats rollups from log: {e}")
+        finally:
+            self._rollups_restored.set()
+    
+    @staticmethod
+    def _replay_log(rollups: StatsRollups, log_path: Path, end: int) -> None:
+        """
+        Add the checks of a log and its segments that are newer than the rollups.
+        
+        Args:
+            rollups: Rollups to add to
+            log_path: Path to the text or binary log
+            end: Size of the log when the restore started
         """
-        return list(self._history)[-n:] if len(self._history) >= n else list(self._history)
+        covered = None if rollups.last_time is None else log_analysis.to_datetime(rollups.last_time)
+        for path in archived_segments(log_path):
+            rotated = segment_time(path)
+            if covered is not None and rotated is not None and rotated < covered:
+                continue  # only holds checks that are in the rollups already
+            # A plain segment may have been compressed since it was listed
+            candidates = [path] if path.suffix == ".gz" else [path, path.with_name(path.name + ".gz")]
+            for candidate in candidates:
+                try:
+                    rollups.add_arrays(log_analysis.load_log(candidate))
+                    break
+                except FileNotFoundError:
+                    continue
+                except (OSError, EOFError, ValueError) as e:
+                    print(f"⚠️ Could not read log segment {candidate.name} for rollups: {e}")
+                    break
+        if end:
+            rollups.add_arrays(log_analysis.load_log(log_path, end))
     
-    def get_all(self) -> List[StatsEntry]:
-        """Get all measurements in history."""
-        return list(self._history)
+    def _restore_rollups_from_store(self, end: datetime) -> None:
+        """
+        Rebuild the rollups from the measurement store (runs in background thread).
+        
+        Args:
+            end: Time the restore started; later checks are added live by this tracker
+        """
+        generation = self._generation
+        try:
+            rollups = StatsRollups()
+            start = end - timedelta(seconds=StatsRollups.RETENTION[StatsRollups.DAY])
+            for timestamp, latency in self.store.iter_checks(self.target, start, end):
+                rollups.add(timestamp, latency)
+            
+            with self._lock:
+                if generation != self._generation:
+                    return  # cleared while restoring
+                rollups.merge(self._rollups)
+                self._rollups = rollups
+                self._seed_windows()
+        except Exception as e:
+            print(f"⚠️ Could not restore stats rollups from measurement store: {e}")
+        finally:
+            self._rollups_restored.set()
     
-    def get_summary(self) -> Dict:
+    def wait_restored(self, timeout: Optional[float] = None) -> bool:
         """
-        Get summary statistics.
+        Wait until the lifetime totals have been restored.
         
+        Args:
+            timeout: Maximum seconds to wait (default: forever)
+            
         Returns:
-            Dictionary with summary stats
+            bool: True if the totals are complete
         """
-        success_count = self._total_pings - self._failed_pings
-        avg_latency = self._total_latency / success_count if success_count > 0 else 0
-        success_rate = (success_count / self._total_pings * 100) if self._total_pings > 0 else 0
+        return self._restored.wait(timeout)
+    
+    def _restore_from_snapshot(self, log_path: Path) -> bool:
+        """
+        Restore from the snapshot of a log and parse what was appended since.
+        
+        The snapshot is ignored if the log was rotated, truncated or replaced
+        after it was written.
+        
+        Args:
+            log_path: Path to the text or binary log
+            
+        Returns:
+            bool: True if the snapshot was used
+        """
+        try:
+            snapshot = json.loads(snapshot_file(log_path).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+        
+        offset = snapshot.get('offset', 0)
+        if (
+            snapshot.get('version') != self.SNAPSHOT_VERSION
+            or not log_path.exists()
+            or not self._log_continues(log_path, snapshot, log_path.stat().st_size)
+        ):
+            return False
         
-        # Get min/max from successful pings
-        successful_latencies = [e.latency for e in self._history if e.latency is not None]
-        min_latency = min(successful_latencies) if successful_latencies else 0
-        max_latency = max(successful_latencies) if successful_latencies else 0
+        self._add_counters(snapshot['counters'])
+        self._add_sketch(snapshot.get('latency_sketch'))
+        self._consecutive_failures = snapshot.get('consecutive_failures', 0)
+        self._last_dns_ms = snapshot.get('last_dns_ms')
+        self._extend_history(
+            self._entry_from_row((datetime.fromtimestamp(row[0]),) + tuple(row[1:]))
+            for row in snapshot.get('history', [])
+        )
         
+        # Entries appended after the checkpoint
+        if is_binary_log(log_path):
+            with BinaryLogReader(log_path) as reader:
+                for timestamp, latency, flags in reader.records((offset - HEADER.size) // RECORD.size):
+                    if flags & FLAG_DNS:
+                        self._count_dns(latency)
+                    else:
+                        self._append_history(StatsEntry(timestamp, latency))
+                        self._count_check(latency)
+        else:
+            with open(log_path, 'rb') as f:
+                f.seek(offset)
+                self._restore_text_lines(line.decode('utf-8', errors='replace') for line in f)
+        return True
+    
+    def _log_position(self, log_path: Path) -> Dict:
+        """Get the size and identity of a log, which checkpoint() saves next to what it covers."""
         return {
-            'total_pings': self._total_pings,
-            'successful': success_count,
-            'failed': self._failed_pings,
-            'success_rate': success_rate,
-            'avg_latency': avg_latency,
-            'min_latency': min_latency,
-            'max_latency': max_latency,
-            'consecutive_failures': self._consecutive_failures
+            'offset': log_path.stat().st_size,
+            'identity': self._log_identity(log_path),
+            'last_segment': self._last_segment(log_path)
         }
     
-    def get_consecutive_failures(self) -> int:
-        """Get number of consecutive failures."""
-        return self._consecutive_failures
+    def _log_continues(self, log_path: Path, position: Dict, size: int) -> bool:
+        """
+        Check whether a log is the one a saved position was taken of, grown
+        to size without being rotated, truncated or replaced since.
+        """
+        return (
+            size >= position.get('offset', 0)
+            and position.get('identity') == self._log_identity(log_path)
+            and position.get('last_segment') == self._last_segment(log_path)
+        )
     
-    def clear(self) -> None:
-        """Clear all statistics."""
-        self._history.clear()
-        self._consecutive_failures = 0
-        self._total_pings = 0
-        self._failed_pings = 0
-        self._total_latency = 0.0
+    @staticmethod
+    def _log_identity(log_path: Path) -> str:
+        """Get the first line of a log, which tells one log file from its successor."""
+        with open(log_path, 'rb') as f:
+            return f.readline(128).hex()
     
-    def add_measurement(self, latency: Optional[float]) -> None:
+    @staticmethod
+    def _last_segment(log_path: Path) -> Optional[str]:
+        """Get the name of the most recently rotated segment of a log."""
+        segments = archived_segments(log_path)
+        return segment_name(segments[-1]) if segments else None
+    
+    def checkpoint(self, final: bool = False) -> None:
         """
-        Add a new measurement to the history.
+        Persist counters, history and the log offset they cover, and the rollups.
+        
+        The caller must make sure every measurement counted so far has been
+        written to the log (LoggerService.flush()) and that none are being
+        written concurrently. Does nothing with a measurement store, which
+        restores from SQL aggregates instead. Counters and rollups are each
+        skipped while they are still being restored in the background.
         
         Args:
-            latency: Latency in milliseconds, or None if ping failed
+            final: Also write the rollups if ROLLUPS_SAVE_INTERVAL has not
+                passed yet (when monitoring stops)
         """
-        entry = StatsEntry(datetime.now(), latency)
-        self._history.append(entry)
+        if self.store is not None or not self.log_file:
+            return
         
-        self._total_pings += 1
+        log_path = Path(self.log_file)
+        now = time.monotonic()
+        if self._rollups_restored.is_set() and (final or now - self._rollups_saved >= self.ROLLUPS_SAVE_INTERVAL):
+            # Only the rows of changed buckets are built under the lock; the
+            # JSON encoding and the write happen after it is released
+            with self._lock:
+                rollups = self._rollups.to_dict()
+            self._rollups_saved = now
+            try:
+                rollups['log'] = self._log_position(log_path)
+                StatsRollups.save_data(rollups, rollups_file(log_path))
+            except OSError as e:
+                print(f"⚠️ Could not write stats rollups: {e}")
         
+        if not self._restored.is_set():
+            return
+        try:
+            history = []
+            for entry in self._history:
+                row = [entry.timestamp.timestamp(), entry.latency]
+                if isinstance(entry, BurstStatsEntry):
+                    row += [entry.sent, entry.min_latency, entry.max_latency, entry.loss_pct, entry.jitter]
+                else:
+                    row += [None] * 5
+                history.append(row)
+            
+            snapshot = {
+                'version': self.SNAPSHOT_VERSION,
+                **self._log_position(log_path),
+                'counters': self._counters(),
+                'latency_sketch': self._latency_sketch.to_dict(),
+                'consecutive_failures': self._consecutive_failures,
+                'last_dns_ms': self._last_dns_ms,
+                'history': history
+            }
+            
+            path = snapshot_file(log_path)
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(json.dumps(snapshot), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write stats snapshot: {e}")
+    
+    def _restore_from_store(self) -> None:
+        """
+        Restore totals and the most recent entries from the measurement store.
+        
+        Totals are computed by the database; only the last max_history
+        measurements are fetched.
+        """
+        try:
+            self._add_counters(self.store.aggregate(self.target))
+            
+            rows = self.store.query(self.target, limit=self.max_history)
+            self._extend_history(self._entry_from_row(row) for row in reversed(rows))
+            for entry in reversed(self._history):
+                if entry.latency is not None:
+                    break
+                self._consecutive_failures += 1
+            
+            dns_rows = self.store.query(self.target, kind=self.store.KIND_DNS, limit=1)
+            if dns_rows and dns_rows[0][1] is not None:
+                self._last_dns_ms = dns_rows[0][1]
+            
+            print(f"📊 Restored stats: {self._total_pings} total pings, {len(self._history)} entries loaded from measurement store")
+        except Exception as e:
+            print(f"⚠️ Could not restore stats from measurement store: {e}")
+    
+    @staticmethod
+    def _entry_from_row(row) -> StatsEntry:
+        """Create a history entry from a measurement store row."""
+        timestamp, latency, sent, min_latency, max_latency, loss_pct, jitter = row
+        if sent is None:
+            return StatsEntry(timestamp, latency)
+        return BurstStatsEntry(timestamp, latency, sent, min_latency, max_latency, loss_pct, jitter)
+    
+    def _restore_text_lines(self, lines) -> None:
+        """Restore counters and history from the lines of a text log."""
+        for line in lines:
+            # Latency and DNS lines; errors and malformed lines are skipped
+            parsed = parse_text_line(line)
+            if parsed is None:
+                continue
+            
+            timestamp, latency, flags, rest = parsed
+            if flags & FLAG_DNS:
+                self._count_dns(latency)
+                continue
+            
+            # Burst checks carry "(burst N, min .., max .., loss ..%, jitter ..)"
+            if flags & FLAG_BURST:
+                try:
+                    entry = BurstStatsEntry.from_log_details(timestamp, latency, rest)
+                except (IndexError, ValueError):
+                    continue
+                self._count_burst(entry)
+            else:
+                entry = StatsEntry(timestamp, latency)
+            
+            self._append_history(entry)
+            self._count_check(latency)
+    
+    def _count_check(self, latency: Optional[float]) -> None:
+        """Update check counters with one restored measurement."""
+        self._total_pings += 1
         if latency is None:
             self._failed_pings += 1
             self._consecutive_failures += 1
         else:
-            self._consecutive_failures = 0
             self._total_latency += latency
+            self._consecutive_failures = 0
+            self._latency_sketch.add(latency)
+    
+    def _counters(self) -> Dict:
+        """Get the additive counters, as stored in archive summaries."""
+        return {name: getattr(self, f"_{name}") for name in self.COUNTERS}
+    
+    def _add_counters(self, counters: Dict) -> None:
+        """Add counters of archived log segments to the totals."""
+        for name in self.COUNTERS:
+            value = counters.get(name)
+            if value:
+                setattr(self, f"_{name}", getattr(self, f"_{name}") + value)
+    
+    def _add_sketch(self, data: Optional[Dict]) -> None:
+        """Merge a persisted latency sketch (archive summary or snapshot) into the totals."""
+        if data:
+            self._latency_sketch.merge(LatencySketch.from_dict(data))
+    
+    def _append_history(self, entry: StatsEntry) -> None:
+        """
+        Append an entry to the history and update the min/max windows.
+        
+        The windows hold (position, latency) of the entries that can still
+        become the minimum (increasing latencies) or maximum (decreasing
+        latencies) of the history, so the current one is always at the front.
+        Each entry is added and removed at most once: amortized O(1).
+        """
+        self._history.append(entry)
+        self._appended += 1
+        latency = entry.latency
+        if latency is not None:
+            while self._min_window and self._min_window[-1][1] >= latency:
+                self._min_window.pop()
+            self._min_window.append((self._appended, latency))
+            while self._max_window and self._max_window[-1][1] <= latency:
+                self._max_window.pop()
+            self._max_window.append((self._appended, latency))
+        
+        # Drop entries that left the history
+        oldest = self._appended - len(self._history)
+        while self._min_window and self._min_window[0][0] <= oldest:
+            self._min_window.popleft()
+        while self._max_window and self._max_window[0][0] <= oldest:
+            self._max_window.popleft()
+    
+    def _extend_history(self, entries) -> None:
+        """Append several entries to the history, oldest first."""
+        for entry in entries:
+            self._append_history(entry)
+    
+    def add_measurement(self, latency: Optional[float]) -> None:
+        """
+        Add a new measurement to the history.
+        
+        Args:
+            latency: Latency in milliseconds, or None if ping failed
+        """
+        entry = StatsEntry(datetime.now(), latency)
+        
+        with self._lock:
+            self._version += 1
+            self._append_history(entry)
+            self._rollups.add(entry.timestamp, latency)
+            self._add_to_windows(entry)
+            self._total_pings += 1
+            
+            if latency is None:
+                self._failed_pings += 1
+                self._consecutive_failures += 1
+            else:
+                self._consecutive_failures = 0
+                self._total_latency += latency
+                self._latency_sketch.add(latency)
+    
+    def add_burst(self, result) -> None:
+        """
+        Add the aggregated result of a burst check to the history.
+        
+        Counts as one check in the ping totals; the probes of the burst feed
+        packet loss and jitter.
+        
+        Args:
+            result: BurstResult from BurstSampler
+        """
+        entry = BurstStatsEntry.from_result(result)
+        
+        with self._lock:
+            self._version += 1
+            self._append_history(entry)
+            self._rollups.add(entry.timestamp, entry.latency)
+            self._add_to_windows(entry)
+            self._count_burst(entry)
+            self._total_pings += 1
+            
+            if entry.latency is None:
+                self._failed_pings += 1
+                self._consecutive_failures += 1
+            else:
+                self._consecutive_failures = 0
+                self._total_latency += entry.latency
+                self._latency_sketch.add(entry.latency)
+    
+    def _seed_windows(self) -> None:
+        """
+        Fill in the rolling windows before the restored history from the
+        per-minute rollups (caller holds the lock), so a 24 h window covers
+        the whole day after a restart even if max_history does not.
+        """
+        start = datetime.now() - timedelta(seconds=max(self._windows.lengths))
+        buckets = self._rollups.buckets(StatsRollups.MINUTE, start)
+        self._windows.seed((bucket.to_window_bucket() for bucket in buckets), StatsRollups.MINUTE,
+                           self._windows_seeded_before)
+    
+    def _add_to_windows(self, entry: StatsEntry) -> None:
+        """Add a check to the rolling windows; bursts count their probes for packet loss."""
+        if isinstance(entry, BurstStatsEntry):
+            self._windows.add(entry.timestamp.timestamp(), entry.latency, entry.sent,
+                              round(entry.sent * entry.loss_pct / 100))
+        else:
+            self._windows.add(entry.timestamp.timestamp(), entry.latency)
+    
+    def _count_burst(self, entry: BurstStatsEntry) -> None:
+        """Update burst counters with one burst check."""
+        lost = round(entry.sent * entry.loss_pct / 100)
+        self._burst_checks += 1
+        self._burst_probes_sent += entry.sent
+        self._burst_probes_lost += lost
+        self._total_jitter += entry.jitter
+        if entry.latency is None:
+            self._burst_failed_checks += 1
+    
+    def add_dns_measurement(self, lookup_ms: Optional[float]) -> None:
+        """
+        Add a DNS lookup time, tracked separately from probe latency.
+        
+        Args:
+            lookup_ms: Lookup time in milliseconds, or None if the lookup failed
+        """
+        with self._lock:
+            self._version += 1
+            self._count_dns(lookup_ms)
+    
+    def _count_dns(self, lookup_ms: Optional[float]) -> None:
+        """Update DNS counters with one lookup."""
+        self._dns_lookups += 1
+        if lookup_ms is None:
+            self._dns_failures += 1
+        else:
+            self._total_dns_ms += lookup_ms
+            self._last_dns_ms = lookup_ms
+    
+    def set_sample_interval(self, interval: float) -> None:
+        """
+        Record the interval the monitor currently samples at.
+        
+        Args:
+            interval: Seconds until the next sample
+        """
+        with self._lock:
+            if interval != self._sample_interval:
+                self._version += 1
+                self._sample_interval = interval
+    
+    def _observed_samples_per_minute(self, window: int = 20) -> float:
+        """
+        Compute the actual sample rate over the most recent entries.
+        
+        Args:
+            window: Number of most recent entries to use
+        """
+        if len(self._history) < 2:
+            return 0.0
+        
+        n = min(window, len(self._history))
+        elapsed = self._history.timestamp(-1) - self._history.timestamp(-n)
+        return (n - 1) / elapsed * 60 if elapsed > 0 else 0.0
     
     def get_last_n(self, n: int = 5) -> List[StatsEntry]:
         """
@@ -216,27 +1104,134 @@ class StatsTrackerService:
         Returns:
             List of StatsEntry objects
         """
-        return list(self._history)[-n:] if len(self._history) >= n else list(self._history)
+        with self._lock:
+            return self._history.entries(-n)
     
     def get_all(self) -> List[StatsEntry]:
         """Get all measurements in history."""
-        return list(self._history)
+        with self._lock:
+            return self._history.entries()
+    
+    def get_since(self, cursor: Optional[int] = None,
+                  limit: Optional[int] = None) -> Tuple[List[StatsEntry], int, bool]:
+        """
+        Get the history entries appended after a cursor.
+        
+        Entries are numbered by the order they were appended; the cursor is
+        the number of the last entry a reader has seen. Costs O(new entries),
+        however long the history is.
+        
+        Args:
+            cursor: Cursor returned by the previous call (None on the first call)
+            limit: Return at most this many of the newest entries
+            
+        Returns:
+            Tuple of (entries oldest first, new cursor, wrapped). wrapped is
+            True when entries after the cursor are missing, because the
+            history dropped them, was cleared or limit was exceeded: the
+            entries are then the newest of the whole history and replace
+            what the reader has.
+        """
+        with self._lock:
+            end = self._appended
+            start, wrapped = self._cursor_start(cursor, limit, end, len(self._history))
+            return self._history.entries(start - (end - len(self._history))), end, wrapped
+    
+    @staticmethod
+    def _cursor_start(cursor: Optional[int], limit: Optional[int], end: int, length: int) -> Tuple[int, bool]:
+        """
+        Get the number of the entry a cursor read starts after.
+        
+        Args:
+            cursor: Reader's cursor (None on the first read)
+            limit: Maximum number of entries to read
+            end: Number of the newest entry
+            length: Number of entries held, ending with end
+            
+        Returns:
+            Tuple of (start, wrapped), see get_since()
+        """
+        oldest = end - length
+        if cursor is None or not oldest <= cursor <= end:
+            start, wrapped = oldest, True
+        else:
+            start, wrapped = cursor, False
+        if limit is not None and end - start > limit:
+            start, wrapped = end - limit, True
+        return start, wrapped
+    
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              failures_only: bool = False, limit: Optional[int] = None) -> List[StatsEntry]:
+        """
+        Get measurements in a time range, oldest first.
+        
+        With a measurement store the query runs against the database and can
+        reach beyond the in-memory history; otherwise the history is filtered.
+        
+        Args:
+            start: Only measurements at or after this time
+            end: Only measurements before this time
+            failures_only: Only failed measurements
+            limit: Only the most recent limit measurements
+            
+        Returns:
+            List of StatsEntry objects
+        """
+        if self.store is not None:
+            rows = self.store.query(self.target, start, end, failures_only, limit=limit)
+            return [self._entry_from_row(row) for row in reversed(rows)]
+        
+        # The history is in time order: find the range by binary search and
+        # only create entry objects for the measurements returned
+        with self._lock:
+            first = self._history.index_at(start.timestamp()) if start is not None else 0
+            stop = self._history.index_at(end.timestamp()) if end is not None else len(self._history)
+            if not failures_only:
+                if limit:
+                    first = max(first, stop - limit)
+                return self._history.entries(first, stop)
+            
+            indexes = [i for i in range(first, stop) if self._history.latency(i) is None]
+            if limit:
+                indexes = indexes[-limit:]
+            return [self._history[i] for i in indexes]
     
     def get_summary(self) -> Dict:
         """
         Get summary statistics.
         
+        Constant time: min/max come from windows maintained as entries are
+        added, and percentiles from the latency sketch. All values are read
+        under the lock, so they belong to the same set of measurements.
+        
         Returns:
-            Dictionary with summary stats
+            Dictionary with summary stats; 'percentiles' maps 50, 90, 95, 99
+            and 99.9 to lifetime latency percentiles (empty before the first
+            successful check). The rolling windows depend on the current
+            time and are read through get_windows() instead
         """
+        with self._lock:
+            return self._summary()
+    
+    def _summary(self) -> Dict:
+        """Compute get_summary() (caller holds the lock)."""
         success_count = self._total_pings - self._failed_pings
         avg_latency = self._total_latency / success_count if success_count > 0 else 0
         success_rate = (success_count / self._total_pings * 100) if self._total_pings > 0 else 0
         
-        # Get min/max from successful pings
-        successful_latencies = [e.latency for e in self._history if e.latency is not None]
-        min_latency = min(successful_latencies) if successful_latencies else 0
-        max_latency = max(successful_latencies) if successful_latencies else 0
+        # Min/max of the successful pings in the history, and lifetime percentiles
+        min_latency = self._min_window[0][1] if self._min_window else 0
+        max_latency = self._max_window[0][1] if self._max_window else 0
+        percentiles = self._latency_sketch.percentiles()
+        
+        # Single-probe checks count as one probe each; bursts as their probe count
+        probes_sent = self._total_pings - self._burst_checks + self._burst_probes_sent
+        probes_lost = self._failed_pings - self._burst_failed_checks + self._burst_probes_lost
+        packet_loss = probes_lost / probes_sent * 100 if probes_sent > 0 else 0
+        avg_jitter = self._total_jitter / self._burst_checks if self._burst_checks > 0 else 0
+        
+        dns_successes = self._dns_lookups - self._dns_failures
+        avg_dns_ms = self._total_dns_ms / dns_successes if dns_successes > 0 else 0
         
         return {
             'total_pings': self._total_pings,
@@ -246,17 +1241,137 @@ class StatsTrackerService:
             'avg_latency': avg_latency,
             'min_latency': min_latency,
             'max_latency': max_latency,
-            'consecutive_failures': self._consecutive_failures
+            'percentiles': percentiles,
+            'consecutive_failures': self._consecutive_failures,
+            'packet_loss': packet_loss,
+            'avg_jitter': avg_jitter,
+            'sample_interval': self._sample_interval,
+            'samples_per_minute': self._observed_samples_per_minute(),
+            'dns_lookups': self._dns_lookups,
+            'dns_failures': self._dns_failures,
+            'avg_dns_ms': avg_dns_ms,
+            'last_dns_ms': self._last_dns_ms
         }
     
+    def get_snapshot(self) -> StatsSnapshot:
+        """
+        Get a consistent, read-only view of the summary and history.
+        
+        Safe to call from any thread. Snapshots are cached per version, so
+        readers polling an unchanged tracker get the same object back, and
+        the history is never copied up front.
+        
+        Returns:
+            StatsSnapshot; compare its version to tell whether anything changed
+        """
+        # Lock-free when nothing changed: writers bump the version before
+        # touching any state, so a matching version means the cached
+        # snapshot is current
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != self._version:
+                snapshot = self._snapshot = StatsSnapshot(self, self._version, self._summary())
+            return snapshot
+    
+    def _snapshot_entries(self, snapshot: StatsSnapshot, start: int, stop: int) -> List[StatsEntry]:
+        """
+        Read the history entries start..stop of a snapshot from the live history.
+        
+        Entry i of the snapshot was appended as number
+        snapshot._appended - snapshot._length + i + 1; entries appended later
+        are beyond the snapshot, entries the ring buffer has dropped are gone.
+        """
+        with self._lock:
+            if snapshot._generation != self._generation:
+                return []
+            offset = (snapshot._appended - snapshot._length) - (self._appended - len(self._history))
+            return self._history.entries(max(start + offset, 0), max(stop + offset, 0))
+    
+    def _snapshot_since(self, snapshot: StatsSnapshot, cursor: Optional[int],
+                        limit: Optional[int]) -> Tuple[List[StatsEntry], int, bool]:
+        """Read the entries of a snapshot appended after a cursor (StatsSnapshot.since())."""
+        end = snapshot._appended
+        start, wrapped = self._cursor_start(cursor, limit, end, snapshot._length)
+        wanted = end - start
+        entries = self._snapshot_entries(snapshot, snapshot._length - wanted, snapshot._length)
+        # Entries the history dropped after the snapshot was taken are missing too
+        return entries, end, wrapped or len(entries) < wanted
+    
+    def get_latency_sketch(self) -> LatencySketch:
+        """
+        Get a copy of the lifetime latency sketch, e.g. to merge it with
+        the sketches of other targets.
+        """
+        with self._lock:
+            return LatencySketch.merged([self._latency_sketch])
+    
+    def get_rollups(self, resolution: int, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> List[Dict]:
+        """
+        Get aggregates of the checks per minute, hour or day, oldest first.
+        
+        Rollups reach back further than the history: 2 days of minutes, 31
+        days of hours and 2 years of days. They are complete once restored
+        from the rollups file or the log in the background.
+        
+        Args:
+            resolution: StatsRollups.MINUTE, HOUR or DAY (seconds per bucket)
+            start: Only buckets ending after this time
+            end: Only buckets starting before this time
+            
+        Returns:
+            List of dictionaries with start, count, failures, success_rate,
+            avg/min/max latency and percentiles, see RollupBucket.to_dict()
+        """
+        with self._lock:
+            return [bucket.to_dict() for bucket in self._rollups.buckets(resolution, start, end)]
+    
+    def get_windows(self) -> Dict[float, Dict]:
+        """
+        Get the statistics of the checks in each rolling window.
+        
+        Constant time per window: sums are updated as checks are added and
+        expire, so the result only depends on the number of windows.
+        
+        Returns:
+            Dictionary of window length in seconds (shortest first) ->
+            dictionary with checks, failed, success_rate, avg_latency,
+            max_latency and packet_loss (None without checks)
+        """
+        with self._lock:
+            return self._windows.stats()
+    
     def get_consecutive_failures(self) -> int:
         """Get number of consecutive failures."""
         return self._consecutive_failures
     
     def clear(self) -> None:
         """Clear all statistics."""
-        self._history.clear()
-        self._consecutive_failures = 0
-        self._total_pings = 0
-        self._failed_pings = 0
-        self._total_latency = 0.0
+        with self._lock:
+            self._generation += 1
+            self._version += 1
+            self._history.clear()
+            # Skip an entry number, so get_since() reports every earlier cursor as wrapped
+            self._appended += 1
+            self._min_window.clear()
+            self._max_window.clear()
+            self._latency_sketch.clear()
+            self._rollups.clear()
+            self._windows.clear()
+            self._consecutive_failures = 0
+            self._total_pings = 0
+            self._failed_pings = 0
+            self._total_latency = 0.0
+            self._dns_lookups = 0
+            self._dns_failures = 0
+            self._total_dns_ms = 0.0
+            self._last_dns_ms = None
+            self._burst_checks = 0
+            self._burst_failed_checks = 0
+            self._burst_probes_sent = 0
+            self._burst_probes_lost = 0
+            self._total_jitter = 0.0
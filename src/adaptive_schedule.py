@@ -0,0 +1,57 @@
+"""
+Adaptive Schedule - Chooses the sampling interval of a monitored target
+Follows Single Responsibility Principle (SRP)
+"""
+
+
+class AdaptiveSchedule:
+    """
+    Sampling interval that speeds up during degradation.
+
+    Samples at ``base_interval`` while the target is healthy, switches to
+    ``fast_interval`` on the first failure or latency breach and, once the
+    target recovers, backs off exponentially towards ``base_interval``.
+    With adaptive sampling disabled the interval stays at ``base_interval``.
+    """
+
+    def __init__(self, base_interval: float, fast_interval: float = None,
+                 backoff_factor: float = 2.0, enabled: bool = True):
+        """
+        Initialize the schedule.
+
+        Args:
+            base_interval: Seconds between samples while healthy
+            fast_interval: Seconds between samples while degraded (default: base_interval)
+            backoff_factor: Interval multiplier per healthy sample after recovery
+            enabled: False keeps a fixed base_interval
+        """
+        self.base_interval = base_interval
+        self.fast_interval = min(fast_interval or base_interval, base_interval)
+        self.backoff_factor = max(1.0, backoff_factor)
+        self.enabled = enabled
+        self.interval = base_interval
+
+    @property
+    def degraded(self) -> bool:
+        """True while sampling faster than the base rate."""
+        return self.interval < self.base_interval
+
+    def on_result(self, healthy: bool) -> float:
+        """
+        Update the interval after a sample.
+
+        Args:
+            healthy: False if the sample failed or breached the latency threshold
+
+        Returns:
+            float: Seconds until the next sample
+        """
+        if not self.enabled:
+            return self.interval
+
+        if not healthy:
+            self.interval = self.fast_interval
+        elif self.interval < self.base_interval:
+            self.interval = min(self.base_interval, self.interval * self.backoff_factor)
+
+        return self.interval
@@ -2,152 +2,447 @@
 GUI Network Monitor - System tray version with GUI
 Extends NetworkMonitor for GUI mode
 """
+import math
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from services.ping_service import PingService
 from services.logger_service import LoggerService
 from services.email_service import EmailService
 from services.stats_tracker_service import StatsTrackerService
+from services.latency_sketch import LatencySketch
 from services.icon_service import IconService
+from services.burst_sampler import BurstResult, BurstSampler
+from services.rolling_stats import WindowAlert, window_label
+from src.adaptive_schedule import AdaptiveSchedule
+
+
+class MonitorTarget:
+    """Per-target services and alert state for one monitored host."""
+    
+    def __init__(self, ping_service: PingService, logger_service: LoggerService,
+                 stats_tracker: StatsTrackerService, name: Optional[str] = None,
+                 schedule: Optional[AdaptiveSchedule] = None):
+        """
+        Initialize a monitored target.
+        
+        Args:
+            ping_service: Service to probe this target (PingService, IcmpProbeService
+                or a ProbeService from services.probe_service)
+            logger_service: Service to log this target's measurements
+            stats_tracker: Service to track this target's statistics
+            name: Display name (default: the ping service host)
+            schedule: Sampling schedule (default: fixed monitor check interval)
+        """
+        self.name = name
+        self.schedule = schedule
+        self.next_due = 0.0
+        self.last_checkpoint = time.monotonic()
+        # Held while a measurement is recorded; stop() takes it before the
+        # final checkpoint so no late probe result is counted after it
+        self.record_lock = threading.Lock()
+        self.ping_service = ping_service
+        self.logger_service = logger_service
+        self.stats_tracker = stats_tracker
+        
+        self.alert_sent = False
+        self.current_latency = None
+        self.current_status = "Starting..."
+    
+    @property
+    def host(self) -> str:
+        """Configured target name, or the host name or address being monitored."""
+        return self.name or self.ping_service.host
 
 
 class GUINetworkMonitor:
     """
     Network monitor for GUI/System Tray mode.
-    Runs in background thread and updates GUI components.
+    Probes all targets concurrently from one background scheduler thread
+    and updates GUI components.
     """
     
-    def __init__(self, ping_service: PingService, logger_service: LoggerService, 
-                 stats_tracker: StatsTrackerService,
+    def __init__(self, targets: List[MonitorTarget],
                  email_service: Optional[EmailService] = None, 
                  recipient_email: Optional[str] = None,
-                 check_interval: int = 30,
+                 check_interval: float = 30,
                  latency_threshold: float = 1000.0,
                  failure_threshold: int = 3,
-                 status_callback=None):
+                 status_callback=None,
+                 max_workers: Optional[int] = None,
+                 snapshot_interval: float = 60.0,
+                 window_alert: Optional[WindowAlert] = None):
         """
         Initialize the GUI network monitor.
         
         Args:
-            ping_service: Service to perform ping operations
-            logger_service: Service to log measurements
-            stats_tracker: Service to track statistics
+            targets: Targets to monitor, each with its own ping/log/stats services
             email_service: Service to send email notifications (optional)
             recipient_email: Email address to send notifications to
-            check_interval: Seconds between ping checks (default: 30)
+            check_interval: Seconds between ping checks, may be fractional (default: 30)
             latency_threshold: Latency threshold in ms to consider as issue (default: 1000)
             failure_threshold: Number of consecutive failures before alerting (default: 3)
             status_callback: Callback function to update status (e.g., tray icon)
+            max_workers: Maximum number of probes in flight (default: one per target, up to 32)
+            snapshot_interval: Seconds between stats snapshots (0 = only when stopping)
+            window_alert: Optional rule on a rolling window (success rate, mean
+                latency, packet loss) that also triggers alerts
         """
-        self.ping_service = ping_service
-        self.logger_service = logger_service
-        self.stats_tracker = stats_tracker
+        if not targets:
+            raise ValueError("At least one target is required")
+        
+        self.targets = list(targets)
         self.email_service = email_service
         self.recipient_email = recipient_email
         self.check_interval = check_interval
         self.latency_threshold = latency_threshold
         self.failure_threshold = failure_threshold
         self.status_callback = status_callback
+        self.max_workers = max_workers or min(32, len(self.targets))
+        self.snapshot_interval = snapshot_interval
+        self.window_alert = window_alert
+        
+        for target in self.targets:
+            if target.schedule is None:
+                target.schedule = AdaptiveSchedule(check_interval, enabled=False)
         
-        self._alert_sent = False
         self._running = False
+        self._wakeup = threading.Event()
         self._thread = None
+        self._stream_threads = []
         
-        # Current status
+        # Current status (worst of all targets)
         self.current_latency = None
         self.current_status = "Starting..."
     
+    @property
+    def ping_service(self) -> PingService:
+        """Ping service of the primary (first) target."""
+        return self.targets[0].ping_service
+    
+    @property
+    def logger_service(self) -> LoggerService:
+        """Logger service of the primary (first) target."""
+        return self.targets[0].logger_service
+    
+    @property
+    def stats_tracker(self) -> StatsTrackerService:
+        """Stats tracker of the primary (first) target."""
+        return self.targets[0].stats_tracker
+    
     def start(self) -> None:
         """Start the network monitoring in a background thread."""
         if self._running:
             return
         
         self._running = True
+        self._wakeup.clear()
+        
+        # Streaming targets deliver their own samples; the scheduler polls the rest
+        self._stream_threads = []
+        for target in self.targets:
+            if self._is_streaming(target):
+                # Undo the close() of a previous stop()
+                target.ping_service.start()
+                self._stream_threads.append(
+                    threading.Thread(target=self._stream_loop, args=(target,), daemon=True)
+                )
+        for thread in self._stream_threads:
+            thread.start()
+        
         self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._thread.start()
     
     def stop(self) -> None:
-        """Stop the network monitoring loop."""
+        """
+        Stop the network monitoring loop.
+        
+        Returns as soon as the scheduler has woken up; probes still in flight
+        are abandoned and their results discarded. A result that is being
+        recorded is finished before the stats are checkpointed.
+        """
         self._running = False
+        self._wakeup.set()
+        
+        # Terminates long-running ping processes and closes probe sockets,
+        # which also cuts short probes that are waiting for a reply
+        for target in self.targets:
+            close = getattr(target.ping_service, "close", None)
+            if close is not None:
+                close()
+        
+        for thread in self._stream_threads:
+            thread.join(timeout=1)
+        self._stream_threads = []
+        
         if self._thread:
-            self._thread.join(timeout=5)
+            self._thread.join(timeout=1)
+            self._thread = None
+        
+        # Write out lines still queued by batched loggers and snapshot the
+        # stats so a restart or settings reload does not have to parse the log
+        for target in self.targets:
+            with target.record_lock:
+                target.logger_service.close()
+                target.stats_tracker.checkpoint(final=True)
+    
+    @staticmethod
+    def _is_streaming(target: MonitorTarget) -> bool:
+        """Check whether a target's ping service runs in stream mode."""
+        return getattr(target.ping_service, "mode", None) == PingService.MODE_STREAM
     
     def _monitor_loop(self) -> None:
-        """Main monitoring loop (runs in background thread)."""
+        """
+        Main scheduler loop (runs in background thread).
+        
+        Each target has a monotonic deadline that advances by its interval
+        from the previous deadline, not from when the probe finished, so the
+        sampling period does not drift by the probe duration. Waits are on an
+        Event that is set when a probe completes or stop() is called.
+        """
+        polled_targets = [target for target in self.targets if not self._is_streaming(target)]
+        if not polled_targets:
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="probe")
+        in_flight = {}
         try:
+            now = time.monotonic()
+            for target in polled_targets:
+                target.next_due = now
+            
             while self._running:
-                self._check_network()
-                time.sleep(self.check_interval)
+                # Dispatch every target whose deadline has passed
+                now = time.monotonic()
+                for target in polled_targets:
+                    if target.next_due <= now and target not in in_flight.values():
+                        future = executor.submit(self._check_network, target)
+                        future.add_done_callback(lambda _: self._wakeup.set())
+                        in_flight[future] = target
+                
+                # Sleep until the next deadline, a probe completes, or stop()
+                idle = [t.next_due for t in polled_targets if t not in in_flight.values()]
+                if idle:
+                    self._wakeup.wait(max(0.0, min(idle) - time.monotonic()))
+                else:
+                    self._wakeup.wait()
+                self._wakeup.clear()
+                
+                done = [future for future in in_flight if future.done()]
+                for future in done:
+                    self._complete_check(in_flight.pop(future), future.exception())
+                if done and self._running:
+                    self._update_status()
         except Exception as e:
             self.logger_service.log_error(f"Monitor loop error: {e}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     
-    def _check_network(self) -> None:
-        """Perform a single network check."""
-        latency = self.ping_service.ping()
+    def _complete_check(self, target: MonitorTarget, error: Optional[BaseException]) -> None:
+        """Schedule the next sample of a target after a check finished."""
+        if error is not None:
+            target.logger_service.log_error(f"Check failed: {error}")
         
-        # Store in stats tracker
-        self.stats_tracker.add_measurement(latency)
+        healthy = (
+            error is None
+            and target.current_latency is not None
+            and target.current_latency <= self.latency_threshold
+        )
+        interval = target.schedule.on_result(healthy)
+        target.stats_tracker.set_sample_interval(interval)
         
-        # Log to file
-        self.logger_service.log_latency(latency)
+        # Advance from the previous deadline; skip slots missed by a slow probe
+        next_due = target.next_due + interval
+        now = time.monotonic()
+        if next_due <= now:
+            missed = math.ceil((now - next_due) / interval) if interval > 0 else 0
+            next_due += missed * interval
+        target.next_due = next_due
+    
+    def _stream_loop(self, target: MonitorTarget) -> None:
+        """Consume results of a streaming ping service (runs in background thread)."""
+        try:
+            for _, latency in target.ping_service.stream():
+                if not self._record_if_running(target, latency):
+                    break
+                self._update_status()
+        except Exception as e:
+            target.logger_service.log_error(f"Stream loop error: {e}")
+    
+    def _check_network(self, target: MonitorTarget) -> None:
+        """Perform a single network check of one target."""
+        if isinstance(target.ping_service, BurstSampler):
+            burst = target.ping_service.sample()
+            latency = burst.latency
+        else:
+            burst = None
+            latency = target.ping_service.ping()
+        
+        self._record_if_running(target, latency, burst)
+    
+    def _record_if_running(self, target: MonitorTarget, latency: Optional[float],
+                           burst: Optional[BurstResult] = None) -> bool:
+        """
+        Record a measurement unless the monitor was stopped.
+        
+        A probe that outlived stop() belongs to a stopped monitor. The check
+        and the recording happen under the target's record lock, which stop()
+        takes before its final checkpoint.
+        
+        Returns:
+            bool: True if the measurement was recorded
+        """
+        with target.record_lock:
+            if not self._running:
+                return False
+            self._record_measurement(target, latency, burst)
+            return True
+    
+    def _record_measurement(self, target: MonitorTarget, latency: Optional[float],
+                            burst: Optional[BurstResult] = None) -> None:
+        """Store, log and evaluate one measurement (or burst check) of a target."""
+        # DNS lookups made by the target's resolver are a metric of their own
+        resolver = getattr(target.ping_service, "resolver", None)
+        if resolver is not None:
+            for _, lookup_ms in resolver.pop_lookups():
+                target.stats_tracker.add_dns_measurement(lookup_ms)
+                target.logger_service.log_dns(lookup_ms)
+        
+        if burst is not None:
+            target.stats_tracker.add_burst(burst)
+            target.logger_service.log_burst(burst)
+        else:
+            # Store in stats tracker
+            target.stats_tracker.add_measurement(latency)
+            
+            # Log to file (with per-phase timings for probes that provide them)
+            phases = getattr(target.ping_service, "last_phases", None) if latency is not None else None
+            target.logger_service.log_latency(latency, phases)
         
         # Update current status
-        self.current_latency = latency
+        target.current_latency = latency
         timestamp = datetime.now().strftime("%H:%M:%S")
         
         if latency is not None:
-            self.current_status = f"[{timestamp}] {latency:.2f} ms"
-            if latency > self.latency_threshold:
-                self._handle_network_issue(latency)
+            target.current_status = f"[{timestamp}] {latency:.2f} ms"
+            if burst is not None and burst.loss_pct > 0:
+                target.current_status += f" ({burst.loss_pct:.0f}% loss)"
+            if latency > self.latency_threshold or self._window_breach(target):
+                self._handle_network_issue(target, latency)
             else:
-                self._reset_failure_count()
+                self._reset_failure_count(target)
         else:
-            self.current_status = f"[{timestamp}] NO RESPONSE"
-            self._handle_network_issue(None)
+            target.current_status = f"[{timestamp}] NO RESPONSE"
+            self._handle_network_issue(target, None)
+        
+        if self.snapshot_interval and time.monotonic() - target.last_checkpoint >= self.snapshot_interval:
+            self._checkpoint(target)
+    
+    def _checkpoint(self, target: MonitorTarget) -> None:
+        """
+        Snapshot a target's stats.
+        
+        Runs on the thread that records the target's measurements, so no
+        measurement is counted but not yet logged while the snapshot is taken.
+        """
+        target.logger_service.flush()
+        target.stats_tracker.checkpoint()
+        target.last_checkpoint = time.monotonic()
+    
+    def _update_status(self) -> None:
+        """Aggregate target states and update GUI (icon, tooltip, etc.)."""
+        latencies = [target.current_latency for target in self.targets]
+        
+        if any(latency is None for latency in latencies):
+            worst = None
+        else:
+            worst = max(latencies)
+        
+        self.current_latency = worst
+        self.current_status = self._worst_target().current_status
         
-        # Update GUI (icon, tooltip, etc.)
         if self.status_callback:
-            self.status_callback(latency)
+            # A GUI failure must not end the scheduler loop
+            try:
+                self.status_callback(worst)
+            except Exception as e:
+                print(f"⚠️ Could not update status display: {e}")
+    
+    def _worst_target(self) -> MonitorTarget:
+        """Return the target in the worst state (failed, then highest latency)."""
+        return max(
+            self.targets,
+            key=lambda t: float("inf") if t.current_latency is None else t.current_latency
+        )
     
-    def _handle_network_issue(self, latency: Optional[float]) -> None:
-        """Handle network issue (high latency or no response)."""
-        consecutive_failures = self.stats_tracker.get_consecutive_failures()
+    def _window_breach(self, target: MonitorTarget) -> Optional[str]:
+        """Check the window alert rule on a target; returns the breach or None."""
+        if self.window_alert is None:
+            return None
+        return self.window_alert.check(target.stats_tracker.get_windows())
+    
+    def _handle_network_issue(self, target: MonitorTarget, latency: Optional[float]) -> None:
+        """
+        Handle network issue (high latency, no response or a degraded window) for one target.
+        
+        Alerts after failure_threshold consecutive failures, or when the
+        window alert rule is breached. The alert stays raised until a check
+        succeeds with the window healthy again.
+        """
+        if target.alert_sent:
+            return
         
-        if consecutive_failures >= self.failure_threshold and not self._alert_sent:
-            self._send_alert(latency)
-            self._alert_sent = True
+        consecutive_failures = target.stats_tracker.get_consecutive_failures()
+        if consecutive_failures >= self.failure_threshold:
+            self._send_alert(target, latency)
+            target.alert_sent = True
+            return
+        
+        breach = self._window_breach(target)
+        if breach:
+            self._send_alert(target, latency, breach)
+            target.alert_sent = True
     
-    def _reset_failure_count(self) -> None:
-        """Reset alert flag when network is healthy."""
-        if self._alert_sent:
-            self._alert_sent = False
-            self.logger_service.log_error("Network recovered")
+    def _reset_failure_count(self, target: MonitorTarget) -> None:
+        """Reset alert flag when a target is healthy."""
+        if target.alert_sent:
+            target.alert_sent = False
+            target.logger_service.log_error("Network recovered")
     
-    def _send_alert(self, latency: Optional[float]) -> None:
-        """Send email alert about network issue."""
-        consecutive_failures = self.stats_tracker.get_consecutive_failures()
+    def _send_alert(self, target: MonitorTarget, latency: Optional[float],
+                    window_breach: Optional[str] = None) -> None:
+        """
+        Send email alert about a network issue on one target.
         
-        subject = "Internet is down"
+        Args:
+            target: Target with the issue
+            latency: Latency of the last check in ms, or None if it failed
+            window_breach: Breach of the window alert rule that triggered the
+                alert (default: the consecutive failures did)
+        """
+        consecutive_failures = target.stats_tracker.get_consecutive_failures()
+        reason = window_breach or f"{consecutive_failures} consecutive failures"
         
-        if latency is None:
-            message = (
-                f"Network alert: No response from {self.ping_service.host}\n"
-                f"Consecutive failures: {consecutive_failures}\n"
-                f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            )
+        if window_breach:
+            subject = f"Network degraded: {target.host}"
+            lines = [f"Network alert: Degraded connection to {target.host}"]
         else:
-            message = (
-                f"Network alert: High latency to {self.ping_service.host}\n"
-                f"Current latency: {latency:.2f} ms\n"
-                f"Threshold: {self.latency_threshold} ms\n"
-                f"Consecutive failures: {consecutive_failures}\n"
-                f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            )
+            subject = "Internet is down"
+            lines = [f"Network alert: No response from {target.host}" if latency is None
+                     else f"Network alert: High latency to {target.host}"]
+        lines.append(f"Reason: {reason}")
+        if latency is not None:
+            lines.append(f"Current latency: {latency:.2f} ms")
+            if latency > self.latency_threshold:
+                lines.append(f"Threshold: {self.latency_threshold} ms")
+        lines.append(f"Consecutive failures: {consecutive_failures}")
+        lines.append(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        message = "\n".join(lines)
         
-        self.logger_service.log_error(f"Network issue detected - {consecutive_failures} consecutive failures")
+        target.logger_service.log_error(f"Network issue detected - {reason}")
         
         if self.email_service and self.recipient_email:
             success = self.email_service.send_notification(
@@ -156,18 +451,74 @@ class GUINetworkMonitor:
                 message
             )
             if success:
-                self.logger_service.log_error("Alert email sent successfully")
+                target.logger_service.log_error("Alert email sent successfully")
             else:
-                self.logger_service.log_error("Failed to send alert email")
+                target.logger_service.log_error("Failed to send alert email")
         else:
-            self.logger_service.log_error("Email service not configured")
-    
-    def get_status_summary(self) -> str:
-        """Get current status as a string for tooltip."""
-        summary = self.stats_tracker.get_summary()
-        return (
-            f"Network Monitor\n"
-            f"{self.current_status}\n"
-            f"Success Rate: {summary['success_rate']:.1f}%\n"
-            f"Avg: {summary['avg_latency']:.1f} ms"
+            target.logger_service.log_error("Email service not configured")
+    
+    @staticmethod
+    def _recent_window(tracker: StatsTrackerService) -> Optional[tuple]:
+        """Return (length, stats) of a tracker's shortest rolling window, None if it has no checks."""
+        windows = tracker.get_windows()
+        if not windows:
+            return None
+        length = min(windows)
+        return (length, windows[length]) if windows[length]['checks'] else None
+    
+    def get_status_summary(self, max_targets: int = 4) -> str:
+        """
+        Get current status as a string for tooltip.
+        
+        Args:
+            max_targets: Maximum number of per-target lines (worst first)
+        """
+        if len(self.targets) == 1:
+            summary = self.stats_tracker.get_snapshot().summary
+            text = (
+                f"Network Monitor\n"
+                f"{self.targets[0].current_status}\n"
+                f"Success Rate: {summary['success_rate']:.1f}%\n"
+                f"Avg: {summary['avg_latency']:.1f} ms"
+            )
+            percentiles = summary['percentiles']
+            if percentiles:
+                text += f"\np50/p95/p99: {percentiles[50]:.0f}/{percentiles[95]:.0f}/{percentiles[99]:.0f} ms"
+            recent = self._recent_window(self.stats_tracker)
+            if recent:
+                length, stats = recent
+                text += f"\nLast {window_label(length)}: {stats['success_rate']:.1f}%"
+                if stats['avg_latency'] is not None:
+                    text += f", avg {stats['avg_latency']:.1f} ms"
+            return text
+        
+        up = sum(1 for target in self.targets if target.current_latency is not None)
+        lines = [f"Network Monitor - {up}/{len(self.targets)} up"]
+        
+        # Percentiles over all targets
+        percentiles = LatencySketch.merged(
+            target.stats_tracker.get_latency_sketch() for target in self.targets
+        ).percentiles((50, 99))
+        if percentiles:
+            lines.append(f"All p50/p99: {percentiles[50]:.0f}/{percentiles[99]:.0f} ms")
+        
+        ranked = sorted(
+            self.targets,
+            key=lambda t: float("inf") if t.current_latency is None else t.current_latency,
+            reverse=True
         )
+        for target in ranked[:max_targets]:
+            summary = target.stats_tracker.get_snapshot().summary
+            if target.current_latency is None:
+                latency_text = "DOWN"
+            else:
+                latency_text = f"{target.current_latency:.0f} ms"
+            # Success rate of the shortest window, lifetime until it has checks
+            recent = self._recent_window(target.stats_tracker)
+            success_rate = recent[1]['success_rate'] if recent else summary['success_rate']
+            lines.append(f"{target.host}: {latency_text} ({success_rate:.0f}%)")
+        
+        if len(ranked) > max_targets:
+            lines.append(f"+{len(ranked) - max_targets} more")
+        
+        return "\n".join(lines)
@@ -3,8 +3,11 @@ GUI Windows - Tkinter windows for displaying stats
 Follows Single Responsibility Principle (SRP)
 """
 import tkinter as tk
+from collections import deque
+from datetime import datetime, timedelta
 from tkinter import ttk, scrolledtext
-from typing import List, Dict
+from typing import List, Dict, Optional
+from services.stats_rollups import StatsRollups
 from services.stats_tracker_service import StatsEntry
 
 
@@ -37,9 +40,18 @@ class QuickStatsWindow:
         self.summary_label = None
         self.stats_container = None
         
+        # Last 5 entries shown and the history cursor after them
+        self._recent = deque(maxlen=5)
+        self._cursor = None
+        
         # Create initial widgets
-        stats = initial_stats or self.stats_tracker.get_last_n(5)
-        summary = initial_summary or self.stats_tracker.get_summary()
+        snapshot = self.stats_tracker.get_snapshot()
+        if initial_stats:
+            self._recent.extend(initial_stats)
+        else:
+            self._fetch_recent(snapshot)
+        stats = list(self._recent)
+        summary = initial_summary or snapshot.summary
         self._create_widgets(stats, summary)
         
         # Start auto-refresh (every 2 seconds)
@@ -158,20 +170,38 @@ class QuickStatsWindow:
     def _refresh_data(self):
         """Refresh the window with latest data."""
         try:
-            # Get latest data
-            stats = self.stats_tracker.get_last_n(5)
-            summary = self.stats_tracker.get_summary()
+            # Get latest data (summary and entries of the same version)
+            snapshot = self.stats_tracker.get_snapshot()
+            changed = self._fetch_recent(snapshot)
+            summary = snapshot.summary
             
             # Update summary
             summary_text = f"Success Rate: {summary['success_rate']:.1f}% | Avg: {summary['avg_latency']:.1f} ms | Failures: {summary['consecutive_failures']}"
             self.summary_label.config(text=summary_text)
             
             # Update stats display
-            self._update_stats_display(stats)
+            if changed:
+                self._update_stats_display(list(self._recent))
             
         except Exception as e:
             print(f"Error refreshing quick stats: {e}")
     
+    def _fetch_recent(self, snapshot) -> bool:
+        """
+        Add the entries measured since the last fetch to the last 5 shown.
+        
+        Args:
+            snapshot: StatsSnapshot to read the entries up to
+        
+        Returns:
+            bool: True if the last 5 entries changed
+        """
+        entries, self._cursor, wrapped = snapshot.since(self._cursor, limit=self._recent.maxlen)
+        if wrapped:
+            self._recent.clear()
+        self._recent.extend(entries)
+        return bool(entries) or wrapped
+    
     def _schedule_refresh(self):
         """Schedule the next refresh."""
         try:
@@ -198,7 +228,27 @@ class QuickStatsWindow:
 class FullStatsWindow:
     """Full statistics window with complete history and auto-refresh."""
     
-    def __init__(self, stats_tracker, initial_stats: List[StatsEntry] = None, initial_summary: Dict = None):
+    # History views: label -> how far back to query (None = in-memory history)
+    HISTORY_RANGES = {
+        "Recent": None,
+        "Last hour": timedelta(hours=1),
+        "Last 24 hours": timedelta(days=1),
+        "Last 7 days": timedelta(days=7),
+        "Last 30 days": timedelta(days=30),
+        "Last year": timedelta(days=365),
+        "All": timedelta.max
+    }
+    
+    # Rows fetched for a history view
+    HISTORY_LIMIT = 2000
+    
+    # Longer ranges show minute, hour or day rollups instead of measurements
+    RAW_HISTORY_SPAN = timedelta(hours=1)
+    
+    ROLLUP_LABELS = {StatsRollups.MINUTE: "minute", StatsRollups.HOUR: "hour", StatsRollups.DAY: "day"}
+    
+    def __init__(self, stats_tracker, initial_stats: List[StatsEntry] = None, initial_summary: Dict = None,
+                 target_trackers: Dict = None):
         """
         Initialize full stats window.
         
@@ -206,26 +256,42 @@ class FullStatsWindow:
             stats_tracker: StatsTrackerService instance for live data
             initial_stats: Initial stats to display (optional)
             initial_summary: Initial summary to display (optional)
+            target_trackers: Mapping of target host to StatsTrackerService (optional).
+                With more than one target a per-target breakdown is shown and
+                selecting a row switches the summary and history to that target.
         """
         self.stats_tracker = stats_tracker
+        self.target_trackers = target_trackers if target_trackers and len(target_trackers) > 1 else {}
         self.window = tk.Tk()
         self.window.title("Network Monitor - Full Statistics (Live)")
-        self.window.geometry("700x600")
+        height = 840 if self.target_trackers else 640
+        self.window.geometry(f"700x{height}")
         
         # Center window
         screen_width = self.window.winfo_screenwidth()
         screen_height = self.window.winfo_screenheight()
         x = (screen_width - 700) // 2
-        y = (screen_height - 600) // 2
+        y = (screen_height - height) // 2
         self.window.geometry(f"+{x}+{y}")
         
         # Store widgets for updating
         self.summary_widgets = {}
         self.stats_tree = None
+        self.targets_tree = None
+        self.range_var = tk.StringVar(self.window, value="Recent")
+        self.failures_only_var = tk.BooleanVar(self.window, value=False)
+        # History cursor of the recent view (None redraws it) and the
+        # (tracker, version) whose summary is shown
+        self._cursor = None
+        self._summary_shown = None
+        self._table_count = 0
         
         # Create initial widgets
-        stats = initial_stats or self.stats_tracker.get_all()
-        summary = initial_summary or self.stats_tracker.get_summary()
+        snapshot = self.stats_tracker.get_snapshot()
+        stats = initial_stats
+        if not stats:
+            stats, self._cursor, _ = snapshot.since()
+        summary = initial_summary or snapshot.summary
         self._create_widgets(stats, summary)
         
         # Start auto-refresh (every 3 seconds)
@@ -250,15 +316,74 @@ class FullStatsWindow:
         # Summary section
         self._create_summary_section(summary)
         
+        # Per-target breakdown
+        if self.target_trackers:
+            self._create_targets_section()
+        
         # Stats table
         self._create_stats_table(stats)
         
         # Footer buttons
         self._create_footer()
     
+    def _create_targets_section(self):
+        """Create per-target breakdown table."""
+        targets_frame = tk.Frame(self.window)
+        targets_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        tk.Label(
+            targets_frame,
+            text="Targets (select a row to show its history)",
+            font=("Arial", 10, "bold"),
+            anchor="w"
+        ).pack(fill=tk.X, pady=(0, 5))
+        
+        columns = ("target", "total", "success", "avg", "min", "max", "streak")
+        headings = ("Target", "Total", "Success", "Avg", "Min", "Max", "Fail Streak")
+        self.targets_tree = ttk.Treeview(
+            targets_frame,
+            columns=columns,
+            show="headings",
+            height=min(len(self.target_trackers), 8),
+            selectmode="browse"
+        )
+        for column, heading in zip(columns, headings):
+            self.targets_tree.heading(column, text=heading)
+            self.targets_tree.column(column, width=180 if column == "target" else 75, anchor="w")
+        
+        for host in self.target_trackers:
+            self.targets_tree.insert("", tk.END, iid=host, values=(host,))
+        
+        self.targets_tree.pack(fill=tk.X)
+        self.targets_tree.bind("<<TreeviewSelect>>", self._on_target_selected)
+        
+        self._update_targets_table()
+    
+    def _update_targets_table(self):
+        """Update the per-target breakdown with latest summaries."""
+        for host, tracker in self.target_trackers.items():
+            summary = tracker.get_snapshot().summary
+            self.targets_tree.item(host, values=(
+                host,
+                summary['total_pings'],
+                f"{summary['success_rate']:.1f}%",
+                f"{summary['avg_latency']:.1f} ms",
+                f"{summary['min_latency']:.1f} ms",
+                f"{summary['max_latency']:.1f} ms",
+                summary['consecutive_failures']
+            ))
+    
+    def _on_target_selected(self, event=None):
+        """Switch summary and history to the selected target."""
+        selection = self.targets_tree.selection()
+        if selection and selection[0] in self.target_trackers:
+            self.stats_tracker = self.target_trackers[selection[0]]
+            self._cursor = None
+            self._refresh_data()
+    
     def _create_summary_section(self, summary: Dict):
         """Create summary statistics section."""
-        summary_frame = tk.Frame(self.window, bg="#f5f5f5", height=120)
+        summary_frame = tk.Frame(self.window, bg="#f5f5f5", height=160)
         summary_frame.pack(fill=tk.X, padx=10, pady=10)
         summary_frame.pack_propagate(False)
         
@@ -281,8 +406,13 @@ class FullStatsWindow:
             ("Avg Latency:", f"{summary['avg_latency']:.2f} ms"),
             ("Min Latency:", f"{summary['min_latency']:.2f} ms"),
             ("Max Latency:", f"{summary['max_latency']:.2f} ms"),
-            ("Consecutive Failures:", f"{summary['consecutive_failures']}")
-        ]
+            ("Consecutive Failures:", f"{summary['consecutive_failures']}"),
+            ("Sample Rate:", f"{summary['samples_per_minute']:.1f}/min"),
+            ("Packet Loss:", f"{summary['packet_loss']:.1f}%"),
+            ("Avg Jitter:", f"{summary['avg_jitter']:.2f} ms"),
+            ("Avg DNS Lookup:", f"{summary['avg_dns_ms']:.2f} ms"),
+            ("DNS Lookups:", f"{summary['dns_lookups']} ({summary['dns_failures']} failed)")
+        ] + self._percentile_rows(summary)
         
         for i, (label_text, value_text) in enumerate(stats_data):
             row = i // 4
@@ -323,6 +453,29 @@ class FullStatsWindow:
         )
         self.table_label.pack(fill=tk.X, pady=(0, 5))
         
+        # History filters (queried from the measurement store when configured)
+        filter_frame = tk.Frame(table_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        tk.Label(filter_frame, text="Show:", font=("Arial", 9)).pack(side=tk.LEFT)
+        range_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.range_var,
+            values=list(self.HISTORY_RANGES),
+            state="readonly",
+            width=14
+        )
+        range_box.pack(side=tk.LEFT, padx=5)
+        range_box.bind("<<ComboboxSelected>>", lambda event: self._refresh_data())
+        
+        tk.Checkbutton(
+            filter_frame,
+            text="Failures only",
+            variable=self.failures_only_var,
+            command=self._refresh_data,
+            font=("Arial", 9)
+        ).pack(side=tk.LEFT, padx=5)
+        
         # Create scrolled text widget
         self.stats_text = scrolledtext.ScrolledText(
             table_frame,
@@ -365,31 +518,90 @@ class FullStatsWindow:
         self.stats_text.insert(tk.END, "-" * 60 + "\n")
         
         # Add stats (newest first)
-        for entry in reversed(stats):
-            time_str = entry.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-            
-            if entry.latency is not None:
-                latency_str = f"{entry.latency:.2f} ms"
-                if entry.latency < 100:
-                    status = "Excellent"
-                elif entry.latency < 500:
-                    status = "Good"
-                elif entry.latency < 1000:
-                    status = "Fair"
-                else:
-                    status = "Poor"
-            else:
-                latency_str = "NO RESPONSE"
-                status = "Failed"
-            
-            self.stats_text.insert(tk.END, f"{time_str:<20} {latency_str:<15} {status:<10}\n")
+        self.stats_text.insert(tk.END, "".join(self._stats_row(entry) for entry in reversed(stats)))
         
         # Make read-only
         self.stats_text.config(state=tk.DISABLED)
         
         # Update table label
+        self._table_count = len(stats)
         self.table_label.config(text=f"Ping History ({len(stats)} entries) - Live Updates")
     
+    def _add_stats_rows(self, entries: List[StatsEntry]):
+        """
+        Add new entries to the top of the recent history table.
+        
+        Rows of entries that have left the tracker's history are removed from
+        the bottom, so the table matches a full redraw.
+        """
+        self.stats_text.config(state=tk.NORMAL)
+        # Below the two header lines, newest first
+        self.stats_text.insert("3.0", "".join(self._stats_row(entry) for entry in reversed(entries)))
+        self._table_count = min(self._table_count + len(entries), self.stats_tracker.max_history)
+        self.stats_text.delete(f"{self._table_count + 3}.0", tk.END)
+        self.stats_text.config(state=tk.DISABLED)
+        
+        self.table_label.config(text=f"Ping History ({self._table_count} entries) - Live Updates")
+    
+    @staticmethod
+    def _stats_row(entry: StatsEntry) -> str:
+        """Format one line of the history table."""
+        time_str = entry.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        
+        if entry.latency is not None:
+            latency_str = f"{entry.latency:.2f} ms"
+            if entry.latency < 100:
+                status = "Excellent"
+            elif entry.latency < 500:
+                status = "Good"
+            elif entry.latency < 1000:
+                status = "Fair"
+            else:
+                status = "Poor"
+        else:
+            latency_str = "NO RESPONSE"
+            status = "Failed"
+        
+        return f"{time_str:<20} {latency_str:<15} {status:<10}\n"
+    
+    def _update_rollups_table(self, rollups: List[Dict], resolution: int):
+        """Update the stats table with per-minute, hour or day aggregates."""
+        self.stats_text.config(state=tk.NORMAL)
+        self.stats_text.delete(1.0, tk.END)
+        
+        time_format = "%Y-%m-%d" if resolution == StatsRollups.DAY else "%Y-%m-%d %H:%M"
+        self.stats_text.insert(
+            tk.END,
+            f"{'Period':<18} {'Checks':>7} {'Failed':>7} {'Avg':>10} {'Min':>10} {'Max':>10} {'P95':>10}\n"
+        )
+        self.stats_text.insert(tk.END, "-" * 78 + "\n")
+        
+        def ms(value):
+            return f"{value:.2f}" if value is not None else "-"
+        
+        # Newest first, like the measurements
+        for row in reversed(rollups):
+            self.stats_text.insert(
+                tk.END,
+                f"{row['start'].strftime(time_format):<18} {row['count']:>7} {row['failures']:>7} "
+                f"{ms(row['avg_latency']):>10} {ms(row['min_latency']):>10} {ms(row['max_latency']):>10} "
+                f"{ms(row['percentiles'].get(95)):>10}\n"
+            )
+        
+        self.stats_text.config(state=tk.DISABLED)
+        self.table_label.config(
+            text=f"Ping History ({len(rollups)} {self.ROLLUP_LABELS[resolution]}s, latencies in ms) - Live Updates"
+        )
+    
+    @staticmethod
+    def _percentile_rows(summary: Dict) -> List[tuple]:
+        """Get the (label, value) rows of the latency percentiles."""
+        percentiles = summary.get('percentiles') or {}
+        return [
+            (f"P{pct:g} Latency:", f"{percentiles[pct]:.2f} ms" if pct in percentiles else "-")
+            for pct in (50, 90, 95, 99, 99.9)
+        ]
+    
     def _update_summary(self, summary: Dict):
         """Update summary statistics."""
         stats_data = [
@@ -400,8 +612,13 @@ class FullStatsWindow:
             ("Avg Latency:", f"{summary['avg_latency']:.2f} ms"),
             ("Min Latency:", f"{summary['min_latency']:.2f} ms"),
             ("Max Latency:", f"{summary['max_latency']:.2f} ms"),
-            ("Consecutive Failures:", f"{summary['consecutive_failures']}")
-        ]
+            ("Consecutive Failures:", f"{summary['consecutive_failures']}"),
+            ("Sample Rate:", f"{summary['samples_per_minute']:.1f}/min"),
+            ("Packet Loss:", f"{summary['packet_loss']:.1f}%"),
+            ("Avg Jitter:", f"{summary['avg_jitter']:.2f} ms"),
+            ("Avg DNS Lookup:", f"{summary['avg_dns_ms']:.2f} ms"),
+            ("DNS Lookups:", f"{summary['dns_lookups']} ({summary['dns_failures']} failed)")
+        ] + self._percentile_rows(summary)
         
         for label_text, value_text in stats_data:
             if label_text in self.summary_widgets:
@@ -410,19 +627,72 @@ class FullStatsWindow:
     def _refresh_data(self):
         """Refresh the window with latest data."""
         try:
-            # Get latest data
-            stats = self.stats_tracker.get_all()
-            summary = self.stats_tracker.get_summary()
+            # Update per-target breakdown
+            if self.target_trackers:
+                self._update_targets_table()
             
-            # Update summary
-            self._update_summary(summary)
+            # Update summary when the tracker changed
+            snapshot = self.stats_tracker.get_snapshot()
+            if self._summary_shown != (self.stats_tracker, snapshot.version):
+                self._summary_shown = (self.stats_tracker, snapshot.version)
+                self._update_summary(snapshot.summary)
             
             # Update stats table
-            self._update_stats_table(stats)
+            if self._is_recent_view():
+                # Only the entries added since the last refresh
+                entries, self._cursor, wrapped = snapshot.since(self._cursor)
+                if wrapped:
+                    self._update_stats_table(entries)
+                elif entries:
+                    self._add_stats_rows(entries)
+                return
+            
+            self._cursor = None
+            resolution = self._history_resolution()
+            if resolution is None:
+                self._update_stats_table(self._fetch_history())
+            else:
+                self._update_rollups_table(self._fetch_rollups(resolution), resolution)
             
         except Exception as e:
             print(f"Error refreshing full stats: {e}")
     
+    def _is_recent_view(self) -> bool:
+        """Check whether the table shows the tracker's in-memory history unfiltered."""
+        return self.HISTORY_RANGES.get(self.range_var.get()) is None and not self.failures_only_var.get()
+    
+    def _fetch_history(self) -> List[StatsEntry]:
+        """Get the history entries selected by the range and failure filters."""
+        history_range = self.HISTORY_RANGES.get(self.range_var.get())
+        failures_only = self.failures_only_var.get()
+        
+        start = None
+        if history_range is not None and history_range != timedelta.max:
+            start = datetime.now() - history_range
+        return self.stats_tracker.query(start=start, failures_only=failures_only, limit=self.HISTORY_LIMIT)
+    
+    def _history_resolution(self) -> Optional[int]:
+        """
+        Choose how to show the selected range.
+        
+        Returns:
+            None to list measurements (recent history, failures and short
+            ranges), otherwise the rollup resolution that fits the range in
+            about HISTORY_LIMIT rows
+        """
+        history_range = self.HISTORY_RANGES.get(self.range_var.get())
+        if history_range is None or self.failures_only_var.get() or history_range <= self.RAW_HISTORY_SPAN:
+            return None
+        if history_range == timedelta.max:
+            return StatsRollups.DAY
+        return StatsRollups.resolution_for(history_range, self.HISTORY_LIMIT)
+    
+    def _fetch_rollups(self, resolution: int) -> List[Dict]:
+        """Get the rollups of the selected range."""
+        history_range = self.HISTORY_RANGES.get(self.range_var.get())
+        start = None if history_range == timedelta.max else datetime.now() - history_range
+        return self.stats_tracker.get_rollups(resolution, start=start)
+    
     def _schedule_refresh(self):
         """Schedule the next refresh."""
         try:
@@ -117,13 +117,16 @@ class SettingsWindow:
             anchor="w"
         ).pack(fill=tk.X, pady=(0, 10))
         
-        # Target Host
+        # Target Host(s)
+        target_host = self.config.get('monitoring', {}).get('target_host', '8.8.8.8')
+        if isinstance(target_host, list):
+            target_host = ", ".join(target_host)
         self._create_field(
             section_frame,
-            "Target Host (IP/Domain):",
+            "Target Host(s) (IP/Domain):",
             "target_host",
-            self.config.get('monitoring', {}).get('target_host', '8.8.8.8'),
-            "IP address or domain to monitor (e.g., 8.8.8.8, google.com)"
+            target_host,
+            "IP address or domain to monitor, comma-separated for several (e.g., 8.8.8.8, google.com)"
         )
         
         # Check Interval
@@ -132,7 +135,7 @@ class SettingsWindow:
             "Check Interval (seconds):",
             "check_interval_seconds",
             str(self.config.get('monitoring', {}).get('check_interval_seconds', 30)),
-            "How often to ping (recommended: 30)"
+            "How often to ping, fractions allowed (recommended: 30)"
         )
         
         # Latency Threshold
@@ -321,8 +324,9 @@ class SettingsWindow:
             if 'monitoring' not in self.config:
                 self.config['monitoring'] = {}
             
-            self.config['monitoring']['target_host'] = self.entry_target_host.get().strip()
-            self.config['monitoring']['check_interval_seconds'] = int(self.entry_check_interval_seconds.get())
+            target_hosts = [host.strip() for host in self.entry_target_host.get().split(",") if host.strip()]
+            self.config['monitoring']['target_host'] = target_hosts[0] if len(target_hosts) == 1 else target_hosts
+            self.config['monitoring']['check_interval_seconds'] = float(self.entry_check_interval_seconds.get())
             self.config['monitoring']['latency_threshold_ms'] = float(self.entry_latency_threshold_ms.get())
             self.config['monitoring']['failure_threshold'] = int(self.entry_failure_threshold.get())
             
@@ -341,8 +345,8 @@ class SettingsWindow:
             if not self.config['monitoring']['target_host']:
                 raise ValueError("Target host cannot be empty")
             
-            if self.config['monitoring']['check_interval_seconds'] < 5:
-                raise ValueError("Check interval must be at least 5 seconds")
+            if self.config['monitoring']['check_interval_seconds'] < 0.1:
+                raise ValueError("Check interval must be at least 0.1 seconds")
             
             # Save to file
             config_path = Path('config.json')
@@ -353,7 +357,7 @@ class SettingsWindow:
                 "Settings Saved",
                 "Settings have been saved and applied successfully!\n\n"
                 "✅ Changes are now active:\n"
-                f"• Target: {self.config['monitoring']['target_host']}\n"
+                f"• Target: {', '.join(target_hosts)}\n"
                 f"• Interval: {self.config['monitoring']['check_interval_seconds']}s\n"
                 f"• Threshold: {self.config['monitoring']['latency_threshold_ms']}ms\n\n"
                 "No restart required!"
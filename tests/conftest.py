@@ -0,0 +1,5 @@
+"""Shared pytest setup: make the services package importable from the repo root."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,97 @@
+"""
+Tests for the HistoryBuffer ring and the history min/max of the tracker
+summary, including after the ring wraps around.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.stats_tracker_service import BurstStatsEntry, HistoryBuffer, StatsEntry, StatsTrackerService
+
+
+def _entries(count: int, start: datetime = datetime(2026, 6, 1, 9, 0, 0)):
+    """Entries one second apart with latency n (None every 4th)."""
+    return [StatsEntry(start + timedelta(seconds=n), None if n % 4 == 3 else float(n))
+            for n in range(count)]
+
+
+def test_buffer_keeps_newest_after_wraparound():
+    entries = _entries(25)
+    history = HistoryBuffer(10)
+    history.extend(entries)
+
+    assert len(history) == 10
+    assert [entry.latency for entry in history] == [entry.latency for entry in entries[-10:]]
+    assert [entry.latency for entry in reversed(history)] == [entry.latency for entry in entries[:-11:-1]]
+    assert history[0].timestamp == entries[15].timestamp
+    assert history[-1].latency == 24.0
+    assert history.latency(-2) is None
+    assert history.timestamp(0) == entries[15].timestamp.timestamp()
+    assert [entry.latency for entry in history.entries(-3)] == [22.0, None, 24.0]
+    with pytest.raises(IndexError):
+        history[10]
+
+
+def test_buffer_segments_split_at_wraparound():
+    entries = _entries(13)
+    history = HistoryBuffer(10)
+    history.extend(entries)
+
+    segments = history.segments()
+    # The ring starts at slot 3: the range wraps into two runs
+    assert [len(timestamps) for timestamps, _ in segments] == [7, 3]
+    timestamps = [value for run, _ in segments for value in run]
+    assert timestamps == [entry.timestamp.timestamp() for entry in entries[3:]]
+    assert len(history.segments(2, 6)) == 1
+
+    assert history.index_at(entries[8].timestamp.timestamp()) == 5
+    assert history.index_at(entries[8].timestamp.timestamp() - 0.5) == 5
+    assert history.index_at(entries[-1].timestamp.timestamp() + 1) == len(history)
+
+
+def test_buffer_keeps_burst_details():
+    history = HistoryBuffer(3)
+    when = datetime(2026, 6, 1, 9, 0, 0)
+    history.append(BurstStatsEntry(when, 20.0, 5, 10.0, 30.0, 40.0, 2.0))
+    history.append(StatsEntry(when + timedelta(seconds=1), 8.0))
+    history.append(BurstStatsEntry(when + timedelta(seconds=2), None, 5, None, None, 100.0, 0.0))
+    # Overwrites the first burst slot with a plain check
+    history.append(StatsEntry(when + timedelta(seconds=3), 9.0))
+
+    burst = history[1]
+    assert isinstance(burst, BurstStatsEntry)
+    assert (burst.latency, burst.sent, burst.min_latency, burst.loss_pct) == (None, 5, None, 100.0)
+    assert not isinstance(history[0], BurstStatsEntry)
+    assert not isinstance(history[2], BurstStatsEntry)
+
+
+def test_summary_min_max_follow_history():
+    rng = random.Random(11)
+    tracker = StatsTrackerService(max_history=50)
+    latencies = []
+    for _ in range(2000):
+        latency = None if rng.random() < 0.1 else rng.uniform(1, 1000)
+        tracker.add_measurement(latency)
+        latencies.append(latency)
+
+        # Old extremes leave with the entries the ring drops
+        recent = [value for value in latencies[-50:] if value is not None]
+        summary = tracker.get_summary()
+        assert summary['min_latency'] == (min(recent) if recent else 0)
+        assert summary['max_latency'] == (max(recent) if recent else 0)
+
+
+def test_summary_min_max_without_successes():
+    tracker = StatsTrackerService(max_history=5)
+    tracker.add_measurement(900.0)
+    for _ in range(5):
+        tracker.add_measurement(None)
+    summary = tracker.get_summary()
+    assert (summary['min_latency'], summary['max_latency']) == (0, 0)
+
+    tracker.add_measurement(3.0)
+    tracker.clear()
+    tracker.add_measurement(7.0)
+    summary = tracker.get_summary()
+    assert (summary['min_latency'], summary['max_latency']) == (7.0, 7.0)
@@ -0,0 +1,103 @@
+"""
+Tests that LatencySketch percentiles stay within the stated relative error.
+"""
+import math
+import random
+
+import pytest
+
+from services.latency_sketch import LatencySketch
+
+PERCENTILES = (0, 1, 25, 50, 75, 90, 95, 99, 99.9, 100)
+# The relative accuracy, plus float rounding at bucket edges
+TOLERANCE = LatencySketch.RELATIVE_ACCURACY + 1e-9
+
+
+def _exact(latencies, pct: float) -> float:
+    """Latency at the same 0-based rank the sketch answers, floor(pct% of (count - 1))."""
+    ordered = sorted(latencies)
+    return ordered[math.floor(pct / 100 * (len(ordered) - 1))]
+
+
+def _assert_within_error(sketch: LatencySketch, latencies):
+    estimates = sketch.percentiles(PERCENTILES)
+    for pct in PERCENTILES:
+        exact = _exact(latencies, pct)
+        assert estimates[pct] == pytest.approx(exact, rel=TOLERANCE), f"p{pct}"
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "lognormal", "bimodal"])
+def test_percentiles_within_relative_error(distribution):
+    rng = random.Random(5)
+    if distribution == "uniform":
+        latencies = [rng.uniform(0.5, 2000) for _ in range(20000)]
+    elif distribution == "lognormal":
+        latencies = [rng.lognormvariate(3, 1.5) for _ in range(20000)]
+    else:
+        latencies = [rng.gauss(12, 1) if rng.random() < 0.9 else rng.gauss(800, 50) for _ in range(20000)]
+        latencies = [abs(value) + 0.01 for value in latencies]
+
+    sketch = LatencySketch()
+    for latency in latencies:
+        sketch.add(latency)
+    assert sketch.count == len(latencies)
+    _assert_within_error(sketch, latencies)
+
+
+def test_add_all_matches_add():
+    np = pytest.importorskip("numpy")
+    rng = random.Random(9)
+    latencies = [rng.lognormvariate(2, 1) for _ in range(5000)] + [0.0, 0.0005]
+
+    one_by_one = LatencySketch()
+    for latency in latencies:
+        one_by_one.add(latency)
+    vectorized = LatencySketch()
+    vectorized.add_all(np.array(latencies))
+    assert vectorized.to_dict() == one_by_one.to_dict()
+    assert vectorized.percentiles() == one_by_one.percentiles()
+
+
+def test_merge_equals_one_sketch():
+    rng = random.Random(13)
+    parts = [[rng.uniform(1, 50) for _ in range(1000)],
+             [rng.uniform(100, 900) for _ in range(300)],
+             [0.0] * 10]
+    sketches = []
+    for part in parts:
+        sketch = LatencySketch()
+        for latency in part:
+            sketch.add(latency)
+        sketches.append(sketch)
+
+    combined = LatencySketch()
+    for latency in (value for part in parts for value in part):
+        combined.add(latency)
+    merged = LatencySketch.merged(sketches)
+    assert merged.to_dict() == combined.to_dict()
+    assert merged.percentiles() == combined.percentiles()
+    _assert_within_error(merged, [value for part in parts for value in part])
+
+
+def test_merge_rejects_other_accuracy():
+    with pytest.raises(ValueError):
+        LatencySketch().merge(LatencySketch(0.05))
+
+
+def test_round_trip_and_cached_percentiles():
+    sketch = LatencySketch()
+    assert sketch.percentiles() == {}
+    assert sketch.quantile(50) is None
+    for latency in (1.0, 2.0, 3.0, 400.0):
+        sketch.add(latency)
+    first = sketch.percentiles()
+
+    restored = LatencySketch.from_dict(sketch.to_dict())
+    assert restored.count == 4
+    assert restored.percentiles() == first
+
+    # Adding a latency invalidates the cached percentiles
+    sketch.add(5000.0)
+    assert sketch.quantile(100) == pytest.approx(5000.0, rel=TOLERANCE)
+    sketch.clear()
+    assert sketch.count == 0 and sketch.percentiles() == {}
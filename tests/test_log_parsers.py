@@ -0,0 +1,106 @@
+"""
+Tests that the NumPy log parser and the pure-Python parser agree.
+"""
+import gzip
+import math
+import random
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import log_analysis
+from services.segment_counter import SegmentCounter
+
+np = pytest.importorskip("numpy")
+
+
+def _write_log(path, lines: int = 3000, seed: int = 7):
+    """Write a text log with checks, failures, bursts, DNS lookups and errors."""
+    rng = random.Random(seed)
+    timestamp = datetime(2026, 3, 1, 12, 0, 0)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(lines):
+            timestamp += timedelta(seconds=rng.choice((1, 2, 30)))
+            prefix = f"[{timestamp:%Y-%m-%d %H:%M:%S}]"
+            kind = rng.random()
+            if kind < 0.6:
+                f.write(f"{prefix} Latency: {rng.uniform(1, 900):.2f} ms\n")
+            elif kind < 0.7:
+                f.write(f"{prefix} Latency: NO RESPONSE\n")
+            elif kind < 0.8:
+                low = rng.uniform(5, 50)
+                f.write(f"{prefix} Latency: {low + 3:.2f} ms (burst 5, min {low:.2f} ms, "
+                        f"max {low + 9:.2f} ms, loss {rng.choice((0.0, 20.0, 40.0)):.1f}%, "
+                        f"jitter {rng.uniform(0, 4):.2f} ms)\n")
+            elif kind < 0.83:
+                f.write(f"{prefix} Latency: NO RESPONSE (burst 5, loss 100.0%)\n")
+            elif kind < 0.9:
+                f.write(f"{prefix} DNS: {rng.uniform(0.5, 40):.2f} ms\n")
+            elif kind < 0.93:
+                f.write(f"{prefix} DNS: FAILED\n")
+            elif kind < 0.97:
+                f.write(f"{prefix} Latency: 12.50 ms (dns 1.00 ms, connect 2.00 ms, "
+                        f"tls 3.00 ms, first_byte 6.50 ms)\n")
+            else:
+                f.write(f"{prefix} ERROR: Network issue detected - 3 consecutive failures\n")
+
+
+def _columns(arrays):
+    """Plain Python columns of LogArrays from either parser."""
+    return ([int(value) for value in arrays.timestamps],
+            [None if math.isnan(value) else round(float(value), 2) for value in arrays.latencies],
+            [int(value) for value in arrays.kinds],
+            list(arrays.burst_lines))
+
+
+@pytest.fixture
+def text_log(tmp_path):
+    path = tmp_path / "log.txt"
+    _write_log(path)
+    return path
+
+
+def test_parsers_give_same_columns(text_log):
+    python = log_analysis._load_text_python(text_log, 0, None)
+    # A small chunk size makes lines straddle chunk boundaries
+    vectorized = log_analysis._load_text_numpy(text_log, 0, None, chunk_size=4096)
+    assert isinstance(vectorized.latencies, np.ndarray)
+    assert _columns(vectorized) == _columns(python)
+
+
+def test_parsers_give_same_counts(text_log):
+    python = log_analysis._load_text_python(text_log, 0, None)
+    vectorized = log_analysis._load_text_numpy(text_log, 0, None, chunk_size=4096)
+    # Counters are equal; latency sums only up to float rounding
+    expected = log_analysis.count_arrays(python)
+    assert log_analysis.count_arrays(vectorized) == pytest.approx(expected)
+
+    # The line-by-line counter used without NumPy
+    counter = SegmentCounter()
+    with open(text_log, encoding="utf-8") as f:
+        counter.count_text_lines(f)
+    assert counter.counters() == pytest.approx(expected)
+
+
+def test_parsers_agree_on_byte_ranges(text_log):
+    size = text_log.stat().st_size
+    ranges = log_analysis.split_ranges(text_log, 3, min_size=1)
+    assert ranges[0][0] == 0
+    total = 0
+    for start, end in ranges:
+        python = log_analysis._load_text_python(text_log, start, end)
+        vectorized = log_analysis._load_text_numpy(text_log, start, end, chunk_size=4096)
+        assert _columns(vectorized) == _columns(python)
+        total += len(python)
+    assert total == len(log_analysis._load_text_python(text_log, 0, size))
+
+
+def test_parsers_read_compressed_segments(text_log, tmp_path):
+    compressed = tmp_path / "log.txt.gz"
+    with open(text_log, "rb") as src, gzip.open(compressed, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    python = log_analysis._load_text_python(compressed, 0, None)
+    vectorized = log_analysis._load_text_numpy(compressed, 0, None, chunk_size=4096)
+    assert _columns(vectorized) == _columns(log_analysis._load_text_python(text_log, 0, None))
+    assert _columns(vectorized) == _columns(python)
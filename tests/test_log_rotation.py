@@ -0,0 +1,110 @@
+"""
+Tests for log rotation, compression and retention, and the lifetime totals
+restored across rotated segments.
+"""
+import gzip
+
+import pytest
+
+from services.log_format import archive_summary_file, archived_segments, binary_log_file
+from services.logger_service import LoggerService
+from services.stats_tracker_service import StatsTrackerService
+
+
+def _log_checks(logger, count: int):
+    """Log count checks, every 7th failed; returns (total latency, failures)."""
+    total = 0.0
+    failures = 0
+    for n in range(count):
+        if n % 7 == 0:
+            logger.log_latency(None)
+            failures += 1
+        else:
+            latency = float(n % 50 + 1)
+            logger.log_latency(latency)
+            total += latency
+    return total, failures
+
+
+def _archive(logger):
+    """Finish compressing and pruning segments (waits for background passes)."""
+    logger._archive_segments()
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_rotated_segments_are_compressed_and_counted(tmp_path, binary):
+    log_file = tmp_path / "log.txt"
+    logger = LoggerService(str(log_file), rotate_bytes=2000, binary=binary)
+    total, failures = _log_checks(logger, 600)
+    logger.log_dns(3.0)
+    logger.log_dns(None)
+    logger.close()
+    _archive(logger)
+
+    active = binary_log_file(str(log_file)) if binary else log_file
+    segments = archived_segments(active)
+    assert len(segments) >= 2
+    assert all(segment.suffix == ".gz" for segment in segments)
+    # Compressed segments are readable
+    with gzip.open(segments[0], "rb") as f:
+        assert f.read()
+
+    tracker = StatsTrackerService(max_history=50, log_file=str(active))
+    assert tracker.wait_restored(10)
+    summary = tracker.get_summary()
+    assert summary['total_pings'] == 600
+    assert summary['failed'] == failures
+    assert summary['avg_latency'] == pytest.approx(total / (600 - failures))
+    assert summary['dns_lookups'] == 2 and summary['dns_failures'] == 1
+
+
+def test_retention_keeps_lifetime_totals(tmp_path):
+    log_file = tmp_path / "log.txt"
+    logger = LoggerService(str(log_file), rotate_bytes=1500, max_archives=2)
+    _, failures = _log_checks(logger, 500)
+    logger.close()
+    _archive(logger)
+
+    assert len(archived_segments(log_file)) == 2
+    assert archive_summary_file(log_file).exists()
+
+    tracker = StatsTrackerService(max_history=50, log_file=str(log_file))
+    assert tracker.wait_restored(10)
+    summary = tracker.get_summary()
+    assert summary['total_pings'] == 500
+    assert summary['failed'] == failures
+
+
+def test_rotation_continues_counting_after_restart(tmp_path):
+    log_file = tmp_path / "log.txt"
+    logger = LoggerService(str(log_file), rotate_bytes=2000)
+    _log_checks(logger, 300)
+    logger.close()
+    _archive(logger)
+
+    tracker = StatsTrackerService(max_history=50, log_file=str(log_file))
+    assert tracker.wait_restored(10)
+    tracker.checkpoint(final=True)
+
+    # More checks, and rotations, after the snapshot
+    logger = LoggerService(str(log_file), rotate_bytes=2000)
+    _log_checks(logger, 300)
+    logger.close()
+    _archive(logger)
+
+    tracker = StatsTrackerService(max_history=50, log_file=str(log_file))
+    assert tracker.wait_restored(10)
+    assert tracker.get_summary()['total_pings'] == 600
+
+
+def test_same_second_rotations_keep_totals(tmp_path):
+    log_file = tmp_path / "log.txt"
+    logger = LoggerService(str(log_file), rotate_bytes=500, max_archives=1)
+    # Many rotations within the same second reuse the timestamp with a counter
+    _log_checks(logger, 200)
+    logger.close()
+    _archive(logger)
+
+    tracker = StatsTrackerService(max_history=10, log_file=str(log_file))
+    assert tracker.wait_restored(10)
+    assert tracker.get_summary()['total_pings'] == 200
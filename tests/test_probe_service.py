@@ -0,0 +1,250 @@
+"""
+Tests for the TCP, UDP and HTTP probes against local listeners.
+"""
+import http.server
+import socket
+import threading
+import time
+
+import pytest
+
+from services.probe_service import (
+    HttpProbeService, ProbeService, TcpProbeService, UdpProbeService, create_probe
+)
+
+
+@pytest.fixture
+def tcp_listener():
+    """Port of a listening TCP socket on localhost."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    yield server.getsockname()[1]
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    """Port on localhost with nothing listening (TCP or UDP)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def udp_echo():
+    """Port of a UDP echo server on localhost."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(0.1)
+    stopped = threading.Event()
+
+    def serve():
+        while not stopped.is_set():
+            try:
+                data, address = server.recvfrom(2048)
+            except socket.timeout:
+                continue
+            server.sendto(data, address)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server.getsockname()[1]
+    stopped.set()
+    thread.join()
+    server.close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Answers 200 (or 500 on /fail) and records the methods it received."""
+
+    protocol_version = "HTTP/1.1"
+    methods = []
+
+    def _respond(self, body: bool) -> None:
+        self.methods.append(self.command)
+        status = 500 if self.path == "/fail" else 200
+        payload = b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if body:
+            self.wfile.write(payload)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """(base URL, list of received methods) of an HTTP server on localhost."""
+    _Handler.methods = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", _Handler.methods
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_probe_service_is_abstract():
+    with pytest.raises(TypeError):
+        ProbeService("127.0.0.1", 80)
+
+
+def test_tcp_probe_times_connect(tcp_listener):
+    probe = TcpProbeService("127.0.0.1", tcp_listener, timeout=2.0)
+    latency = probe.ping()
+    assert latency is not None and latency >= 0
+    assert probe.last_phases == {'connect': latency}
+
+
+def test_tcp_probe_fails_on_closed_port(closed_port):
+    assert TcpProbeService("127.0.0.1", closed_port, timeout=1.0).ping() is None
+
+
+def test_udp_probe_round_trip(udp_echo):
+    probe = UdpProbeService("127.0.0.1", udp_echo, timeout=2.0)
+    try:
+        assert probe.ping() is not None
+        # The socket is kept between probes
+        assert probe.ping() is not None
+        latencies = probe.ping_many(3, 0.01)
+        assert len(latencies) == 3 and None not in latencies
+    finally:
+        probe.close()
+
+
+def test_udp_probe_fails_without_echo(closed_port):
+    probe = UdpProbeService("127.0.0.1", closed_port, timeout=0.3)
+    try:
+        assert probe.ping() is None
+        assert probe.ping_many(2, 0.01) == [None, None]
+    finally:
+        probe.close()
+
+
+def test_http_probe_uses_head_by_default(http_server):
+    url, methods = http_server
+    probe = create_probe(url + "/", timeout=2.0)
+    try:
+        assert isinstance(probe, HttpProbeService)
+        assert probe.ping() is not None
+        assert probe.ping() is not None
+    finally:
+        probe.close()
+    assert methods == ["HEAD", "HEAD"]
+    assert probe.last_status == 200
+    assert set(probe.last_phases) == {'dns', 'connect', 'tls', 'first_byte'}
+
+
+def test_http_probe_get_method(http_server):
+    url, methods = http_server
+    probe = create_probe(url + "/", timeout=2.0, http_method="get")
+    try:
+        assert probe.ping() is not None
+        assert len(probe.ping_many(2, 0.01)) == 2
+    finally:
+        probe.close()
+    assert methods == ["GET"] * 3
+
+
+def test_http_probe_server_error_fails(http_server):
+    url, _ = http_server
+    probe = HttpProbeService(url + "/fail", timeout=2.0)
+    try:
+        assert probe.ping() is None
+    finally:
+        probe.close()
+    assert probe.last_status == 500
+
+
+@pytest.fixture
+def raw_http_server():
+    """
+    Factory for a raw HTTP server on localhost.
+
+    serve(reply_to, close) answers the first request on each of the first
+    reply_to connections with an empty 200, then closes the connection (a
+    stale keep-alive for the client) or leaves it open; later requests are
+    never answered. Returns (URL, list of accepted connections).
+    """
+    servers = []
+
+    def serve(reply_to: int, close: bool = True):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(16)
+        servers.append(server)
+        connections = []
+
+        def run():
+            replied = 0
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except OSError:
+                    return
+                connections.append(conn)
+                conn.recv(4096)
+                if replied < reply_to:
+                    replied += 1
+                    conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+                    if close:
+                        conn.close()
+
+        threading.Thread(target=run, daemon=True).start()
+        return f"http://127.0.0.1:{server.getsockname()[1]}/", connections
+
+    yield serve
+    for server in servers:
+        server.close()
+
+
+def test_http_probe_replaces_stale_keep_alive(raw_http_server):
+    url, connections = raw_http_server(reply_to=2)
+    probe = HttpProbeService(url, timeout=2.0)
+    try:
+        assert probe.ping() is not None
+        time.sleep(0.1)
+        # The server closed the kept-alive connection: one retry on a new one
+        assert probe.ping() is not None
+    finally:
+        probe.close()
+    assert len(connections) == 2
+
+
+def test_http_probe_timeout_is_not_retried(raw_http_server):
+    url, connections = raw_http_server(reply_to=1, close=False)
+    probe = HttpProbeService(url, timeout=0.5)
+    try:
+        assert probe.ping() is not None
+        # The kept-alive connection stays open but gets no reply
+        start = time.monotonic()
+        assert probe.ping() is None
+    finally:
+        probe.close()
+    assert time.monotonic() - start < 0.9
+    assert len(connections) == 1
+
+
+def test_http_probe_rejects_other_methods():
+    with pytest.raises(ValueError):
+        HttpProbeService("http://127.0.0.1/", method="POST")
+
+
+def test_create_probe_schemes():
+    assert isinstance(create_probe("tcp://127.0.0.1:22"), TcpProbeService)
+    assert isinstance(create_probe("udp://127.0.0.1"), UdpProbeService)
+    assert create_probe("udp://127.0.0.1").port == 7
+    assert isinstance(create_probe("https://127.0.0.1/x"), HttpProbeService)
+    assert create_probe("8.8.8.8") is None
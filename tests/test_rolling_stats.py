@@ -0,0 +1,153 @@
+"""
+Tests for rolling window expiry, seeding from rollup buckets and the
+window alert transitions.
+"""
+import random
+
+import pytest
+
+from services.rolling_stats import RollingStats, RollingWindow, WindowAlert, window_label
+
+T0 = 1_780_000_000.0
+
+
+def _exact(checks, now: float, length: float):
+    """Statistics of the (timestamp, latency) checks in the window ending at now."""
+    recent = [latency for timestamp, latency in checks if timestamp > now - length]
+    ok = [latency for latency in recent if latency is not None]
+    return {
+        'checks': len(recent),
+        'failed': len(recent) - len(ok),
+        'avg_latency': sum(ok) / len(ok) if ok else None,
+        'max_latency': max(ok) if ok else None,
+    }
+
+
+def test_windows_match_exact_statistics():
+    rng = random.Random(17)
+    rolling = RollingStats((60, 600))
+    checks = []
+    now = T0
+    for _ in range(3000):
+        now += rng.choice((0.5, 1, 2, 30))
+        latency = None if rng.random() < 0.15 else rng.uniform(1, 300)
+        rolling.add(now, latency)
+        checks.append((now, latency))
+
+        for length, stats in rolling.stats(now).items():
+            expected = _exact(checks, now, length)
+            assert stats['checks'] == expected['checks']
+            assert stats['failed'] == expected['failed']
+            # The monotonic queue gives the exact maximum of the window
+            assert stats['max_latency'] == expected['max_latency']
+            if expected['avg_latency'] is None:
+                assert stats['avg_latency'] is None
+            else:
+                assert stats['avg_latency'] == pytest.approx(expected['avg_latency'])
+
+
+def test_window_expires_without_new_checks():
+    window = RollingWindow(300)
+    window.add(T0, 50.0)
+    window.add(T0 + 100, None)
+    window.add(T0 + 200, 10.0, sent=5, lost=2)
+
+    window.expire(T0 + 299)
+    stats = window.stats()
+    assert (stats['checks'], stats['failed'], stats['max_latency']) == (3, 1, 50.0)
+    assert stats['packet_loss'] == pytest.approx(3 / 7 * 100)
+
+    # The 50 ms maximum leaves exactly length seconds after its check
+    window.expire(T0 + 300)
+    stats = window.stats()
+    assert (stats['checks'], stats['max_latency']) == (2, 10.0)
+
+    window.expire(T0 + 500)
+    stats = window.stats()
+    assert stats == {'checks': 0, 'failed': 0, 'success_rate': None, 'avg_latency': None,
+                     'max_latency': None, 'packet_loss': None}
+
+
+def test_seed_fills_in_before_first_check():
+    rolling = RollingStats((300, 3600))
+    before = T0 + 3000
+    rolling.add(before + 10, 5.0)
+    # Minute buckets (start, checks, failures, latency sum, max)
+    buckets = [(T0 + minute * 60, 10, 1, 9 * 20.0, 40.0) for minute in range(51)]
+    rolling.seed(buckets, 60, before, now=before + 20)
+
+    stats = rolling.stats(before + 20)
+    # Only buckets that end by before and start inside the window are added
+    inside_hour = [bucket for bucket in buckets if bucket[0] + 60 <= before and bucket[0] > before + 20 - 3600]
+    assert stats[3600]['checks'] == 10 * len(inside_hour) + 1
+    assert stats[3600]['failed'] == len(inside_hour)
+    assert stats[3600]['max_latency'] == 40.0
+    inside_five = [bucket for bucket in buckets if bucket[0] + 60 <= before and bucket[0] > before + 20 - 300]
+    assert stats[300]['checks'] == 10 * len(inside_five) + 1
+
+    # Seeded buckets expire as a whole
+    stats = rolling.stats(T0 + 60 * 50 + 300)
+    assert stats[300]['checks'] == 1
+    assert stats[300]['max_latency'] == 5.0
+
+
+def test_seed_does_not_count_checks_twice():
+    rolling = RollingStats((3600,))
+    # Checks already in the window and in the newest bucket
+    rolling.add(T0 + 120, 7.0)
+    rolling.add(T0 + 150, 9.0)
+    buckets = [(T0, 3, 0, 30.0, 10.0), (T0 + 60, 2, 0, 8.0, 4.0), (T0 + 120, 2, 0, 16.0, 9.0)]
+    rolling.seed(buckets, 60, before=T0 + 120, now=T0 + 160)
+
+    stats = rolling.stats(T0 + 160)
+    assert stats[3600]['checks'] == 7
+    assert stats[3600]['avg_latency'] == pytest.approx((30.0 + 8.0 + 16.0) / 7)
+    assert stats[3600]['max_latency'] == 10.0
+
+
+def test_alert_transitions():
+    rule = WindowAlert(window=300, min_success_rate=90, min_checks=5)
+    rolling = RollingStats((300,))
+    now = T0
+    for _ in range(3):
+        now += 10
+        rolling.add(now, None)
+    # Too few checks to judge
+    assert rule.check(rolling.stats(now)) is None
+
+    for _ in range(2):
+        now += 10
+        rolling.add(now, 20.0)
+    breach = rule.check(rolling.stats(now))
+    assert breach == "success rate 40.0% over the last 5 min (threshold 90%)"
+
+    # Recovers once the failures leave the window
+    for _ in range(30):
+        now += 10
+        rolling.add(now, 20.0)
+    assert rule.check(rolling.stats(now)) is None
+
+
+def test_alert_on_latency_and_loss():
+    latency_rule = WindowAlert(window=60, max_avg_latency=100, min_checks=1)
+    loss_rule = WindowAlert(window=60, max_packet_loss=10, min_checks=1)
+    rolling = RollingStats((60,))
+    rolling.add(T0, 150.0, sent=5, lost=1)
+    windows = rolling.stats(T0)
+    assert latency_rule.check(windows) == "average latency 150.0 ms over the last 1 min (threshold 100 ms)"
+    assert loss_rule.check(windows) == "packet loss 20.0% over the last 1 min (threshold 10%)"
+    # A rule for a window that is not tracked never fires
+    assert WindowAlert(window=900, max_avg_latency=1, min_checks=1).check(windows) is None
+
+
+def test_alert_from_config():
+    assert WindowAlert.from_config({}) is None
+    assert WindowAlert.from_config({'alert_window_seconds': 3600}) is None
+    rule = WindowAlert.from_config({'alert_window_seconds': 3600, 'alert_max_packet_loss': 5,
+                                    'alert_min_checks': 20})
+    assert (rule.window, rule.max_packet_loss, rule.min_checks) == (3600, 5, 20)
+
+
+def test_window_labels():
+    assert [window_label(seconds) for seconds in (30, 300, 3600, 86400, 90)] == [
+        "30 s", "5 min", "1 h", "24 h", "90 s"]
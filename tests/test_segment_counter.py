@@ -0,0 +1,146 @@
+"""
+Tests for SegmentCounter and the archive summary of rotated log segments.
+"""
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from services.log_format import archive_segment_file, archive_summary_file
+from services.segment_counter import SegmentCounter, summarize_archived_segments, summarized_segments
+
+
+def _lines(count: int, start: datetime, fail_every: int = 5):
+    """Text log lines of count checks, every fail_every-th failed."""
+    lines = []
+    for n in range(count):
+        prefix = f"[{start + timedelta(seconds=n):%Y-%m-%d %H:%M:%S}]"
+        if n % fail_every == fail_every - 1:
+            lines.append(f"{prefix} Latency: NO RESPONSE\n")
+        else:
+            lines.append(f"{prefix} Latency: {10 + n % 20:.2f} ms\n")
+    return lines
+
+
+def _write_segment(log_file, when: datetime, lines, compress: bool = False):
+    """Write a rotated segment of log_file holding lines."""
+    segment = archive_segment_file(log_file, when)
+    data = "".join(lines).encode("utf-8")
+    if compress:
+        segment = segment.with_name(segment.name + ".gz")
+        with gzip.open(segment, "wb") as f:
+            f.write(data)
+    else:
+        segment.write_bytes(data)
+    return segment
+
+
+def test_summary_counts_each_segment_once(tmp_path):
+    log_file = tmp_path / "log.txt"
+    log_file.touch()
+    start = datetime(2026, 5, 1, 8, 0, 0)
+    _write_segment(log_file, start, _lines(100, start))
+    _write_segment(log_file, start + timedelta(hours=1), _lines(50, start), compress=True)
+
+    counter = summarize_archived_segments(str(log_file))
+    assert counter.total_pings == 150
+    assert counter.failed_pings == 30
+    assert len(summarized_segments(str(log_file))) == 2
+
+    # A second pass reads the totals from the summary instead of recounting
+    again = summarize_archived_segments(str(log_file))
+    assert again.counters() == counter.counters()
+    assert again.latency_sketch.count == counter.latency_sketch.count
+
+
+def test_summary_keeps_totals_of_deleted_segments(tmp_path):
+    log_file = tmp_path / "log.txt"
+    log_file.touch()
+    start = datetime(2026, 5, 1, 8, 0, 0)
+    old = _write_segment(log_file, start, _lines(40, start))
+    summarize_archived_segments(str(log_file))
+
+    # Retention deletes the segment; a new one is rotated
+    old.unlink()
+    new = _write_segment(log_file, start + timedelta(hours=1), _lines(10, start))
+    counter = summarize_archived_segments(str(log_file))
+    assert counter.total_pings == 50
+    assert counter.failed_pings == 10
+    assert new.name in summarized_segments(str(log_file))
+
+
+def test_unreadable_segment_is_retried(tmp_path):
+    log_file = tmp_path / "log.txt"
+    log_file.touch()
+    start = datetime(2026, 5, 1, 8, 0, 0)
+    _write_segment(log_file, start, _lines(20, start))
+    broken = archive_segment_file(log_file, start + timedelta(hours=1))
+    broken = broken.with_name(broken.name + ".gz")
+    broken.write_bytes(b"not a gzip file")
+
+    counter = summarize_archived_segments(str(log_file))
+    # The broken segment adds nothing and is not marked summarized
+    assert counter.total_pings == 20
+    assert broken.name[:-3] not in summarized_segments(str(log_file))
+
+    with gzip.open(broken, "wb") as f:
+        f.write("".join(_lines(30, start)).encode("utf-8"))
+    counter = summarize_archived_segments(str(log_file))
+    assert counter.total_pings == 50
+    assert broken.name[:-3] in summarized_segments(str(log_file))
+
+
+def test_corrupt_summary_is_rebuilt(tmp_path):
+    log_file = tmp_path / "log.txt"
+    log_file.touch()
+    start = datetime(2026, 5, 1, 8, 0, 0)
+    _write_segment(log_file, start, _lines(25, start))
+    archive_summary_file(log_file).write_text("{", encoding="utf-8")
+
+    assert summarize_archived_segments(str(log_file)).total_pings == 25
+    assert json.loads(archive_summary_file(log_file).read_text(encoding="utf-8"))['counters']['total_pings'] == 25
+
+
+def test_count_segment_up_to_offset(tmp_path):
+    log_file = tmp_path / "log.txt"
+    lines = _lines(30, datetime(2026, 5, 1, 8, 0, 0))
+    log_file.write_text("".join(lines), encoding="utf-8")
+
+    counter = SegmentCounter()
+    counter.count_segment(log_file, end=len("".join(lines[:12]).encode("utf-8")))
+    assert counter.total_pings == 12
+    assert counter.failed_pings == 2
+
+
+def test_merge_continues_failure_streak():
+    first = SegmentCounter()
+    for latency in (5.0, None, None):
+        first.count_check(latency)
+    all_failed = SegmentCounter()
+    for _ in range(4):
+        all_failed.count_check(None)
+    first.merge(all_failed)
+    assert first.consecutive_failures == 6
+
+    recovered = SegmentCounter()
+    for latency in (None, 7.0, None):
+        recovered.count_check(latency)
+    first.merge(recovered)
+    assert first.consecutive_failures == 1
+    assert first.total_pings == 10
+    assert first.failed_pings == 8
+
+
+def test_burst_lines_count_probes(tmp_path):
+    counter = SegmentCounter()
+    counter.count_text_lines([
+        "[2026-05-01 08:00:00] Latency: 20.00 ms (burst 5, min 10.00 ms, max 30.00 ms, loss 40.0%, jitter 2.00 ms)\n",
+        "[2026-05-01 08:00:30] Latency: NO RESPONSE (burst 5, loss 100.0%)\n",
+        "[2026-05-01 08:01:00] DNS: 4.00 ms\n",
+        "[2026-05-01 08:01:00] ERROR: Network issue detected\n",
+    ])
+    assert counter.total_pings == 2
+    assert counter.burst_checks == 2
+    assert counter.burst_probes_sent == 10
+    assert counter.burst_probes_lost == 7
+    assert counter.burst_failed_checks == 1
+    assert counter.dns_lookups == 1
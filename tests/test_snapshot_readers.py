@@ -0,0 +1,134 @@
+"""
+Stress test of lock-free snapshot readers against a live writer.
+
+The writer adds latencies 1, 2, 3, ... and clears the tracker every
+ROUND checks, restarting at 1, so every snapshot and every cursor read can
+be checked exactly.
+"""
+import threading
+
+from services.stats_tracker_service import StatsTrackerService
+
+MAX_HISTORY = 500
+ROUND = 2000
+ROUNDS = 5
+READERS = 6
+# Pause between reads, so spinning readers do not starve the writer of the lock
+POLL_SECONDS = 0.001
+
+
+def _writer(tracker, done):
+    for _ in range(ROUNDS):
+        for n in range(1, ROUND + 1):
+            tracker.add_measurement(float(n))
+        tracker.clear()
+    done.set()
+
+
+def _check_snapshot(snapshot):
+    """Return what is inconsistent in a snapshot, or None."""
+    summary = snapshot.summary
+    total = summary['total_pings']
+    if summary['successful'] + summary['failed'] != total:
+        return f"torn counters at version {snapshot.version}"
+    if total and abs(summary['avg_latency'] - (total + 1) / 2) > 1e-6 * total:
+        return f"average {summary['avg_latency']} does not match {total} checks"
+    if total and summary['max_latency'] != float(total):
+        return f"max latency {summary['max_latency']} != {total}"
+    if len(snapshot) != min(total, MAX_HISTORY):
+        return f"history length {len(snapshot)} for {total} checks"
+    # Entries dropped by the ring buffer since are left out, never replaced
+    tail = snapshot.last_n(50)
+    expected = [float(n) for n in range(total - len(tail) + 1, total + 1)]
+    if [entry.latency for entry in tail] != expected:
+        return f"history of version {snapshot.version} does not end at {total}"
+    return None
+
+
+def _check_feed(entries, cursor, last_cursor, wrapped, last_value):
+    """Check one cursor read; returns (problem or None, newest value seen)."""
+    if last_cursor is not None and cursor < last_cursor:
+        return f"cursor went back from {last_cursor} to {cursor}", last_value
+    values = [entry.latency for entry in entries]
+    if values != [values[0] + i for i in range(len(values))]:
+        return "entries are not consecutive", last_value
+    if values and not wrapped and last_value is not None and values[0] != last_value + 1:
+        return f"entries continue at {values[0]} after {last_value} without wrapped", last_value
+    if values:
+        last_value = values[-1]
+    elif wrapped:
+        last_value = None
+    return None, last_value
+
+
+def _reader(tracker, done, errors):
+    last_snapshot = None
+    snapshot_cursor = snapshot_value = None
+    live_cursor = live_value = None
+    while not done.wait(POLL_SECONDS):
+        snapshot = tracker.get_snapshot()
+        if last_snapshot is not None and snapshot.version < last_snapshot.version:
+            errors.append("version went back")
+        last_snapshot = snapshot
+        problem = _check_snapshot(snapshot)
+        if problem:
+            errors.append(problem)
+
+        # Cursor feed of the snapshot ends at the snapshot's total
+        entries, cursor, wrapped = snapshot.since(snapshot_cursor)
+        if entries and entries[-1].latency != float(snapshot.summary['total_pings']):
+            errors.append("snapshot feed does not end at the snapshot")
+        problem, snapshot_value = _check_feed(entries, cursor, snapshot_cursor, wrapped, snapshot_value)
+        if problem:
+            errors.append(problem)
+        snapshot_cursor = cursor
+
+        entries, cursor, wrapped = tracker.get_since(live_cursor)
+        problem, live_value = _check_feed(entries, cursor, live_cursor, wrapped, live_value)
+        if problem:
+            errors.append(problem)
+        live_cursor = cursor
+
+
+def test_snapshot_readers_against_writer():
+    tracker = StatsTrackerService(max_history=MAX_HISTORY)
+    done = threading.Event()
+    errors = []
+    readers = [threading.Thread(target=_reader, args=(tracker, done, errors)) for _ in range(READERS)]
+    for thread in readers:
+        thread.start()
+    _writer(tracker, done)
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert tracker.get_snapshot().summary['total_pings'] == 0
+
+
+def test_cursor_wraps_after_clear():
+    tracker = StatsTrackerService(max_history=MAX_HISTORY)
+    for n in range(1, 11):
+        tracker.add_measurement(float(n))
+    entries, cursor, wrapped = tracker.get_since()
+    assert len(entries) == 10 and wrapped
+    snapshot_cursor = tracker.get_snapshot().since()[1]
+
+    tracker.clear()
+    tracker.add_measurement(1.0)
+    entries, new_cursor, wrapped = tracker.get_since(cursor)
+    assert wrapped and [entry.latency for entry in entries] == [1.0]
+    assert new_cursor > cursor
+    entries, new_cursor, wrapped = tracker.get_snapshot().since(snapshot_cursor)
+    assert wrapped and [entry.latency for entry in entries] == [1.0]
+    assert new_cursor > snapshot_cursor
+
+
+def test_unchanged_tracker_reuses_snapshot():
+    tracker = StatsTrackerService(max_history=MAX_HISTORY)
+    tracker.add_measurement(5.0)
+    snapshot = tracker.get_snapshot()
+    assert tracker.get_snapshot() is snapshot
+    tracker.add_measurement(6.0)
+    assert tracker.get_snapshot().version > snapshot.version
+    # The old snapshot still reads only its own entries
+    assert [entry.latency for entry in snapshot.entries()] == [5.0]
@@ -0,0 +1,150 @@
+"""
+Tests that rollups restored from a file and replayed from the log match
+rollups computed from the raw checks.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import log_analysis
+from services.stats_rollups import StatsRollups, local_seconds
+from services.stats_tracker_service import StatsTrackerService
+
+
+def _checks(count: int = 4000, seed: int = 3):
+    """(timestamp, latency or None) checks, several per second at times."""
+    rng = random.Random(seed)
+    timestamp = datetime(2026, 4, 1, 22, 0, 0)
+    checks = []
+    for _ in range(count):
+        timestamp += timedelta(seconds=rng.choice((0, 1, 5, 40)))
+        latency = None if rng.random() < 0.1 else round(rng.uniform(1, 500), 2)
+        checks.append((timestamp, latency))
+    return checks
+
+
+def _line(timestamp: datetime, latency):
+    prefix = f"[{timestamp:%Y-%m-%d %H:%M:%S}]"
+    if latency is None:
+        return f"{prefix} Latency: NO RESPONSE\n"
+    return f"{prefix} Latency: {latency:.2f} ms\n"
+
+
+def _write_log(path, checks):
+    with open(path, "a", encoding="utf-8") as f:
+        for timestamp, latency in checks:
+            f.write(_line(timestamp, latency))
+
+
+def _expected(checks, resolution: int):
+    """Exact (start, count, failures, total, min, max) per bucket from the raw checks."""
+    buckets = {}
+    for timestamp, latency in checks:
+        seconds = local_seconds(timestamp)
+        start = seconds - seconds % resolution
+        count, failures, total, low, high = buckets.get(start, (0, 0, 0.0, math.inf, -math.inf))
+        if latency is None:
+            buckets[start] = (count + 1, failures + 1, total, low, high)
+        else:
+            buckets[start] = (count + 1, failures, total + latency, min(low, latency), max(high, latency))
+    return [(start,) + values for start, values in sorted(buckets.items())]
+
+
+def _actual(rollups: StatsRollups, resolution: int):
+    return [(bucket.start, bucket.count, bucket.failures, bucket.total, bucket.min, bucket.max)
+            for bucket in rollups.buckets(resolution)]
+
+
+def _assert_matches(rollups: StatsRollups, checks):
+    for resolution in StatsRollups.RESOLUTIONS:
+        actual = _actual(rollups, resolution)
+        expected = _expected(checks, resolution)
+        assert [row[:3] for row in actual] == [row[:3] for row in expected]
+        for row, expected_row in zip(actual, expected):
+            assert row[3:] == pytest.approx(expected_row[3:])
+        # Every successful check is in the percentile sketch
+        assert [bucket.sketch.count for bucket in rollups.buckets(resolution)] == [
+            count - failures for _, count, failures, *_ in expected]
+
+
+@pytest.fixture
+def checks():
+    return _checks()
+
+
+def test_add_and_add_arrays_match_raw_checks(tmp_path, checks):
+    log_file = tmp_path / "log.txt"
+    _write_log(log_file, checks)
+
+    added = StatsRollups()
+    for timestamp, latency in checks:
+        added.add(timestamp, latency)
+    _assert_matches(added, checks)
+
+    replayed = StatsRollups()
+    assert replayed.add_arrays(log_analysis.load_log(log_file)) == len(checks)
+    _assert_matches(replayed, checks)
+
+
+def test_replay_onto_saved_rollups_skips_saved_checks(tmp_path, checks):
+    log_file = tmp_path / "log.txt"
+    # Split inside a second holding several checks
+    split = next(i for i in range(len(checks) // 2, len(checks)) if checks[i][0] == checks[i - 1][0])
+    _write_log(log_file, checks[:split])
+    rollups = StatsRollups()
+    rollups.add_arrays(log_analysis.load_log(log_file))
+    saved = tmp_path / "rollups.json"
+    StatsRollups.save_data(rollups.to_dict(), saved)
+
+    # The whole log is replayed onto the saved rollups
+    _write_log(log_file, checks[split:])
+    restored = StatsRollups.load(saved)
+    assert restored.add_arrays(log_analysis.load_log(log_file)) == len(checks) - split
+    _assert_matches(restored, checks)
+
+
+def test_resume_from_log_position(tmp_path, checks):
+    log_file = tmp_path / "log.txt"
+    split = len(checks) // 3
+    _write_log(log_file, checks[:split])
+    rollups = StatsRollups()
+    rollups.add_arrays(log_analysis.load_log(log_file))
+    rollups.log_position = {'offset': log_file.stat().st_size}
+
+    # Only the bytes appended after the saved offset are parsed
+    _write_log(log_file, checks[split:])
+    restored = StatsRollups.from_dict(rollups.to_dict())
+    restored.resume()
+    offset = restored.log_position['offset']
+    assert restored.add_arrays(log_analysis.load_log(log_file, start=offset)) == len(checks) - split
+    _assert_matches(restored, checks)
+
+
+def test_merge_of_disjoint_rollups(checks):
+    first, second = StatsRollups(), StatsRollups()
+    half = len(checks) // 2
+    for timestamp, latency in checks[:half]:
+        first.add(timestamp, latency)
+    for timestamp, latency in checks[half:]:
+        second.add(timestamp, latency)
+    first.merge(second)
+    _assert_matches(first, checks)
+
+
+def test_tracker_restores_rollups_after_restart(tmp_path, checks):
+    log_file = tmp_path / "log.txt"
+    split = len(checks) // 2
+    _write_log(log_file, checks[:split])
+    tracker = StatsTrackerService(max_history=100, log_file=str(log_file))
+    assert tracker._rollups_restored.wait(10)
+    tracker.checkpoint(final=True)
+
+    # Checks logged while the monitor was stopped
+    _write_log(log_file, checks[split:])
+    tracker = StatsTrackerService(max_history=100, log_file=str(log_file))
+    assert tracker._rollups_restored.wait(10)
+    _assert_matches(tracker._rollups, checks)
+    hours = tracker.get_rollups(StatsRollups.HOUR)
+    assert sum(bucket['count'] for bucket in hours) == len(checks)